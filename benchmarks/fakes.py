@@ -0,0 +1,383 @@
+"""
+Local stand-ins for GitHub and Gemini with configurable latency and
+injected rate-limit / overload errors. Every request is counted.
+
+Waits requested by the code under test (rate-limit pacing, retry backoff)
+go through a `VirtualClock`: they are recorded and advance virtual time,
+but only `time_scale` of each is actually slept, so a run that would spend
+minutes waiting for quota finishes in seconds and still reports how long
+it would have waited.
+"""
+
+import base64
+import json
+import random
+import re
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+from typing import Dict, List, Optional
+from urllib.parse import unquote
+
+from github import Github, GithubException, RateLimitExceededException
+
+from benchmarks import synthetic
+
+
+class VirtualClock:
+    def __init__(self, time_scale: float = 0.0):
+        self.time_scale = time_scale
+        self.slept = Counter()
+        self._offset = 0.0
+        self._lock = threading.Lock()
+
+    def now(self) -> float:
+        with self._lock:
+            return time.time() + self._offset
+
+    def sleeper(self, source: str):
+        """A `sleep(seconds)` replacement that books the wait under `source`."""
+
+        def sleep(seconds):
+            seconds = max(0.0, float(seconds))
+            with self._lock:
+                self.slept[source] += seconds
+                self._offset += seconds * (1 - self.time_scale)
+            if self.time_scale:
+                time.sleep(seconds * self.time_scale)
+
+        return sleep
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {source: round(s, 2) for source, s in sorted(self.slept.items())}
+
+
+class _Budget:
+    """One GitHub rate-limit resource (core, search) that resets on virtual time."""
+
+    def __init__(self, name: str, limit: int, window: float, clock: VirtualClock):
+        self.name = name
+        self.limit = limit
+        self.window = window
+        self.clock = clock
+        self.remaining = limit
+        self.reset = clock.now() + window
+
+    def take(self) -> tuple:
+        """Books one request; returns (allowed, rate-limit headers)."""
+        now = self.clock.now()
+        if now >= self.reset:
+            self.remaining, self.reset = self.limit, now + self.window
+        allowed = self.remaining > 0
+        if allowed:
+            self.remaining -= 1
+        return allowed, {
+            "x-ratelimit-limit": str(self.limit),
+            "x-ratelimit-remaining": str(self.remaining),
+            "x-ratelimit-reset": str(int(self.reset) + 1),
+            "x-ratelimit-resource": self.name,
+        }
+
+
+class FakeRequester:
+    """
+    Answers the REST calls github_client makes through `requestJson`
+    (search, repo, contents, file, releases) from the synthetic universe.
+    """
+
+    def __init__(
+        self,
+        repos: List[synthetic.RepoSpec],
+        shards: List[str],
+        raw_base_url: str,
+        clock: VirtualClock,
+        latency: float = 0.0,
+        error_rate: float = 0.0,
+        seed: int = 0,
+    ):
+        self.repos = {spec.full_name: spec for spec in repos}
+        self.shards = list(shards)
+        self.base_url = raw_base_url
+        self.latency = latency
+        self.error_rate = error_rate
+        self.calls = Counter()
+        self.statuses = Counter()
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._budgets = {
+            "core": _Budget("core", 5000, 3600, clock),
+            "search": _Budget("search", 30, 60, clock),
+        }
+        # Each shard sees its own slice of the universe, star-ordered
+        self._shard_items = [[] for _ in self.shards]
+        for i, spec in enumerate(repos):
+            self._shard_items[i % len(self.shards)].append(spec)
+
+    def _respond(self, kind: str, resource: str, status: int, body) -> tuple:
+        with self._lock:
+            self.calls[kind] += 1
+            allowed, headers = self._budgets[resource].take()
+            if not allowed:
+                status, body = 403, {"message": "API rate limit exceeded"}
+            elif self._rng.random() < self.error_rate:
+                status, body = (
+                    403,
+                    {"message": "You have exceeded a secondary rate limit"},
+                )
+                headers["retry-after"] = "30"
+            self.statuses[status] += 1
+        if self.latency:
+            time.sleep(self.latency)
+        return status, headers, json.dumps(body) if body is not None else ""
+
+    def requestJson(self, verb, url, parameters=None, headers=None, **kwargs):
+        parameters = parameters or {}
+        if url == "/search/repositories":
+            query = parameters.get("q", "")
+            shard = next(
+                (i for i, s in enumerate(self.shards) if query.startswith(s)), 0
+            )
+            page = int(parameters.get("page", 1)) - 1
+            items = self._shard_items[shard][page * 30 : (page + 1) * 30]
+            return self._respond(
+                "search",
+                "search",
+                200,
+                {
+                    "total_count": len(self._shard_items[shard]),
+                    "items": [s.raw() for s in items],
+                },
+            )
+
+        match = re.match(r"^/repos/([^/]+/[^/]+)(?:/(contents|releases)/?(.*))?$", url)
+        spec = self.repos.get(match.group(1)) if match else None
+        if spec is None:
+            return self._respond("missing", "core", 404, {"message": "Not Found"})
+        section, path = match.group(2), unquote(match.group(3) or "")
+
+        if section is None:
+            return self._respond("repo", "core", 200, spec.raw())
+        if section == "releases":
+            body = synthetic.releases(spec) if spec.source == "releases" else []
+            return self._respond("releases", "core", 200, body)
+        if not path:
+            return self._respond("contents", "core", 200, self._listing(spec))
+        if spec.source == "changelog" and path == spec.filename:
+            encoded = base64.b64encode(synthetic.content(spec)).decode("ascii")
+            return self._respond("file", "core", 200, {"content": encoded})
+        return self._respond("file", "core", 404, {"message": "Not Found"})
+
+    def _listing(self, spec: synthetic.RepoSpec) -> list:
+        entries = [
+            {"name": name, "path": name, "type": "file", "size": 2048, "sha": "0" * 40}
+            for name in ("README.md", "LICENSE", "pyproject.toml")
+        ]
+        if spec.source == "changelog":
+            entries.append(
+                {
+                    "name": spec.filename,
+                    "path": spec.filename,
+                    "type": "file",
+                    "size": spec.changelog_bytes,
+                    "sha": spec.blob_sha,
+                    "download_url": f"{self.base_url}/raw/{spec.full_name}/{spec.filename}",
+                }
+            )
+        return entries
+
+    def createException(self, status, headers, data):
+        if status == 403 and "rate limit" in str(data).lower():
+            return RateLimitExceededException(status, data, headers)
+        return GithubException(status, data, headers)
+
+
+class FakeGitHub:
+    """What set_github_client() expects: a `requester` and `create_from_raw_data`."""
+
+    def __init__(self, requester: FakeRequester):
+        self.requester = requester
+        # Real PyGithub objects, built from raw dicts without any request
+        self._github = Github()
+
+    def create_from_raw_data(self, klass, raw_data, headers=None):
+        return self._github.create_from_raw_data(klass, raw_data, headers or {})
+
+    def close(self):
+        self._github.close()
+
+
+class RawServer:
+    """
+    Local HTTP server for raw changelog downloads and git blobs, honouring
+    `Range: bytes=0-N` the way raw.githubusercontent.com does.
+    """
+
+    def __init__(self, repos: List[synthetic.RepoSpec], latency: float = 0.0):
+        self.repos = {spec.full_name: spec for spec in repos}
+        self.latency = latency
+        self.requests = 0
+        self.bytes_served = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name="bench-raw", daemon=True
+        )
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _lookup(self, path: str) -> Optional[synthetic.RepoSpec]:
+        match = re.match(r"^/(?:raw/|repos/)([^/]+/[^/]+)/", unquote(path))
+        spec = self.repos.get(match.group(1)) if match else None
+        return spec if spec and spec.source == "changelog" else None
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                spec = server._lookup(self.path)
+                if spec is None:
+                    self.send_response(404)
+                    self.end_headers()
+                    return
+                if server.latency:
+                    time.sleep(server.latency)
+                ranged = re.match(r"bytes=(\d+)-(\d+)", self.headers.get("Range", ""))
+                # Only generate what the range covers; past the end the real
+                # size is at least the nominal one
+                body = synthetic.content(
+                    spec, int(ranged.group(2)) + 1 if ranged else None
+                )
+                total = len(body)
+                if ranged and total < spec.changelog_bytes:
+                    total = spec.changelog_bytes
+                status, start, end = 200, 0, len(body) - 1
+                if ranged:
+                    status, start = 206, int(ranged.group(1))
+                    end = min(end, int(ranged.group(2)))
+                chunk = body[start : end + 1]
+                self.send_response(status)
+                self.send_header("Content-Length", str(len(chunk)))
+                if status == 206:
+                    self.send_header("Content-Range", f"bytes {start}-{end}/{total}")
+                self.end_headers()
+                try:
+                    self.wfile.write(chunk)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # the client stops reading once it has the newest sections
+                with server._lock:
+                    server.requests += 1
+                    server.bytes_served += len(chunk)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {"requests": self.requests, "bytes_served": self.bytes_served}
+
+
+class FakeGemini:
+    """
+    `client.models.generate_content(...)` returning schema-shaped JSON, and
+    `generate_content_stream(...)` yielding the same text in chunks.
+    `overload_rate` / `rate_limit_rate` inject 503s and per-minute 429s.
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        overload_rate: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        seed: int = 0,
+    ):
+        self.latency = latency
+        self.overload_rate = overload_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.calls = Counter()
+        self.errors = Counter()
+        self.prompt_chars = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.models = SimpleNamespace(
+            generate_content=self.generate_content,
+            generate_content_stream=self.generate_content_stream,
+        )
+
+    def generate_content(self, model, contents, config):
+        with self._lock:
+            self.calls[model] += 1
+            self.prompt_chars += len(contents)
+            roll = self._rng.random()
+        if self.latency:
+            time.sleep(self.latency)
+        if roll < self.overload_rate:
+            with self._lock:
+                self.errors["503"] += 1
+            raise RuntimeError("503 UNAVAILABLE. The model is overloaded.")
+        if roll < self.overload_rate + self.rate_limit_rate:
+            with self._lock:
+                self.errors["429"] += 1
+            raise RuntimeError("429 RESOURCE_EXHAUSTED: GenerateRequestsPerMinute")
+
+        properties = (config.response_schema or {}).get("properties", {})
+        if "results" in properties:
+            names = re.findall(r"^### Repository: (\S+)$", contents, re.M)
+            body = {"results": [dict(_update(), full_name=n) for n in names]}
+        elif "update_found" in properties:
+            body = _update()
+        else:
+            body = {
+                "ecosystem_summary": "Synthetic ecosystem summary.",
+                "synergies": [{"title": "Synergy", "description": "Tools fit."}],
+                "potential_issues": [],
+            }
+        return SimpleNamespace(text=json.dumps(body))
+
+    def generate_content_stream(self, model, contents, config, chunk_size=64):
+        text = self.generate_content(model, contents, config).text
+        for start in range(0, len(text), chunk_size):
+            yield SimpleNamespace(
+                text=text[start : start + chunk_size], candidates=None
+            )
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "calls": dict(self.calls),
+                "errors_injected": dict(self.errors),
+                "prompt_chars": self.prompt_chars,
+            }
+
+
+def _update() -> Dict:
+    return {
+        "update_found": True,
+        "title": "v1.0.0",
+        "description": "Synthetic release.",
+        "whats_new": ["Faster **streaming**", "New `tool` API"],
+        "why_important": "It removes a *bottleneck* users hit daily.",
+        "try_it_out": {
+            "language": "python",
+            "beginner": {"label": "Install", "code": "pip install repo"},
+            "intermediate": {"label": "Use", "code": "repo.run()"},
+            "advanced": {"label": "Tune", "code": "repo.run(fast=True)"},
+        },
+    }
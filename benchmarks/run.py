@@ -0,0 +1,357 @@
+"""
+Synthetic scale benchmark for generate_site: fetch → detect → summarize → render.
+
+    python -m benchmarks.run --repos 2000 --gemini-latency 0.5 --gemini-503 0.1
+
+Runs one full generate_site against a synthetic universe served by local
+fakes (benchmarks/fakes.py) in a throwaway CACHE_DIR and site directory,
+then writes wall time, API call counts, virtual sleep time, peak memory and
+render time to benchmarks/results/<timestamp>.json and prints the change
+against the previous result with the same parameters.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+from unittest.mock import patch
+
+from benchmarks import synthetic
+from benchmarks.fakes import (
+    FakeGemini,
+    FakeGitHub,
+    FakeRequester,
+    RawServer,
+    VirtualClock,
+)
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+ROOT = Path(__file__).parent.parent
+RESULTS_DIR = Path(__file__).parent / "results"
+
+# Headline numbers compared against the previous run
+COMPARED = [
+    "wall_seconds",
+    "render_seconds",
+    "virtual_sleep_seconds",
+    "github_calls",
+    "gemini_calls",
+    "peak_rss_mb",
+]
+
+
+def _peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def _git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+@contextlib.contextmanager
+def _isolated(
+    cache_dir: Path, clock: VirtualClock, gemini: FakeGemini, stream: bool = False
+):
+    """Fresh module state for one run: caches, stores and limiters all start empty."""
+    from src import config, github_client, main, render, summarizer, telemetry
+    from src.model_health import ModelHealth
+    from src.rate_limiter import GitHubRateScheduler, RateLimiter
+
+    limiter = RateLimiter(
+        requests_per_minute=getattr(config, "REQUESTS_PER_MINUTE", 5),
+        daily_limit=getattr(config, "DAILY_LIMIT", 20),
+        ledger_path=str(cache_dir / "gemini_quota.json"),
+        burst=getattr(config, "RATE_LIMIT_BURST", 1),
+        sleep=clock.sleeper("gemini_rate_limit"),
+        clock=clock.now,
+    )
+    scheduler = GitHubRateScheduler(
+        pace_below=getattr(config, "GITHUB_PACE_BELOW", 0.1),
+        clock=clock.now,
+        sleep=clock.sleeper("github_rate_limit"),
+    )
+    health = ModelHealth(
+        str(cache_dir / "model_health.json"),
+        failure_threshold=getattr(config, "CIRCUIT_FAILURE_THRESHOLD", 3),
+        cooldown=getattr(config, "CIRCUIT_COOLDOWN_SECONDS", 300),
+        clock=clock.now,
+    )
+    with contextlib.ExitStack() as stack:
+        enter = stack.enter_context
+        enter(patch.object(config, "CACHE_DIR", str(cache_dir)))
+        enter(patch.object(config, "STATE_DB_PATH", str(cache_dir / "state.sqlite3")))
+        enter(patch.object(config, "JOURNAL_DIR", str(cache_dir / "journal")))
+        enter(patch.object(config, "GEMINI_STREAMING", stream))
+        enter(patch.object(github_client, "_rate_scheduler", scheduler))
+        enter(patch.object(github_client, "_http_cache", None))
+        enter(patch.object(github_client, "_state_store", None))
+        enter(
+            patch.dict(
+                github_client._http_stats, dict.fromkeys(github_client._http_stats, 0)
+            )
+        )
+        enter(
+            patch.dict(
+                github_client._prefilter_stats,
+                dict.fromkeys(github_client._prefilter_stats, 0),
+            )
+        )
+        enter(patch.object(summarizer, "_rate_limiter", limiter))
+        enter(patch.object(summarizer, "_summary_cache", None))
+        enter(patch.object(summarizer, "_model_health", health))
+        enter(patch.object(summarizer, "_get_gemini_client", lambda: gemini))
+        enter(patch.object(render, "_markdown", render.MarkdownMemo()))
+        enter(patch.object(telemetry, "_telemetry", telemetry.Telemetry()))
+        for fn in (
+            summarizer._call_gemini_single_model,
+            github_client.get_repo_with_retry,
+            github_client.search_repos_raw,
+        ):
+            enter(patch.object(fn.retry, "sleep", clock.sleeper("retry_backoff")))
+        yield main
+        if github_client._state_store is not None:
+            github_client._state_store.close()
+
+
+def run_benchmark(args) -> dict:
+    from src import config, github_client
+
+    target_date = args.date or datetime.now(timezone.utc).strftime("%Y-%m-%d")
+    repos = synthetic.build_universe(
+        args.repos,
+        target_date,
+        list(config.VIP_REPOS),
+        seed=args.seed,
+        update_ratio=args.update_ratio,
+        min_kb=args.min_kb,
+        max_kb=args.max_kb,
+    )
+    clock = VirtualClock(time_scale=args.time_scale)
+    gemini = FakeGemini(
+        latency=args.gemini_latency,
+        overload_rate=args.gemini_503,
+        rate_limit_rate=args.gemini_429,
+        seed=args.seed,
+    )
+
+    work_dir = Path(tempfile.mkdtemp(prefix="changelog-bench-"))
+    site_dir = work_dir / "site"
+    site_dir.mkdir()
+    for name in ("template.html", "rss_template.xml", "style.css"):
+        if (ROOT / "site" / name).exists():
+            shutil.copy(ROOT / "site" / name, site_dir / name)
+
+    render_seconds = []
+    try:
+        with RawServer(repos, latency=args.github_latency) as raw_server:
+            requester = FakeRequester(
+                repos,
+                config.SEARCH_SHARDS,
+                raw_server.base_url,
+                clock,
+                latency=args.github_latency,
+                error_rate=args.github_403,
+                seed=args.seed,
+            )
+            with _isolated(work_dir / "cache", clock, gemini, args.stream) as main:
+                real_render_site = main.render_site
+
+                def timed_render_site(*a, **kw):
+                    start = time.perf_counter()
+                    try:
+                        return real_render_site(*a, **kw)
+                    finally:
+                        render_seconds.append(time.perf_counter() - start)
+
+                github_client.set_github_client(FakeGitHub(requester))
+                output = io.StringIO()
+                if args.tracemalloc:
+                    tracemalloc.start()
+                start = time.perf_counter()
+                try:
+                    with patch.object(main, "render_site", timed_render_site):
+                        with contextlib.redirect_stdout(
+                            sys.stdout if args.verbose else output
+                        ):
+                            main.generate_site(
+                                target_date,
+                                force=True,
+                                pipeline=args.pipeline,
+                                batch=args.batch,
+                                base_dir=work_dir,
+                            )
+                finally:
+                    wall = time.perf_counter() - start
+                    traced_peak = (
+                        tracemalloc.get_traced_memory()[1] if args.tracemalloc else None
+                    )
+                    tracemalloc.stop()
+                    github_client.set_github_client(None)
+
+            meta_path = site_dir / "meta.json"
+            meta = (
+                json.loads(meta_path.read_text("utf-8")) if meta_path.exists() else {}
+            )
+            gemini_stats = gemini.stats()
+            return {
+                "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                "revision": _git_revision(),
+                "python": platform.python_version(),
+                "params": {
+                    key: value
+                    for key, value in sorted(vars(args).items())
+                    if key not in ("output", "verbose", "date")
+                },
+                "target_date": target_date,
+                "wall_seconds": round(wall, 3),
+                "render_seconds": round(sum(render_seconds), 4),
+                "virtual_sleep_seconds": round(sum(clock.slept.values()), 2),
+                "sleep_by_source": clock.stats(),
+                "github_calls": sum(requester.calls.values()),
+                "github": {
+                    "calls": dict(requester.calls),
+                    "statuses": {str(k): v for k, v in requester.statuses.items()},
+                    "raw": raw_server.stats(),
+                },
+                "gemini_calls": sum(gemini_stats["calls"].values()),
+                "gemini": gemini_stats,
+                "peak_rss_mb": _peak_rss_mb(),
+                "peak_traced_mb": round(traced_peak / 2**20, 1)
+                if traced_peak
+                else None,
+                "repo_count": meta.get("repo_count"),
+                "meta": meta,
+            }
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def _previous(results_dir: Path, params: dict):
+    for path in sorted(results_dir.glob("*.json"), reverse=True):
+        try:
+            result = json.loads(path.read_text("utf-8"))
+        except (OSError, ValueError):
+            continue
+        if result.get("params") == params:
+            return result
+    return None
+
+
+def _report(result: dict, previous):
+    print(f"📊 Benchmark ({result['params']['repos']} repos, {result['target_date']}):")
+    for key in COMPARED:
+        value = result.get(key)
+        line = f"  {key:<24} {value}"
+        old = previous.get(key) if previous else None
+        if isinstance(value, (int, float)) and isinstance(old, (int, float)) and old:
+            line += f"  ({(value - old) / old:+.1%} vs {previous.get('revision') or 'previous'})"
+        print(line)
+    print(f"  {'repo_count':<24} {result['repo_count']}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repos", type=int, default=2000, help="Synthetic candidates")
+    parser.add_argument(
+        "--date", default=None, help="Target date YYYY-MM-DD (default: today)"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--update-ratio",
+        type=float,
+        default=0.05,
+        help="Share of repos with an entry in the window",
+    )
+    parser.add_argument(
+        "--min-kb", type=float, default=1, help="Smallest changelog (KB)"
+    )
+    parser.add_argument(
+        "--max-kb", type=float, default=5 * 1024, help="Largest changelog (KB)"
+    )
+    parser.add_argument(
+        "--github-latency", type=float, default=0.0, help="Seconds per GitHub request"
+    )
+    parser.add_argument(
+        "--github-403",
+        type=float,
+        default=0.0,
+        help="Share of GitHub requests hitting a secondary rate limit",
+    )
+    parser.add_argument(
+        "--gemini-latency", type=float, default=0.0, help="Seconds per Gemini call"
+    )
+    parser.add_argument(
+        "--gemini-503",
+        type=float,
+        default=0.0,
+        help="Share of Gemini calls failing with 503",
+    )
+    parser.add_argument(
+        "--gemini-429",
+        type=float,
+        default=0.0,
+        help="Share of Gemini calls failing with 429",
+    )
+    parser.add_argument(
+        "--time-scale",
+        type=float,
+        default=0.0,
+        help="Fraction of rate-limit/backoff waits actually slept",
+    )
+    parser.add_argument("--pipeline", action="store_true", default=False)
+    parser.add_argument("--batch", action="store_true", default=False)
+    parser.add_argument(
+        "--stream", action="store_true", default=False, help="Streamed Gemini responses"
+    )
+    parser.add_argument(
+        "--tracemalloc",
+        action="store_true",
+        help="Also record the Python heap peak (slower)",
+    )
+    parser.add_argument(
+        "--verbose", action="store_true", help="Show generate_site output"
+    )
+    parser.add_argument(
+        "--output", type=Path, default=RESULTS_DIR, help="Results directory"
+    )
+    args = parser.parse_args(argv)
+
+    result = run_benchmark(args)
+    os.makedirs(args.output, exist_ok=True)
+    previous = _previous(args.output, result["params"])
+    path = args.output / f"{datetime.now(timezone.utc):%Y%m%dT%H%M%S}.json"
+    path.write_text(json.dumps(result, indent=2), encoding="utf-8")
+    _report(result, previous)
+    print(f"💾 Saved to {path}")
+    return result
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+"""
+Deterministic synthetic repositories and changelogs for the benchmark.
+
+Every repo is described by a small `RepoSpec`; its changelog text is only
+generated when something actually downloads it, so a universe of thousands
+of candidates with multi-megabyte histories stays cheap to hold.
+"""
+
+import hashlib
+import math
+import random
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import List, Optional
+
+# (filename, heading(version, date) -> text) — one per changelog style the parser knows
+HEADING_STYLES = {
+    "keep-a-changelog": (
+        "CHANGELOG.md",
+        lambda v, d: f"## [{v}] - {d:%Y-%m-%d}\n",
+    ),
+    "release-derived": (
+        "CHANGELOG.md",
+        lambda v, d: f"## [{d:%Y-%m-%d}] v{v}\n",
+    ),
+    "month-first": (
+        "HISTORY.md",
+        lambda v, d: f"## v{v} — {d:%B} {d.day}, {d:%Y}\n",
+    ),
+    "day-first": (
+        "CHANGES.md",
+        lambda v, d: f"### {v} ({d.day} {d:%b} {d:%Y})\n",
+    ),
+    "released-line": (
+        "CHANGELOG.md",
+        lambda v, d: f"## v{v}\n\n_Released {d:%Y/%m/%d}_\n",
+    ),
+    "rst": (
+        "CHANGELOG.rst",
+        lambda v, d: f"{v} ({d:%Y-%m-%d})\n{'-' * (len(v) + 13)}\n",
+    ),
+    "plain-text": (
+        "CHANGES.txt",
+        lambda v, d: f"v{v} ({d:%Y-%m-%d})\n",
+    ),
+}
+
+_WORDS = (
+    "agent model token cache stream tool prompt schema batch vector index "
+    "embedding runtime kernel quantized adapter router memory context graph "
+    "pipeline tokenizer sampler checkpoint gradient attention retriever loader"
+).split()
+
+
+@dataclass(frozen=True)
+class RepoSpec:
+    full_name: str
+    stars: int
+    seed: int
+    style: str
+    source: str  # "changelog", "releases" or "none"
+    changelog_bytes: int
+    newest: datetime  # date of the newest changelog section / release
+    pushed_at: datetime
+
+    @property
+    def name(self) -> str:
+        return self.full_name.split("/", 1)[1]
+
+    @property
+    def filename(self) -> str:
+        return HEADING_STYLES[self.style][0]
+
+    @property
+    def blob_sha(self) -> str:
+        return hashlib.sha1(f"{self.full_name}:{self.seed}".encode()).hexdigest()
+
+    def raw(self) -> dict:
+        """The repository as the REST API (and search) returns it."""
+        owner = self.full_name.split("/", 1)[0]
+        return {
+            "id": self.seed,
+            "name": self.name,
+            "full_name": self.full_name,
+            "owner": {"login": owner},
+            "description": f"Synthetic {self.style} repository",
+            "html_url": f"https://github.com/{self.full_name}",
+            "stargazers_count": self.stars,
+            "forks_count": self.stars // 10,
+            "pushed_at": _iso(self.pushed_at),
+            "updated_at": _iso(self.pushed_at),
+        }
+
+
+def _iso(moment: datetime) -> str:
+    return moment.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def build_universe(
+    count: int,
+    target_date: str,
+    vip_names: List[str],
+    seed: int = 0,
+    update_ratio: float = 0.05,
+    min_kb: float = 1,
+    max_kb: float = 5 * 1024,
+) -> List[RepoSpec]:
+    """
+    `count` repos sorted by stars (descending), the first ones named after
+    `vip_names`. About `update_ratio` of them have a changelog entry inside
+    the three-day window ending on `target_date`; changelog sizes are
+    log-uniform between `min_kb` and `max_kb`.
+    """
+    rng = random.Random(seed)
+    target = datetime.strptime(target_date, "%Y-%m-%d").replace(tzinfo=timezone.utc)
+    styles = sorted(HEADING_STYLES)
+    stars = sorted((int(50 * (1 / rng.random()) ** 0.8) for _ in range(count)))[::-1]
+
+    repos = []
+    for i in range(count):
+        full_name = vip_names[i] if i < len(vip_names) else f"synth-{i}/repo-{i}"
+        if rng.random() < update_ratio:
+            newest = target - timedelta(days=rng.randrange(3))
+            pushed_at = newest + timedelta(hours=rng.randrange(1, 20))
+        else:
+            newest = target - timedelta(days=rng.randrange(4, 90))
+            # Some repos keep pushing without touching the changelog
+            active = rng.random() < 0.5
+            pushed_at = target if active else newest + timedelta(hours=6)
+        roll = rng.random()
+        source = "changelog" if roll < 0.7 else "releases" if roll < 0.9 else "none"
+        size = math.exp(rng.uniform(math.log(min_kb), math.log(max_kb))) * 1024
+        repos.append(
+            RepoSpec(
+                full_name=full_name,
+                stars=stars[i],
+                seed=rng.getrandbits(32),
+                style=styles[i % len(styles)],
+                source=source,
+                changelog_bytes=int(size),
+                newest=newest,
+                pushed_at=pushed_at,
+            )
+        )
+    return repos
+
+
+def _section_body(rng: random.Random, target_bytes: int) -> str:
+    lines = []
+    size = 0
+    while size < target_bytes:
+        words = " ".join(rng.choice(_WORDS) for _ in range(rng.randrange(6, 16)))
+        line = f"- {words.capitalize()}.\n"
+        lines.append(line)
+        size += len(line)
+    return "".join(lines) + "\n"
+
+
+@lru_cache(maxsize=32)
+def changelog_text(spec: RepoSpec, limit: Optional[int] = None) -> str:
+    """
+    The repo's changelog: dated sections, newest first, about
+    `changelog_bytes` long. With `limit`, generation stops once that many
+    characters exist; the result is then a prefix of the full text.
+    """
+    rng = random.Random(spec.seed)
+    heading = HEADING_STYLES[spec.style][1]
+    intro = {"rst": "Changelog\n=========\n\n", "plain-text": "CHANGES\n\n"}
+    parts = [intro.get(spec.style, "# Changelog\n\n")]
+    size = len(parts[0])
+    date = spec.newest
+    major, minor, patch = 1, rng.randrange(40), rng.randrange(10)
+    while size < min(spec.changelog_bytes, limit or spec.changelog_bytes):
+        section = heading(f"{major}.{minor}.{patch}", date) + "\n"
+        section += _section_body(rng, rng.randrange(300, 2400))
+        parts.append(section)
+        size += len(section)
+        date -= timedelta(days=rng.randrange(1, 12))
+        patch -= 1
+        if patch < 0:
+            minor, patch = max(0, minor - 1), rng.randrange(10)
+    return "".join(parts)
+
+
+def releases(spec: RepoSpec, count: int = 5) -> List[dict]:
+    """Latest releases (REST shape), newest first."""
+    rng = random.Random(spec.seed)
+    result = []
+    date = spec.newest
+    for i in range(count):
+        result.append(
+            {
+                "id": spec.seed * 10 + i,
+                "tag_name": f"v0.{count - i}.0",
+                "name": f"Release 0.{count - i}.0",
+                "published_at": _iso(date),
+                "created_at": _iso(date),
+                "body": _section_body(rng, 600),
+            }
+        )
+        date -= timedelta(days=rng.randrange(3, 20))
+    return result
+
+
+def content(spec: RepoSpec, limit: Optional[int] = None) -> Optional[bytes]:
+    """Changelog bytes; with `limit`, only (at least) the first `limit` bytes."""
+    if spec.source != "changelog":
+        return None
+    if limit is not None and limit >= spec.changelog_bytes:
+        limit = None
+    return changelog_text(spec, limit).encode("utf-8")
@@ -0,0 +1,118 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+
+class DiskCache:
+    """
+    Small on-disk JSON cache: one file per key under `directory`.
+    Counts hits/misses, expires entries older than `ttl_seconds` (if set) and
+    evicts least-recently-used files once the directory grows past `max_bytes`.
+    """
+
+    def __init__(self, directory, max_bytes: int, ttl_seconds: Optional[float] = None):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._size = None  # scanned lazily on first write
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> Path:
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        return self.directory / f"{digest}.json"
+
+    def _count(self, hit: bool):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def get(self, key: str) -> Optional[Any]:
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            self._count(hit=False)
+            return None
+
+        age = time.time() - entry.get("stored_at", 0)
+        if self.ttl_seconds is not None and age > self.ttl_seconds:
+            self.delete(key)
+            self._count(hit=False)
+            return None
+
+        try:
+            os.utime(path)  # refresh LRU position
+        except OSError:
+            pass
+        self._count(hit=True)
+        return entry.get("value")
+
+    def set(self, key: str, value: Any):
+        path = self._path(key)
+        payload = json.dumps(
+            {"key": key, "stored_at": time.time(), "value": value}
+        ).encode("utf-8")
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(payload)
+
+        with self._lock:
+            size = self._scan_size()
+            previous = path.stat().st_size if path.exists() else 0
+            os.replace(tmp_path, path)
+            self._size = size - previous + len(payload)
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def delete(self, key: str):
+        path = self._path(key)
+        with self._lock:
+            try:
+                removed = path.stat().st_size
+                path.unlink()
+            except OSError:
+                return
+            if self._size is not None:
+                self._size -= removed
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "bytes": self._size if self._size is not None else 0,
+            }
+
+    def _scan_size(self) -> int:
+        if self._size is None:
+            self._size = sum(
+                p.stat().st_size for p in self.directory.glob("*.json") if p.is_file()
+            )
+        return self._size
+
+    def _evict(self):
+        # Oldest access time first; stop once back under budget
+        files = sorted(self.directory.glob("*.json"), key=lambda p: p.stat().st_mtime)
+        for path in files:
+            if self._size <= self.max_bytes:
+                break
+            try:
+                removed = path.stat().st_size
+                path.unlink()
+            except OSError:
+                continue
+            self._size -= removed
+            self.evictions += 1
@@ -0,0 +1,205 @@
+import re
+from datetime import datetime
+from typing import Optional
+
+# Keep prompts bounded even when one day's section is huge
+MAX_SECTION_CHARS = 8000
+
+_MONTHS = {
+    name: index
+    for index, names in enumerate(
+        [
+            ("jan", "january"),
+            ("feb", "february"),
+            ("mar", "march"),
+            ("apr", "april"),
+            ("may",),
+            ("jun", "june"),
+            ("jul", "july"),
+            ("aug", "august"),
+            ("sep", "sept", "september"),
+            ("oct", "october"),
+            ("nov", "november"),
+            ("dec", "december"),
+        ],
+        start=1,
+    )
+    for name in names
+}
+_MONTH_RE = "|".join(sorted(_MONTHS, key=len, reverse=True))
+
+_ISO_DATE = re.compile(r"(?<!\d)(\d{4})[-/.](\d{1,2})[-/.](\d{1,2})(?!\d)")
+_MONTH_FIRST = re.compile(
+    rf"\b({_MONTH_RE})\.?\s+(\d{{1,2}})(?:st|nd|rd|th)?,?\s+(\d{{4}})\b", re.I
+)
+_DAY_FIRST = re.compile(
+    rf"\b(\d{{1,2}})(?:st|nd|rd|th)?\s+({_MONTH_RE})\.?,?\s+(\d{{4}})\b", re.I
+)
+
+_ATX_HEADING = re.compile(r"^(#{1,6})\s+(.*?)\s*#*\s*$")
+_UNDERLINE = re.compile(r"^([=\-~^*+#`'\"])\1{2,}\s*$")
+# Plain-text release lines: "v1.2.0 (2024-01-05)", "Version 2.0 - 2024-01-05", "2024-01-05: ..."
+_TEXT_HEADING = re.compile(
+    r"^(v?\d+\.\d+\S*|version\s+\S+|release\s+\S+|\[?\d{4}[-/.]\d{1,2}[-/.]\d{1,2})",
+    re.I,
+)
+_VERSION_ONLY = re.compile(r"\bv?\d+\.\d+(\.\d+)?\b")
+_DATE_TEXT = (
+    rf"(?:\d{{4}}[-/.]\d{{1,2}}[-/.]\d{{1,2}}"
+    rf"|(?:{_MONTH_RE})\.?\s+\d{{1,2}}(?:st|nd|rd|th)?,?\s+\d{{4}}"
+    rf"|\d{{1,2}}(?:st|nd|rd|th)?\s+(?:{_MONTH_RE})\.?,?\s+\d{{4}})"
+)
+# The line under a bare version heading: a date alone or "Released/Date: <date>",
+# optionally wrapped in emphasis, never a sentence that happens to mention one
+_DATE_LINE = re.compile(
+    rf"^[>*_`(\[\s]*(?:(?:released|release\s+date|date|published)(?:\s+on)?\s*:?\s*)?"
+    rf"{_DATE_TEXT}[*_`)\].\s]*$",
+    re.I,
+)
+
+
+def extract_date(text: str) -> Optional[str]:
+    """
+    Returns the first date in `text` as YYYY-MM-DD, or None.
+    Understands ISO-like (2024-01-05, 2024/01/05, 2024.01.05) and
+    month-name forms (January 5, 2024 / 5 Jan 2024).
+    """
+    candidates = []
+    for match in _ISO_DATE.finditer(text):
+        candidates.append(
+            (match.start(), match.group(1), match.group(2), match.group(3))
+        )
+    for match in _MONTH_FIRST.finditer(text):
+        month = _MONTHS[match.group(1).lower()]
+        candidates.append((match.start(), match.group(3), month, match.group(2)))
+    for match in _DAY_FIRST.finditer(text):
+        month = _MONTHS[match.group(2).lower()]
+        candidates.append((match.start(), match.group(3), month, match.group(1)))
+
+    for _, year, month, day in sorted(candidates):
+        try:
+            return datetime(int(year), int(month), int(day)).strftime("%Y-%m-%d")
+        except ValueError:
+            continue
+    return None
+
+
+def _scan_headings(lines: list) -> list:
+    """
+    Returns [(line_no, level, title)] for Markdown ATX and setext/RST
+    underlined headings. In Markdown (any ATX heading present) `=` underlines
+    are level 1 and `-` underlines level 2; otherwise underline levels follow
+    first appearance, as in reStructuredText. Files without any markup fall
+    back to plain-text release lines ("v1.2.0 (2024-01-05)").
+    """
+    headings = []
+    text_headings = []
+    is_markdown = False
+    in_fence = False
+    for i, line in enumerate(lines):
+        stripped = line.strip()
+        if stripped.startswith("```") or stripped.startswith("~~~"):
+            in_fence = not in_fence
+            continue
+        if in_fence or not stripped:
+            continue
+
+        atx = _ATX_HEADING.match(line)
+        if atx:
+            is_markdown = True
+            headings.append((i, len(atx.group(1)), atx.group(2)))
+            continue
+
+        if i + 1 < len(lines):
+            underline = _UNDERLINE.match(lines[i + 1].strip())
+            if (
+                underline
+                and not line.startswith((" ", "\t", "-", "*"))
+                and len(lines[i + 1].strip()) >= min(len(stripped), 3)
+            ):
+                # Level resolved below, once the flavour of the file is known
+                headings.append((i, underline.group(1), stripped))
+                continue
+
+        if (
+            not line.startswith((" ", "\t"))
+            and len(stripped) <= 120
+            and _TEXT_HEADING.match(stripped)
+        ):
+            text_headings.append((i, 1, stripped))
+
+    resolved = []
+    underline_levels = {"=": 1, "-": 2} if is_markdown else {}
+    for i, level, title in headings:
+        if isinstance(level, str):
+            if is_markdown and level not in underline_levels:
+                continue  # not a heading in Markdown
+            level = underline_levels.setdefault(level, len(underline_levels) + 1)
+        resolved.append((i, level, title))
+    return resolved or text_headings
+
+
+def index_changelog(content: str) -> list:
+    """
+    Scans a changelog once and returns its dated sections in document order:
+    [{"heading", "date", "level", "start", "end"}], where start/end are
+    character offsets into `content`.
+
+    A heading's date comes from the heading itself (Keep-a-Changelog
+    `## [1.2.0] - 2024-01-05`, release-derived `## [2024-01-05] v1.2.0`) or,
+    for bare version headings, from a date-only line right below it
+    (e.g. `_Released 2024-01-05_`, `Date: 2024-01-05`). A dated section runs until the next
+    dated heading of the same or a higher level, or any higher-level heading,
+    so "### Added"/"## What's Changed" sub-headings stay inside it.
+    """
+    lines = content.splitlines(keepends=True)
+    offsets = [0]
+    for line in lines:
+        offsets.append(offsets[-1] + len(line))
+
+    headings = []
+    for line_no, level, title in _scan_headings(lines):
+        date = extract_date(title)
+        if date is None and _VERSION_ONLY.search(title):
+            for follow in lines[line_no + 1 : line_no + 4]:
+                follow = follow.strip()
+                if follow and not _UNDERLINE.match(follow):
+                    if _DATE_LINE.match(follow):
+                        date = extract_date(follow)
+                    break
+        headings.append((line_no, level, title, date))
+
+    sections = []
+    for position, (line_no, level, title, date) in enumerate(headings):
+        if date is None:
+            continue
+        end_line = len(lines)
+        for next_line, next_level, _, next_date in headings[position + 1 :]:
+            if next_level < level or (next_level <= level and next_date):
+                end_line = next_line
+                break
+        sections.append(
+            {
+                "heading": title,
+                "date": date,
+                "level": level,
+                "start": offsets[line_no],
+                "end": offsets[end_line],
+            }
+        )
+    return sections
+
+
+def find_section(
+    content: str, target_date: str, index: Optional[list] = None
+) -> Optional[str]:
+    """
+    Returns the text of every section dated `target_date` (several releases
+    can share a day), capped at MAX_SECTION_CHARS, or None.
+    """
+    if index is None:
+        index = index_changelog(content)
+    parts = [content[s["start"] : s["end"]] for s in index if s["date"] == target_date]
+    if not parts:
+        return None
+    return "".join(parts).strip()[:MAX_SECTION_CHARS]
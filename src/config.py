@@ -17,14 +17,86 @@ GEMINI_FALLBACK_MODELS = [
     "gemini-2.0-flash",
     "gemini-1.5-flash",
 ]
-RATE_LIMIT_DELAY = 12  # seconds between calls (5 RPM limit)
-DAILY_LIMIT = 20  # max 20 requests per day
+REQUESTS_PER_MINUTE = 5  # per-model token bucket (5 RPM free tier)
+RATE_LIMIT_BURST = 1  # tokens a model may bank; 1 keeps calls >= 12s apart
+DAILY_LIMIT = 20  # max 20 requests per model per day (persisted ledger)
 MAX_RETRIES = 2  # retries per model for 503/429/504 errors
 RETRY_DELAY = 30  # seconds to wait before retry on 503
+CIRCUIT_FAILURE_THRESHOLD = 3  # consecutive failed calls before a model is skipped
+CIRCUIT_COOLDOWN_SECONDS = (
+    300  # skip time before the first probe (doubles per failed probe)
+)
+CIRCUIT_MAX_COOLDOWN_SECONDS = 6 * 3600
+ADAPTIVE_ROUTING = True  # try the fastest model with a reliable record first
+ROUTING_MIN_SAMPLES = 5  # recent calls needed before a model's record counts
+ROUTING_MIN_SUCCESS_RATE = 0.9  # share of calls returning valid, complete JSON
+ROUTING_LATENCY_BUDGET_SECONDS = None  # optional cap on total seconds per request
 GEMINI_TIMEOUT = 60  # seconds before timing out an API call
+GEMINI_STREAMING = False  # stream responses; stop as soon as "update_found" is false
 MAX_OUTPUT_TOKENS = 16000  # prevent JSON truncation on complex responses
+SUMMARY_BATCH_MODE = False  # default for --batch (several repos per Gemini request)
+SUMMARY_BATCH_SIZE = 4  # max repos per batch (each result needs ~3-4k output tokens)
+SUMMARY_BATCH_INPUT_TOKENS = 12000  # input budget per batch (~4 chars per token)
+SELECTION_POOL_SIZE = 18  # in-window hits collected before older ones are ranked
 
 GH_ACCESS_TOKEN = os.getenv("GH_ACCESS_TOKEN")
+ASYNC_PIPELINE = False  # default for --pipeline (prefetch repos during LLM calls)
+PIPELINE_QUEUE_SIZE = 8  # candidate repos fetched ahead of the summarizer
+VIP_FETCH_CONCURRENCY = 4  # parallel VIP fetches (keep low for secondary rate limits)
+GITHUB_POOL_SIZE = 10  # keep-alive connections in the shared GitHub session
+# Spread the remaining calls until reset once a rate-limit budget (core,
+# search, graphql) drops below this fraction of its limit
+GITHUB_PACE_BELOW = 0.1
+GITHUB_BACKEND = os.getenv("GITHUB_BACKEND", "rest")  # "rest" or "graphql" (batched)
+GRAPHQL_BATCH_SIZE = 30  # repos per GraphQL query
+GRAPHQL_MAX_BLOB_BYTES = 4_000_000  # changelog bytes fetched per GraphQL query
+# Skip repos whose pushed_at / latest release predate the date window
+# before downloading their changelog or releases
+PREFILTER_ENABLED = True
+# Changelogs larger than this are streamed from the top instead of downloaded
+# whole; reading stops past the newest dated sections or at the byte cap
+CHANGELOG_RANGED_THRESHOLD = 256 * 1024
+CHANGELOG_HEAD_MAX_BYTES = 512 * 1024
+# Estimated cost of one releases listing; with a date window the cheaper source
+# (changelog file or releases) is tried first, the other only if it has nothing new
+RELEASES_COST_BYTES = 16 * 1024
+
+# Search shards: sub-queries merged into one star-ordered stream. The pushed
+# date and fork filter are appended to each; the first three split the
+# original "topic:ai language:python stars:>500" query by star range.
+SEARCH_SHARDS = [
+    "topic:ai language:python stars:>5000",
+    "topic:ai language:python stars:1501..5000",
+    "topic:ai language:python stars:501..1500",
+    "topic:llm language:python stars:>500",
+    "topic:machine-learning language:python stars:>500",
+    "topic:llm language:typescript stars:>500",
+]
+# Per shard: 10 pages of 30 results caps each shard at 300 results, well
+# below the search API's own 1000-result limit
+SEARCH_MAX_PAGES = 10
+SEARCH_PREFETCH_PAGES = 2  # pages each shard fetches ahead of the consumer
+SEARCH_CACHE_ENABLED = True  # reuse search pages for the rest of the UTC day
+
+# Optional Prometheus textfile (node_exporter textfile collector) with each run's
+# spans, counters and meta.json numbers; unset to skip
+PROMETHEUS_TEXTFILE = os.getenv("PROMETHEUS_TEXTFILE")
+
+# --- Local caches ---
+CACHE_DIR = os.getenv("CACHE_DIR") or os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache"
+)
+HTTP_CACHE_ENABLED = True  # ETag-revalidated GitHub responses (304s are free)
+HTTP_CACHE_MAX_BYTES = 256 * 1024 * 1024  # evict least-recently-used beyond this
+SUMMARY_CACHE_ENABLED = True  # reuse parsed Gemini results for identical inputs
+SUMMARY_CACHE_MAX_BYTES = 32 * 1024 * 1024
+SUMMARY_CACHE_TTL = 30 * 24 * 3600  # seconds
+# Per-repo changelog SHA / release id / summaries, so unchanged repos are skipped
+STATE_STORE_ENABLED = True
+STATE_DB_PATH = os.path.join(CACHE_DIR, "state.sqlite3")
+# Per-date log of repo decisions; an interrupted run resumes from it
+JOURNAL_ENABLED = True
+JOURNAL_DIR = os.path.join(CACHE_DIR, "journal")
 
 # VIP Repositories to always check
 VIP_REPOS = [
@@ -126,6 +198,31 @@ Output Format (JSON):
 }}
 """
 
+# Several repos per request (batch mode); {entries} holds one block per repo
+BATCH_CHANGELOG_UPDATE_CHECK_PROMPT = """You are a Senior DevRel Engineer and Technical Writer.
+You are given CHANGELOG excerpts from several repositories. Each one has its own target date (YYYY-MM-DD).
+
+{entries}
+
+Instructions:
+1.  **One Result Per Repository**: Return exactly one object per repository in `results`, with `full_name` copied verbatim. Handle each repository independently.
+2.  **Identify Updates**: Check if the excerpt has an entry strictly matching ITS target date.
+    -   If NO: Output ONLY `{{"full_name": "<full_name>", "update_found": false}}` for that repository.
+    -   If YES: Set `update_found` to true and fill the fields below.
+3.  **title**: Release title/version.
+4.  **whats_new**: A list of specific, technical, factual bullet points describing WHAT changed. NEVER mention release cadence ("nightly", "daily", "weekly").
+5.  **why_important**: A paragraph (at least 3-4 sentences) explaining the practical benefit, the problem being solved and the before/after difference.
+6.  **try_it_out**: `language` plus `beginner`, `intermediate` and `advanced` objects, each with a short `label` and valid, copy-pasteable `code` (no placeholders).
+
+Output Format (JSON):
+{{
+  "results": [
+    {{"full_name": "org/repo-with-update", "update_found": true, "title": "...", "whats_new": ["..."], "why_important": "...", "try_it_out": {{"language": "python", "beginner": {{"label": "...", "code": "..."}}, "intermediate": {{"label": "...", "code": "..."}}, "advanced": {{"label": "...", "code": "..."}}}}}},
+    {{"full_name": "org/repo-without-update", "update_found": false}}
+  ]
+}}
+"""
+
 GLOBAL_SUMMARY_PROMPT = """You are a Senior AI Ecosystem Analyst.
 Your task is to analyze a collection of daily updates from major AI libraries/tools and identify cross-cutting themes, synergies, and potential conflicts.
 
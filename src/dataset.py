@@ -0,0 +1,56 @@
+import json
+import os
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# Bump when the shape of a day file changes; readers skip newer versions
+SCHEMA_VERSION = 1
+
+
+def day_path(data_dir: Path, date: str) -> Path:
+    return Path(data_dir) / f"{date}.json"
+
+
+def save_day(data_dir: Path, date: str, repos: List[Dict], global_summary_data):
+    """
+    Writes one day's final result (the rendered repo entries and the global
+    summary) to `data_dir/<date>.json`, atomically.
+    """
+    os.makedirs(data_dir, exist_ok=True)
+    path = day_path(data_dir, date)
+    payload = {
+        "schema_version": SCHEMA_VERSION,
+        "date": date,
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "repos": list(repos),
+        "global_summary_data": global_summary_data,
+    }
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(json.dumps(payload, indent=2, ensure_ascii=False))
+    os.replace(tmp_path, path)
+    return path
+
+
+def load_day(data_dir: Path, date: str) -> Optional[Dict]:
+    """Returns the stored day, or None if missing, unreadable or from a newer schema."""
+    try:
+        with open(day_path(data_dir, date), "r", encoding="utf-8") as f:
+            payload = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if payload.get("schema_version", 0) > SCHEMA_VERSION:
+        print(
+            f"⚠️ {date}: dataset schema {payload['schema_version']} is newer; skipping."
+        )
+        return None
+    return payload
+
+
+def list_days(data_dir: Path) -> List[str]:
+    """Stored dates, oldest first."""
+    data_dir = Path(data_dir)
+    if not data_dir.is_dir():
+        return []
+    return sorted(path.stem for path in data_dir.glob("*.json"))
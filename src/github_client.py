@@ -1,5 +1,10 @@
+import codecs
+import json
 import os
-import time
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from datetime import datetime, timezone, timedelta
 from github import Github, Auth, RateLimitExceededException, UnknownObjectException
 from tenacity import (
@@ -9,183 +14,1093 @@ from tenacity import (
     retry_if_exception_type,
 )
 from typing import Iterator, Dict, Optional
+from urllib.parse import quote, urlencode
 import base64
+import requests
+from urllib3.util.retry import Retry
+
+from github.Repository import Repository
 
 try:
-    from . import config
+    from . import config, telemetry
+    from .cache import DiskCache
+    from .changelog_parser import index_changelog
+    from .rate_limiter import GitHubRateScheduler
+    from .search import ShardedSearch
+    from .state_store import StateStore
 except ImportError:
     import config
+    import telemetry
+    from cache import DiskCache
+    from changelog_parser import index_changelog
+    from rate_limiter import GitHubRateScheduler
+    from search import ShardedSearch
+    from state_store import StateStore
 
 
-def get_github_client():
+# Process-wide client: one pooled keep-alive session shared by every call
+_github_client = None
+_github_client_lock = threading.Lock()
+
+
+def _transport_retry() -> Retry:
+    """
+    Retries connection errors and 5xx only. PyGithub's default GithubRetry
+    also sleeps on 403/429 inside urllib3, which would hide rate-limited
+    responses from _rate_scheduler, the one place those waits belong.
+    """
+    return Retry(
+        total=3,
+        backoff_factor=1,
+        status_forcelist=(500, 502, 503, 504),
+        respect_retry_after_header=False,
+    )
+
+
+def _create_github_client():
+    pool_size = getattr(config, "GITHUB_POOL_SIZE", 10)
     token = os.getenv("GH_ACCESS_TOKEN")
     if token:
         auth = Auth.Token(token)
-        return Github(auth=auth)
+        return Github(auth=auth, pool_size=pool_size, retry=_transport_retry())
     print(
         "Warning: No GH_ACCESS_TOKEN found. Using unauthenticated requests (Rate limit: 60/hr)."
     )
-    return Github()
+    return Github(pool_size=pool_size, retry=_transport_retry())
+
+
+def get_github_client():
+    """
+    Returns the shared GitHub client, creating it on first use.
+    Its connection pool is sized (GITHUB_POOL_SIZE) for the concurrent VIP fetchers.
+    """
+    global _github_client
+    if _github_client is None:
+        with _github_client_lock:
+            if _github_client is None:
+                _github_client = _create_github_client()
+    return _github_client
+
+
+def set_github_client(client) -> None:
+    """
+    Replaces the shared GitHub client (e.g. with a fake in tests).
+    Passing None closes the current client; the next call creates a fresh one.
+    """
+    global _github_client
+    with _github_client_lock:
+        previous = _github_client
+        _github_client = client
+    if client is None and previous is not None and hasattr(previous, "close"):
+        previous.close()
+
+
+# Header-driven pacing: separate budgets for core, search and graphql
+_rate_scheduler = GitHubRateScheduler(
+    pace_below=getattr(config, "GITHUB_PACE_BELOW", 0.1),
+    sleep=telemetry.timed_sleep("github_rate_limit_wait"),
+)
+_RATE_LIMIT_ATTEMPTS = 3
+
+
+def get_github_rate_stats() -> Dict:
+    """Per-resource requests, last known remaining/limit and time spent waiting."""
+    return _rate_scheduler.stats()
+
+
+def _is_rate_limited(status: int, headers: Dict) -> bool:
+    if status == 429:
+        return True
+    return status == 403 and (
+        headers.get("x-ratelimit-remaining") == "0" or "retry-after" in headers
+    )
+
+
+_exponential_wait = wait_exponential(multiplier=1, min=4, max=60)
+
+
+def _wait_for_github(retry_state) -> float:
+    """Tenacity wait: until GitHub's reset for rate-limit errors, exponential otherwise."""
+    error = retry_state.outcome.exception()
+    if isinstance(error, RateLimitExceededException):
+        headers = {k.lower(): v for k, v in (error.headers or {}).items()}
+        delay = _rate_scheduler.delay(headers.get("x-ratelimit-resource", "core"))
+        if delay:
+            return delay
+    return _exponential_wait(retry_state)
+
+
+# On-disk ETag cache for contents, releases and search pages
+_http_cache = None
+_http_stats = {"not_modified": 0, "downloaded": 0}
+_http_stats_lock = threading.Lock()
+
+
+def _get_http_cache() -> Optional[DiskCache]:
+    global _http_cache
+    if _http_cache is None and getattr(config, "HTTP_CACHE_ENABLED", True):
+        _http_cache = DiskCache(
+            os.path.join(config.CACHE_DIR, "github"),
+            max_bytes=getattr(config, "HTTP_CACHE_MAX_BYTES", 256 * 1024 * 1024),
+        )
+    return _http_cache
+
+
+def get_http_cache_stats() -> Dict:
+    """Hit/miss counters of the GitHub response cache (304s are free requests)."""
+    cache = _http_cache
+    stats = cache.stats() if cache else {}
+    with _http_stats_lock:
+        stats.update(_http_stats)
+    return stats
+
+
+def _count_http(outcome: str):
+    with _http_stats_lock:
+        _http_stats[outcome] += 1
+
+
+def _conditional_get(url: str, parameters: Optional[Dict] = None):
+    """
+    GET a REST endpoint through the shared client, revalidating with the cached
+    ETag/Last-Modified. A 304 is served from disk and costs no rate limit.
+    Returns the decoded JSON body; raises the usual PyGithub exceptions on errors.
+    """
+    requester = get_github_client().requester
+    cache = _get_http_cache()
+    key = f"{url}?{urlencode(sorted((parameters or {}).items()))}"
+
+    entry = cache.get(key) if cache else None
+    headers = {}
+    if entry:
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+
+    resource = "search" if url.startswith("/search/") else "core"
+    for attempt in range(_RATE_LIMIT_ATTEMPTS):
+        _rate_scheduler.wait(resource)
+        status, response_headers, body = requester.requestJson(
+            "GET", url, parameters=parameters, headers=headers
+        )
+        _rate_scheduler.update(resource, response_headers)
+        telemetry.count("github.requests")
+        if attempt + 1 < _RATE_LIMIT_ATTEMPTS and _is_rate_limited(
+            status, response_headers
+        ):
+            telemetry.count("github.rate_limited")
+            _rate_scheduler.backoff(resource, response_headers)
+            continue
+        break
+    if status == 304 and entry:
+        _count_http("not_modified")
+        telemetry.count("github.not_modified")
+        return entry["data"]
+    telemetry.count("github.bytes_downloaded", len(body or ""))
+
+    data = json.loads(body) if body else None
+    if status >= 400:
+        raise requester.createException(status, response_headers, data)
+
+    _count_http("downloaded")
+    etag = response_headers.get("etag")
+    last_modified = response_headers.get("last-modified")
+    if cache and (etag or last_modified):
+        cache.set(key, {"etag": etag, "last_modified": last_modified, "data": data})
+    return data
+
+
+# Per-repo state across runs: unchanged changelogs are not downloaded again
+_state_store = None
+_state_store_lock = threading.Lock()
+
+
+def get_state_store() -> Optional[StateStore]:
+    global _state_store
+    if _state_store is None and getattr(config, "STATE_STORE_ENABLED", True):
+        with _state_store_lock:
+            if _state_store is None:
+                _state_store = StateStore(
+                    getattr(
+                        config,
+                        "STATE_DB_PATH",
+                        os.path.join(config.CACHE_DIR, "state.sqlite3"),
+                    )
+                )
+    return _state_store
+
+
+def get_state_store_stats() -> Dict:
+    """Repos skipped as unchanged and summaries reused from earlier runs."""
+    return _state_store.stats() if _state_store else {}
+
+
+# Metadata pre-filter: drop repos that can't have a dated entry in the window
+# before any contents/releases request is made
+_prefilter_stats = {"passed": 0, "inactive": 0}
+_prefilter_lock = threading.Lock()
+
+
+def get_prefilter_stats() -> Dict:
+    """Pre-filter outcomes; every skip is a changelog/releases download avoided."""
+    with _prefilter_lock:
+        return dict(_prefilter_stats)
+
+
+def _as_datetime(value) -> Optional[datetime]:
+    if value is None or isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+def _prefilter_reason(
+    since: Optional[str], pushed_at, latest_release_at=None
+) -> Optional[str]:
+    """
+    Returns why a repo can be skipped for a window starting at `since`
+    (YYYY-MM-DD), or None if it may have an entry and must be fetched.
+    A new changelog entry needs a push and a new release needs a release
+    timestamp, so a repo with neither since the window started is skipped.
+    One day of slack covers changelog dates written in local time.
+    """
+    if since is None:
+        return None
+
+    cutoff = datetime.strptime(since, "%Y-%m-%d").replace(
+        tzinfo=timezone.utc
+    ) - timedelta(days=1)
+    activity = [
+        moment
+        for moment in (_as_datetime(pushed_at), _as_datetime(latest_release_at))
+        if moment is not None
+    ]
+    if not activity:
+        return None  # nothing to judge by: fetch it
+    newest = max(
+        moment if moment.tzinfo else moment.replace(tzinfo=timezone.utc)
+        for moment in activity
+    )
+    return "inactive" if newest < cutoff else None
+
+
+def _prefilter(full_name: str, since: Optional[str], **metadata) -> bool:
+    """Counts the outcome and returns True if the repo should be fetched."""
+    if not getattr(config, "PREFILTER_ENABLED", True):
+        return True
+    reason = _prefilter_reason(since, **metadata)
+    with _prefilter_lock:
+        _prefilter_stats[reason or "passed"] += 1
+    if reason:
+        print(f"  ⏭️ Skipping {full_name} before download ({reason}).")
+    return reason is None
 
 
 @retry(
     stop=stop_after_attempt(5),
-    wait=wait_exponential(multiplier=1, min=4, max=60),
+    wait=_wait_for_github,
     retry=retry_if_exception_type((RateLimitExceededException, ConnectionError)),
+    before_sleep=telemetry.record_retry("github"),
 )
 def get_repo_with_retry(repo_name):
     g = get_github_client()
-    return g.get_repo(repo_name)
+    with telemetry.span("repo_fetch"):
+        raw = _conditional_get(f"/repos/{repo_name}")
+    return g.create_from_raw_data(Repository, raw)
 
 
 @retry(
     stop=stop_after_attempt(5),
-    wait=wait_exponential(multiplier=1, min=4, max=60),
+    wait=_wait_for_github,
     retry=retry_if_exception_type((RateLimitExceededException, ConnectionError)),
+    before_sleep=telemetry.record_retry("github"),
 )
+def search_repos_raw(query, sort="stars", order="desc", page=0) -> list:
+    """One page of search results as raw repo dicts."""
+    with telemetry.span("search"):
+        data = _conditional_get(
+            "/search/repositories",
+            {"q": query, "sort": sort, "order": order, "page": page + 1},
+        )
+    return data["items"]
+
+
 def search_repos_with_retry(query, sort="stars", order="desc", page=0):
     g = get_github_client()
-    return g.search_repositories(query=query, sort=sort, order=order).get_page(page)
+    return [
+        g.create_from_raw_data(Repository, item)
+        for item in search_repos_raw(query, sort=sort, order=order, page=page)
+    ]
 
 
-def yield_vip_repos() -> Iterator[Dict]:
+def _content_info(
+    changelog: Optional[str],
+    changelog_sha: Optional[str] = None,
+    release_id: Optional[str] = None,
+    unchanged: bool = False,
+) -> Dict:
     """
-    Yields VIP repositories first.
+    Changelog text plus the version it came from. `unchanged` means the state
+    store has already seen this version; the text may then be None (not downloaded).
+    """
+    return {
+        "changelog": changelog,
+        "changelog_sha": changelog_sha,
+        "release_id": release_id,
+        "unchanged": unchanged,
+    }
+
+
+def _repo_record(repo, content: Dict) -> Dict:
+    return {
+        "repo_obj": repo,
+        "name": repo.name,
+        "full_name": repo.full_name,
+        "description": repo.description,
+        "url": repo.html_url,
+        "stars": repo.stargazers_count,
+        "updated_at": repo.updated_at.isoformat(),
+        **content,
+    }
+
+
+def _fetch_repo_rest(
+    repo_name: str, since: Optional[str] = None, prefiltered: bool = False
+) -> Optional[Dict]:
+    try:
+        repo = get_repo_with_retry(repo_name)
+        if (
+            since
+            and not prefiltered
+            and not _prefilter(repo.full_name, since, pushed_at=repo.pushed_at)
+        ):
+            return None
+        return _repo_record(repo, get_repo_content(repo, since))
+    except UnknownObjectException:
+        print(f"  -> Repo {repo_name} not found.")
+    except Exception as e:
+        print(f"  -> Error fetching {repo_name}: {e}")
+    return None
+
+
+def _fetch_repos_rest(
+    repo_names, since: Optional[str] = None, prefiltered: bool = False
+) -> list:
+    return [_fetch_repo_rest(repo_name, since, prefiltered) for repo_name in repo_names]
+
+
+def _use_graphql() -> bool:
+    return getattr(config, "GITHUB_BACKEND", "rest") == "graphql"
+
+
+def yield_vip_repos(
+    max_workers: Optional[int] = None, since: Optional[str] = None
+) -> Iterator[Dict]:
+    """
+    Yields VIP repositories first, in VIP_REPOS order.
+    Repos are prefetched on a bounded thread pool (VIP_FETCH_CONCURRENCY workers),
+    so later VIPs are usually downloaded by the time the consumer reaches them.
+    With `since` (YYYY-MM-DD), repos with no activity since then are skipped
+    before their changelog is downloaded, and large changelogs are read only
+    down to the first section older than `since`.
     """
     print("🌟 Checking VIP Repositories...")
-    for repo_name in config.VIP_REPOS:
-        try:
-            repo = get_repo_with_retry(repo_name)
-            content = get_changelog_content(repo) or get_releases_content(repo)
-
-            yield {
-                "repo_obj": repo,
-                "name": repo.name,
-                "full_name": repo.full_name,
-                "description": repo.description,
-                "url": repo.html_url,
-                "stars": repo.stargazers_count,
-                "updated_at": repo.updated_at.isoformat(),
-                "changelog": content,
-            }
-        except UnknownObjectException:
-            print(f"  -> Repo {repo_name} not found.")
-        except Exception as e:
-            print(f"  -> Error fetching VIP {repo_name}: {e}")
+    if max_workers is None:
+        max_workers = getattr(config, "VIP_FETCH_CONCURRENCY", 4)
+
+    if _use_graphql():
+        # One task per GraphQL batch instead of one per repo
+        batch_size = getattr(config, "GRAPHQL_BATCH_SIZE", 30)
+        names = list(config.VIP_REPOS)
+        tasks = [names[i : i + batch_size] for i in range(0, len(names), batch_size)]
+        fetch = fetch_repos_graphql
+    else:
+        tasks = [[repo_name] for repo_name in config.VIP_REPOS]
+        fetch = _fetch_repos_rest
 
+    executor = ThreadPoolExecutor(
+        max_workers=max(1, max_workers), thread_name_prefix="vip-fetch"
+    )
+    try:
+        # map() keeps input order, so priority semantics are unchanged
+        for records in executor.map(partial(fetch, since=since), tasks):
+            for record in records:
+                if record is not None:
+                    yield record
+    finally:
+        # Consumer may stop early (MAX_REPOS reached): drop queued fetches
+        executor.shutdown(wait=False, cancel_futures=True)
 
-def yield_active_ai_repos(days_lookback=3) -> Iterator[Dict]:
+
+def yield_active_ai_repos(
+    days_lookback=3, since: Optional[str] = None
+) -> Iterator[Dict]:
     """
     Yields active AI repositories, prioritized by stars.
+    `since` (YYYY-MM-DD, the oldest date being checked) enables the metadata
+    pre-filter (see get_prefilter_stats()) and bounds head-only reads of
+    large changelogs.
     """
     # 1. Yield VIPs first
-    yield from yield_vip_repos()
+    yield from yield_vip_repos(since=since)
 
     # 2. Search for others
-    get_github_client()
-
     start_date = datetime.now(timezone.utc) - timedelta(days=days_lookback)
     start_date_str = start_date.strftime("%Y-%m-%d")
 
-    # Query: Updated recently, High Stars, Decent Forks (Quality Filter)
-    # We remove 'sort=updated' and use 'sort=stars' to find the GIANTS that updated recently
-    query = f"topic:ai language:python pushed:>={start_date_str} stars:>500 forks:>50"
-
-    page = 0
+    # Sharded queries: Updated recently, High Stars, Decent Forks (Quality Filter),
+    # merged by stars to find the GIANTS that updated recently
+    print(f"Searching POPULAR AI repos (updated since {start_date_str})...")
+    search = _build_search(f"pushed:>={start_date_str} forks:>50")
+    results = iter(search)
+    g = get_github_client()
     seen_repos = set(config.VIP_REPOS)  # Don't re-yield VIPs
+    batch = []
 
-    while True:
-        try:
-            print(
-                f"Fetching page {page} of POPULAR AI repos (updated since {start_date_str})..."
-            )
-            repos = search_repos_with_retry(
-                query, sort="stars", order="desc", page=page
-            )
+    try:
+        for item in results:
+            if item["full_name"] in seen_repos:
+                continue
+            seen_repos.add(item["full_name"])
+            repo = g.create_from_raw_data(Repository, item)
+            # Search results already carry pushed_at
+            if since and not _prefilter(
+                repo.full_name, since, pushed_at=repo.pushed_at
+            ):
+                continue
 
-            if not repos:
-                print("No more repositories found.")
-                break
+            if _use_graphql():
+                # Batches of GRAPHQL_BATCH_SIZE (metadata + changelog + releases)
+                batch.append(repo.full_name)
+                if len(batch) >= getattr(config, "GRAPHQL_BATCH_SIZE", 30):
+                    yield from _graphql_records(batch, since)
+                    batch = []
+            else:
+                # Fetch content (Changelog OR Releases)
+                yield _repo_record(repo, get_repo_content(repo, since))
 
-            for repo in repos:
-                if repo.full_name in seen_repos:
-                    continue
-                seen_repos.add(repo.full_name)
+        if batch:
+            yield from _graphql_records(batch, since)
+        print("No more repositories found.")
+    finally:
+        # Consumer may stop early: stop the shard prefetchers
+        results.close()
 
-                # Fetch content (Changelog OR Releases)
-                content = get_changelog_content(repo) or get_releases_content(repo)
-
-                yield {
-                    "repo_obj": repo,
-                    "name": repo.name,
-                    "full_name": repo.full_name,
-                    "description": repo.description,
-                    "url": repo.html_url,
-                    "stars": repo.stargazers_count,
-                    "updated_at": repo.updated_at.isoformat(),
-                    "changelog": content,
-                }
-
-            page += 1
-
-        except RateLimitExceededException:
-            print("Rate limit exceeded. Waiting...")
-            time.sleep(60)
-        except Exception as e:
-            print(f"Error fetching page {page}: {e}")
-            break
+
+def _graphql_records(full_names, since) -> Iterator[Dict]:
+    # Already pre-filtered on the search results' pushed_at
+    for record in fetch_repos_graphql(full_names, since=since, prefiltered=True):
+        if record is not None:
+            yield record
+
+
+_last_search = None
+
+
+def get_search_stats() -> Dict:
+    """Shards, pages fetched vs. served from the day cache, and unique results."""
+    return _last_search.stats() if _last_search else {}
+
+
+def _build_search(qualifiers: str) -> ShardedSearch:
+    global _last_search
+    cache = None
+    if getattr(config, "SEARCH_CACHE_ENABLED", True):
+        cache = DiskCache(
+            os.path.join(config.CACHE_DIR, "search"),
+            max_bytes=16 * 1024 * 1024,
+            ttl_seconds=24 * 3600,
+        )
+    _last_search = ShardedSearch(
+        lambda query, page: search_repos_raw(
+            query, sort="stars", order="desc", page=page
+        ),
+        [f"{shard} {qualifiers}" for shard in config.SEARCH_SHARDS],
+        max_pages=getattr(config, "SEARCH_MAX_PAGES", 10),
+        prefetch_pages=getattr(config, "SEARCH_PREFETCH_PAGES", 2),
+        cache=cache,
+    )
+    return _last_search
+
+
+CHANGELOG_FILENAMES = [
+    "changelog.md",
+    "history.md",
+    "releases.md",
+    "changes.md",
+    "changelog.rst",
+    "history.rst",
+    "releases.rst",
+    "changes.rst",
+    "changelog.txt",
+    "history.txt",
+    "releases.txt",
+    "changes.txt",
+]
 
 
-def get_changelog_content(repo) -> Optional[str]:
+def _read_past_window(text: str, since: Optional[str]) -> bool:
+    """True once `text` holds every section from `since` on (newest entries come first)."""
+    dates = [section["date"] for section in index_changelog(text)]
+    if since:
+        # A heading older than the window closes the last section we need
+        return any(date < since for date in dates)
+    return len(dates) >= 3
+
+
+def _github_raw_headers() -> Dict:
+    token = os.getenv("GH_ACCESS_TOKEN")
+    return {"Authorization": f"token {token}"} if token else {}
+
+
+def _read_changelog_head(
+    url: str, since: Optional[str] = None, headers: Optional[Dict] = None
+) -> Optional[str]:
+    """
+    Streams a changelog from the top, stopping once it has read past the
+    newest dated sections or after CHANGELOG_HEAD_MAX_BYTES. Memory stays
+    bounded by the cap however big the file is. A trailing partial line is
+    dropped when the file wasn't read to the end.
+    """
+    max_bytes = getattr(config, "CHANGELOG_HEAD_MAX_BYTES", 512 * 1024)
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    request_headers = {"Range": f"bytes=0-{max_bytes - 1}", **(headers or {})}
+    text, read, complete = "", 0, True
     try:
-        contents = repo.get_contents("")
-        root_files = {file.name.lower(): file for file in contents}
-    except Exception:
+        with requests.get(
+            url, headers=request_headers, stream=True, timeout=30
+        ) as response:
+            if response.status_code >= 400:
+                return None
+            total = response.headers.get("Content-Range", "").rpartition("/")[2]
+            for chunk in response.iter_content(chunk_size=64 * 1024):
+                chunk = chunk[: max_bytes - read]
+                read += len(chunk)
+                text += decoder.decode(chunk)
+                if read >= max_bytes:
+                    complete = total.isdigit() and int(total) <= read
+                    break
+                if _read_past_window(text, since):
+                    complete = False
+                    break
+    except requests.RequestException as e:
+        print(f"  -> Error streaming changelog head: {e}")
         return None
+    finally:
+        telemetry.count("github.raw_downloads")
+        telemetry.count("github.bytes_downloaded", read)
 
-    filenames = [
-        "changelog.md",
-        "history.md",
-        "releases.md",
-        "changes.md",
-        "changelog.rst",
-        "history.rst",
-        "releases.rst",
-        "changes.rst",
-        "changelog.txt",
-        "history.txt",
-        "releases.txt",
-        "changes.txt",
+    if not complete and "\n" in text:
+        text = text[: text.rindex("\n") + 1]
+    return text or None
+
+
+def _raw_changelog_url(full_name: str, path: str) -> str:
+    return f"https://raw.githubusercontent.com/{full_name}/HEAD/{quote(path)}"
+
+
+def _changelog_entries(repo) -> list:
+    """Root directory entries that look like a changelog, in CHANGELOG_FILENAMES order."""
+    try:
+        contents = _conditional_get(f"/repos/{repo.full_name}/contents/")
+        root_files = {file["name"].lower(): file for file in contents}
+    except Exception:
+        return []
+    return [
+        root_files[filename]
+        for filename in CHANGELOG_FILENAMES
+        if filename in root_files
     ]
 
-    for filename in filenames:
-        if filename in root_files:
-            try:
-                content_file = root_files[filename]
-                if content_file.size > 1000000:
-                    continue
-                return base64.b64decode(content_file.content).decode("utf-8")
-            except Exception:
-                continue
 
+def _download_changelog(repo, entry, since: Optional[str] = None) -> Optional[str]:
+    if entry["size"] > getattr(config, "CHANGELOG_RANGED_THRESHOLD", 256 * 1024):
+        # Large history: only the newest sections at the top are needed
+        return _read_changelog_head(
+            entry.get("download_url")
+            or _raw_changelog_url(repo.full_name, entry["path"]),
+            since,
+            _github_raw_headers(),
+        )
+    try:
+        content_file = _conditional_get(
+            f"/repos/{repo.full_name}/contents/{quote(entry['path'])}"
+        )
+        return base64.b64decode(content_file["content"]).decode("utf-8")
+    except Exception:
+        return None
+
+
+def get_changelog_content(repo, since: Optional[str] = None) -> Optional[str]:
+    for entry in _changelog_entries(repo):
+        content = _download_changelog(repo, entry, since)
+        if content:
+            return content
     return None
 
 
+def get_changelog_blob(
+    full_name: str, sha: str, since: Optional[str] = None
+) -> Optional[str]:
+    """
+    Reads a changelog by blob SHA (used when an unchanged repo needs its text).
+    The raw blob is streamed head-only, as the file may be large.
+    """
+    requester = get_github_client().requester
+    return _read_changelog_head(
+        f"{requester.base_url}/repos/{full_name}/git/blobs/{sha}",
+        since,
+        {"Accept": "application/vnd.github.raw", **_github_raw_headers()},
+    )
+
+
+_BODY_ATX_HEADING = re.compile(r"^(#{1,6})(?=\s)")
+_BODY_UNDERLINE = re.compile(r"^(=+|-+)\s*$")
+
+
+def _demote_headings(body: str) -> str:
+    """
+    Nests a release body's headings below its `## [date] title` line: ATX
+    headings move down two levels and setext headings become `###`, so a body
+    starting with `# Highlights` doesn't end the dated section.
+    """
+    lines = body.splitlines()
+    demoted = []
+    in_fence = False
+    for line in lines:
+        stripped = line.strip()
+        if stripped.startswith("```") or stripped.startswith("~~~"):
+            in_fence = not in_fence
+        elif not in_fence:
+            if (
+                _BODY_UNDERLINE.match(stripped)
+                and demoted
+                and demoted[-1].strip()
+                and not demoted[-1].startswith((" ", "\t", "#", "-", "*"))
+            ):
+                demoted[-1] = f"### {demoted[-1].strip()}"
+                continue
+            line = _BODY_ATX_HEADING.sub(
+                lambda m: "#" * min(len(m.group(1)) + 2, 6), line
+            )
+        demoted.append(line)
+    return "\n".join(demoted)
+
+
+def _format_releases(releases) -> Optional[str]:
+    """
+    Formats (date_str, title, body) tuples as a pseudo-changelog.
+    """
+    if not releases:
+        return None
+
+    pseudo_changelog = "# Changelog (from GitHub Releases)\n\n"
+    for date_str, title, body in releases:
+        pseudo_changelog += f"## [{date_str}] {title}\n"
+        pseudo_changelog += f"{_demote_headings(body or '')}\n\n"
+    return pseudo_changelog
+
+
+def _list_releases(repo) -> list:
+    try:
+        return _conditional_get(f"/repos/{repo.full_name}/releases", {"per_page": 5})[
+            :5
+        ]
+    except Exception:
+        return []
+
+
+def _format_rest_releases(releases) -> Optional[str]:
+    return _format_releases(
+        [
+            (
+                (release.get("published_at") or release["created_at"])[:10],
+                release.get("name") or release["tag_name"],
+                release.get("body"),
+            )
+            for release in releases
+        ]
+    )
+
+
 def get_releases_content(repo) -> Optional[str]:
     """
     Fetches the last 5 releases and formats them as a pseudo-changelog.
     """
     try:
-        releases = repo.get_releases()[:5]
-        if not releases:
-            return None
+        return _format_rest_releases(_list_releases(repo))
+    except Exception:
+        return None
 
-        pseudo_changelog = "# Changelog (from GitHub Releases)\n\n"
-        for release in releases:
-            date_str = release.published_at.strftime("%Y-%m-%d")
-            pseudo_changelog += f"## [{date_str}] {release.title or release.tag_name}\n"
-            pseudo_changelog += f"{release.body}\n\n"
 
-        return pseudo_changelog
+def get_repo_content(repo, since: Optional[str] = None) -> Dict:
+    """
+    Changelog (or releases pseudo-changelog) for `repo`, tagged with its blob
+    SHA / latest release id. A changelog whose SHA the state store already
+    knows is not downloaded at all; a large one is read head-only down to `since`.
+    """
+    with telemetry.span("content_fetch"):
+        return _get_repo_content(repo, since)
+
+
+def _get_repo_content(repo, since: Optional[str] = None) -> Dict:
+    """
+    Resolves the repo's update source lazily. Candidates are the root
+    changelog files and the releases listing. Without `since` they are tried
+    in that order and the first one with text wins. With `since`, the cheapest
+    goes first and the next is only fetched when the previous one has no dated
+    section on or after `since`, so a stale CHANGELOG no longer hides
+    releases published daily.
+    """
+    store = get_state_store()
+    state = store.get_repo(repo.full_name) if store else None
+    sources = [
+        (
+            _changelog_cost(entry, state),
+            partial(_changelog_source, repo, entry, since, store),
+        )
+        for entry in _changelog_entries(repo)
+    ]
+    sources.append(
+        (
+            getattr(config, "RELEASES_COST_BYTES", 16 * 1024),
+            partial(_releases_source, repo, store),
+        )
+    )
+    if since:
+        sources.sort(key=lambda source: source[0])  # stable: ties keep file order
+
+    fallback = None
+    for _, load in sources:
+        content = load()
+        if content is None:
+            continue
+        if not since or _covers_window(content, since, state):
+            return content
+        # Nothing in the window here; keep it in case no other source has more
+        telemetry.count("github.source_fallthroughs")
+        fallback = fallback or content
+    return fallback or _content_info(None)
+
+
+def _changelog_cost(entry: Dict, state: Optional[Dict]) -> int:
+    """Expected download size: nothing if unchanged since last run, capped at the head for large files."""
+    sha = entry.get("sha")
+    if sha and state and state["changelog_sha"] == sha and state["changelog_dates"]:
+        return 0
+    size = entry.get("size") or 0
+    if size > getattr(config, "CHANGELOG_RANGED_THRESHOLD", 256 * 1024):
+        return min(size, getattr(config, "CHANGELOG_HEAD_MAX_BYTES", 512 * 1024))
+    return size
+
+
+def _changelog_source(repo, entry, since, store) -> Optional[Dict]:
+    sha = entry.get("sha")
+    if store and sha and store.is_unchanged(repo.full_name, changelog_sha=sha):
+        print(f"  💤 {repo.full_name}: changelog unchanged since last run.")
+        return _content_info(None, changelog_sha=sha, unchanged=True)
+    content = _download_changelog(repo, entry, since)
+    return _content_info(content, changelog_sha=sha) if content else None
+
+
+def _releases_source(repo, store) -> Optional[Dict]:
+    releases = _list_releases(repo)
+    try:
+        content = _format_rest_releases(releases)
     except Exception:
+        content = None
+    if not content:
         return None
+    release_id = str(releases[0]["id"]) if "id" in releases[0] else None
+    unchanged = bool(
+        store
+        and release_id
+        and store.is_unchanged(repo.full_name, release_id=release_id)
+    )
+    return _content_info(content, release_id=release_id, unchanged=unchanged)
+
+
+def _covers_window(content: Dict, since: str, state: Optional[Dict] = None) -> bool:
+    """
+    True if the source has a dated section on or after `since`. An unchanged,
+    not downloaded changelog is judged by the section dates stored for it.
+    """
+    if content["changelog"] is not None:
+        dates = [section["date"] for section in index_changelog(content["changelog"])]
+    else:
+        dates = (state or {}).get("changelog_dates") or []
+    return any(date >= since for date in dates)
+
+
+# --- GraphQL backend (GITHUB_BACKEND = "graphql") ---
+# Two queries per batch: metadata + root tree + releases, then changelog blobs.
+
+_GRAPHQL_REPO_FIELDS = """
+  name
+  nameWithOwner
+  description
+  url
+  stargazerCount
+  pushedAt
+  updatedAt
+  object(expression: "HEAD:") {
+    ... on Tree { entries { name type oid object { ... on Blob { byteSize } } } }
+  }
+  releases(first: 5, orderBy: {field: CREATED_AT, direction: DESC}) {
+    nodes { databaseId name tagName publishedAt createdAt description }
+  }
+"""
+
+
+def _graphql(query: str, variables: Dict) -> Dict:
+    requester = get_github_client().requester
+    for attempt in range(_RATE_LIMIT_ATTEMPTS):
+        _rate_scheduler.wait("graphql")
+        telemetry.count("github.graphql_requests")
+        try:
+            headers, data = requester.requestJsonAndCheck(
+                "POST",
+                requester.graphql_url,
+                input={"query": query, "variables": variables},
+            )
+        except RateLimitExceededException as e:
+            headers = {k.lower(): v for k, v in (e.headers or {}).items()}
+            _rate_scheduler.update("graphql", headers)
+            if attempt + 1 == _RATE_LIMIT_ATTEMPTS:
+                raise
+            _rate_scheduler.backoff("graphql", headers)
+            continue
+        _rate_scheduler.update("graphql", headers)
+        break
+    for error in data.get("errors") or []:
+        # Missing repos come back as null + NOT_FOUND; everything else is worth a log
+        if error.get("type") != "NOT_FOUND":
+            print(f"  -> GraphQL error: {error.get('message')}")
+    return data.get("data") or {}
+
+
+def _graphql_repo_query(full_names, selection: str, extra_vars=None) -> tuple:
+    """
+    Builds one aliased query (r0, r1, ...) selecting `selection` on each repo.
+    `extra_vars` maps alias index -> {var_name: (type, value)}.
+    """
+    params, parts, variables = [], [], {}
+    for i, full_name in enumerate(full_names):
+        owner, _, name = full_name.partition("/")
+        params.append(f"$o{i}: String!, $n{i}: String!")
+        variables[f"o{i}"] = owner
+        variables[f"n{i}"] = name
+        for var_name, (var_type, value) in (extra_vars or {}).get(i, {}).items():
+            params.append(f"${var_name}: {var_type}")
+            variables[var_name] = value
+        body = selection.replace("$IDX", str(i))
+        parts.append(f"r{i}: repository(owner: $o{i}, name: $n{i}) {{ {body} }}")
+    query = f"query({', '.join(params)}) {{\n" + "\n".join(parts) + "\n}"
+    return query, variables
+
+
+def _pick_changelog_entry(tree) -> Optional[Dict]:
+    entries = {
+        entry["name"].lower(): entry
+        for entry in (tree or {}).get("entries") or []
+        if entry.get("type") == "blob"
+    }
+    for filename in CHANGELOG_FILENAMES:
+        if filename in entries:
+            return entries[filename]
+    return None
+
+
+def _fetch_changelog_blobs(wanted) -> Dict:
+    """
+    Fetches changelog texts for `wanted` [(full_name, filename, size)], packing
+    as many blobs per query as GRAPHQL_MAX_BLOB_BYTES allows.
+    Returns {full_name: text}.
+    """
+    budget = getattr(config, "GRAPHQL_MAX_BLOB_BYTES", 4_000_000)
+    chunks, current, current_bytes = [], [], 0
+    for item in wanted:
+        if current and current_bytes + item[2] > budget:
+            chunks.append(current)
+            current, current_bytes = [], 0
+        current.append(item)
+        current_bytes += item[2]
+    if current:
+        chunks.append(current)
+
+    texts = {}
+    for chunk in chunks:
+        query, variables = _graphql_repo_query(
+            [full_name for full_name, _, _ in chunk],
+            "object(expression: $e$IDX) { ... on Blob { text isBinary } }",
+            {
+                i: {f"e{i}": ("String!", f"HEAD:{filename}")}
+                for i, (_, filename, _) in enumerate(chunk)
+            },
+        )
+        data = _graphql(query, variables)
+        for i, (full_name, _, _) in enumerate(chunk):
+            blob = (data.get(f"r{i}") or {}).get("object") or {}
+            if blob.get("text") and not blob.get("isBinary"):
+                texts[full_name] = blob["text"]
+    return texts
+
+
+def _graphql_record(node: Dict, content: Dict) -> Dict:
+    return {
+        "repo_obj": None,
+        "name": node["name"],
+        "full_name": node["nameWithOwner"],
+        "description": node["description"],
+        "url": node["url"],
+        "stars": node["stargazerCount"],
+        "updated_at": datetime.fromisoformat(node["updatedAt"]).isoformat(),
+        **content,
+    }
+
+
+def fetch_repos_graphql(
+    full_names, since: Optional[str] = None, prefiltered: bool = False
+) -> list:
+    """
+    Fetches repo records for `full_names` through the GraphQL API, in order.
+    Each GRAPHQL_BATCH_SIZE chunk costs two queries; missing repos yield None.
+    With `since`, repos the metadata pre-filter rejects also yield None and
+    their blobs are never requested, unless `prefiltered` says the caller
+    has already checked them.
+    Falls back to REST for a chunk if its GraphQL query fails.
+    """
+    batch_size = getattr(config, "GRAPHQL_BATCH_SIZE", 30)
+    records = []
+    for start in range(0, len(full_names), batch_size):
+        chunk = list(full_names[start : start + batch_size])
+        try:
+            with telemetry.span("graphql_batch"):
+                records.extend(_fetch_graphql_chunk(chunk, since, prefiltered))
+        except Exception as e:
+            print(f"  -> GraphQL batch failed ({e}). Falling back to REST...")
+            records.extend(_fetch_repos_rest(chunk, since, prefiltered))
+    return records
+
+
+def _latest_release_at(node: Dict) -> Optional[str]:
+    releases = (node.get("releases") or {}).get("nodes") or []
+    stamps = [r.get("publishedAt") or r.get("createdAt") for r in releases]
+    return max((stamp for stamp in stamps if stamp), default=None)
+
+
+def _graphql_releases_content(node: Dict, store) -> Optional[Dict]:
+    releases = (node.get("releases") or {}).get("nodes") or []
+    changelog = _format_releases(
+        [
+            (
+                (release.get("publishedAt") or release["createdAt"])[:10],
+                release.get("name") or release["tagName"],
+                release.get("description"),
+            )
+            for release in releases
+        ]
+    )
+    if not changelog:
+        return None
+    release_id = (
+        str(releases[0]["databaseId"]) if releases[0].get("databaseId") else None
+    )
+    return _content_info(
+        changelog,
+        release_id=release_id,
+        unchanged=bool(
+            store
+            and release_id
+            and store.is_unchanged(node["nameWithOwner"], release_id=release_id)
+        ),
+    )
+
+
+def _fetch_graphql_chunk(
+    full_names, since: Optional[str] = None, prefiltered: bool = False
+) -> list:
+    query, variables = _graphql_repo_query(full_names, "...RepoFields")
+    query += f"\nfragment RepoFields on Repository {{{_GRAPHQL_REPO_FIELDS}}}"
+    data = _graphql(query, variables)
+
+    nodes = [data.get(f"r{i}") for i in range(len(full_names))]
+    skipped = set()
+    if since and not prefiltered:
+        for node in nodes:
+            if node and not _prefilter(
+                node["nameWithOwner"],
+                since,
+                pushed_at=node.get("pushedAt"),
+                latest_release_at=_latest_release_at(node),
+            ):
+                skipped.add(node["nameWithOwner"])
+    store = get_state_store()
+    wanted, large, shas, unchanged = [], [], {}, set()
+    # Releases come with the metadata query, so with `since` they are the
+    # cheapest source: when they cover the window the blob isn't fetched
+    from_releases, release_contents = {}, {}
+    for node in nodes:
+        if not node or node["nameWithOwner"] in skipped:
+            continue
+        full_name = node["nameWithOwner"]
+        entry = _pick_changelog_entry(node.get("object"))
+        stale = False
+        if entry:
+            shas[full_name] = entry.get("oid")
+            if (
+                store
+                and entry.get("oid")
+                and store.is_unchanged(full_name, changelog_sha=entry["oid"])
+            ):
+                # Same blob as last run: don't download it again
+                state = store.get_repo(full_name)
+                if not since or _covers_window(_content_info(None), since, state):
+                    unchanged.add(full_name)
+                    continue
+                stale = True
+        if since:
+            releases = _graphql_releases_content(node, store)
+            release_contents[full_name] = releases
+            if releases and _covers_window(releases, since):
+                from_releases[full_name] = releases
+                continue
+        if stale:
+            unchanged.add(full_name)
+            continue
+        if entry:
+            size = (entry.get("object") or {}).get("byteSize", 0)
+            if size > getattr(config, "CHANGELOG_RANGED_THRESHOLD", 256 * 1024):
+                large.append((full_name, entry["name"]))
+                continue
+            wanted.append((full_name, entry["name"], size))
+    texts = _fetch_changelog_blobs(wanted) if wanted else {}
+    for full_name, filename in large:
+        # Too big for a blob query: read the newest sections only
+        texts[full_name] = _read_changelog_head(
+            _raw_changelog_url(full_name, filename), since, _github_raw_headers()
+        )
+
+    records = []
+    for full_name, node in zip(full_names, nodes):
+        if not node:
+            print(f"  -> Repo {full_name} not found.")
+            records.append(None)
+            continue
+        name = node["nameWithOwner"]
+        if name in skipped:
+            records.append(None)
+            continue
+        if name in from_releases:
+            content = from_releases[name]
+        elif name in unchanged:
+            print(f"  💤 {name}: changelog unchanged since last run.")
+            content = _content_info(None, changelog_sha=shas[name], unchanged=True)
+        elif texts.get(name):
+            content = _content_info(texts[name], changelog_sha=shas.get(name))
+        else:
+            if name not in release_contents:
+                release_contents[name] = _graphql_releases_content(node, store)
+            content = release_contents[name] or _content_info(None)
+        records.append(_graphql_record(node, content))
+    return records
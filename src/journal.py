@@ -0,0 +1,50 @@
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict, List
+
+
+class RunJournal:
+    """
+    Append-only NDJSON log of one date's repo decisions. Each line is
+    flushed and fsynced as soon as it is written, so a run that dies
+    halfway can be resumed without re-buying summaries. A torn last line
+    (crash mid-write) is ignored on load.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+
+    def load(self) -> List[Dict]:
+        try:
+            lines = self.path.read_text(encoding="utf-8").splitlines()
+        except OSError:
+            return []
+        records = []
+        for line in lines:
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                continue  # torn write
+        return records
+
+    def append(self, record: Dict):
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, line.encode("utf-8"))
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+
+    def discard(self):
+        """The run finished: nothing left to resume."""
+        with self._lock:
+            try:
+                self.path.unlink()
+            except OSError:
+                pass
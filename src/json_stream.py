@@ -0,0 +1,60 @@
+import json
+
+
+class IncrementalJSONParser:
+    """
+    Parses a JSON object that arrives in pieces, e.g. a streamed Gemini
+    response. feed() returns the top-level fields completed by each piece,
+    so a caller can act on `update_found` or show `title` long before the
+    rest is generated. Nested values are reported once they are complete.
+    """
+
+    def __init__(self):
+        self.fields = {}
+        self.text = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._member_start = None  # where the current top-level member begins
+
+    def feed(self, chunk: str) -> dict:
+        """Consumes `chunk`; returns {key: value} for members it completed."""
+        self.text += chunk
+        completed = {}
+        text = self.text
+        for i in range(self._pos, len(text)):
+            char = text[i]
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char in "{[":
+                self._depth += 1
+                if self._depth == 1:
+                    self._member_start = i + 1
+            elif char in "}]":
+                if self._depth == 1:
+                    self._complete(text[self._member_start : i], completed)
+                self._depth -= 1
+            elif char == "," and self._depth == 1:
+                self._complete(text[self._member_start : i], completed)
+                self._member_start = i + 1
+        self._pos = len(text)
+        return completed
+
+    def _complete(self, member: str, completed: dict):
+        member = member.strip()
+        if not member:
+            return
+        try:
+            parsed = json.loads("{" + member + "}")
+        except ValueError:
+            return  # not an object member (top-level array) or malformed
+        self.fields.update(parsed)
+        completed.update(parsed)
@@ -1,38 +1,117 @@
+import asyncio
 import json
 import time
 from datetime import datetime, timezone, timedelta
 from pathlib import Path
-from jinja2 import Template
-import markdown
 import argparse
 
-from src.github_client import yield_active_ai_repos
-from src.summarizer import check_for_daily_update, generate_global_summary
+from src import config
+from src.changelog_parser import index_changelog
+from src.dataset import list_days, load_day, save_day
+from src.github_client import (
+    get_changelog_blob,
+    get_github_rate_stats,
+    get_http_cache_stats,
+    get_prefilter_stats,
+    get_search_stats,
+    get_state_store,
+    get_state_store_stats,
+    yield_active_ai_repos,
+)
+from src.journal import RunJournal
+from src.pipeline import run_pipeline
+from src.render import get_render_stats, render_feed, render_page, render_site
+from src.state_store import source_of
+from src.summarizer import (
+    check_for_updates,
+    find_update_dates,
+    generate_global_summary,
+    get_model_health_stats,
+    get_rate_limit_stats,
+    get_summary_cache_stats,
+    summarize_updates_batch,
+)
+from src.telemetry import (
+    count,
+    get_telemetry_stats,
+    span,
+    write_prometheus_textfile,
+)
 
 
 def generate_rss_feed(repos, target_date_str, base_dir: Path):
     """Generates an RSS feed for the updates."""
-    template_path = base_dir / "site" / "rss_template.xml"
-    with open(template_path, "r", encoding="utf-8") as f:
-        rss_template = f.read()
-
-    t = Template(rss_template)
-    t.globals["markdown"] = lambda text: (
-        markdown.markdown(text, extensions=["extra"]) if text else ""
+    return render_feed(
+        repos,
+        datetime.now(timezone.utc).strftime("%a, %d %b %Y %H:%M:%S GMT"),
+        site_dir=base_dir / "site",
     )
-    return t.render(
-        repos=repos,
-        build_date=datetime.now(timezone.utc).strftime("%a, %d %b %Y %H:%M:%S GMT"),
+
+
+def _reuse_from_state(store, repo_data, dates_to_check):
+    """
+    Decides an unchanged repo from stored state. Returns (summary_data, date),
+    (None, None) if the stored version has no section in the window, or None
+    if the text is needed after all (no stored summary for the matching date).
+    """
+    source = _state_source(repo_data)
+    section_dates = store.section_dates(repo_data["full_name"], source)
+    if section_dates is None:
+        return None
+    matched = [d for d in dates_to_check if d in section_dates]
+    if not matched:
+        return None, None
+    summary_data = store.get_summary(repo_data["full_name"], source, matched[0])
+    if summary_data is None:
+        return None
+    print(f"  ♻️ Reusing stored summary for {matched[0]}.")
+    return summary_data, matched[0]
+
+
+def _state_source(repo_data):
+    """Which of the repo's sources (changelog file or releases) its text came from."""
+    return source_of(repo_data.get("changelog_sha"), repo_data.get("release_id"))
+
+
+def _record_state(store, repo_data, index):
+    """Remembers which version of the repo's changelog was processed and its dated sections."""
+    if not store or not (repo_data.get("changelog_sha") or repo_data.get("release_id")):
+        return
+    dates = [section["date"] for section in index]
+    store.record_repo(
+        repo_data["full_name"],
+        changelog_sha=repo_data.get("changelog_sha"),
+        release_id=repo_data.get("release_id"),
+        section_dates=dates or None,
     )
 
 
-def generate_site(target_date_str: str = None, force: bool = False):
+def _open_journal(target_date_str):
+    """The run journal for this date, or None if journaling is disabled."""
+    if not getattr(config, "JOURNAL_ENABLED", True):
+        return None
+    directory = getattr(config, "JOURNAL_DIR", str(Path(config.CACHE_DIR) / "journal"))
+    return RunJournal(Path(directory) / f"{target_date_str}.ndjson")
+
+
+def generate_site(
+    target_date_str: str = None,
+    force: bool = False,
+    pipeline: bool = None,
+    batch: bool = None,
+    base_dir: Path = None,
+):
     if not target_date_str:
         target_date_str = datetime.now(timezone.utc).strftime("%Y-%m-%d")
 
+    if pipeline is None:
+        pipeline = getattr(config, "ASYNC_PIPELINE", False)
+    if batch is None:
+        batch = getattr(config, "SUMMARY_BATCH_MODE", False)
+
     print(f"🚀 Starting Real-Time AI Changelog Aggregation for {target_date_str}...")
 
-    BASE_DIR = Path(__file__).parent.parent
+    BASE_DIR = base_dir or Path(__file__).parent.parent
     site_dir = BASE_DIR / "site"
     site_dir.mkdir(exist_ok=True)
 
@@ -57,7 +136,7 @@ def generate_site(target_date_str: str = None, force: bool = False):
     )
     dates_to_check = [target_date_str]
 
-    # Add previous 2 days as fallback
+    # Add previous 2 days as fallback (all checked in a single local scan)
     for i in range(1, 3):
         prev_date = target_date - timedelta(days=i)
         dates_to_check.append(prev_date.strftime("%Y-%m-%d"))
@@ -70,76 +149,226 @@ def generate_site(target_date_str: str = None, force: bool = False):
     secondary_list = []
 
     checked_count = 0
-    repo_generator = yield_active_ai_repos(days_lookback=3)
+    done = set()  # repos already decided, this run or an interrupted one
+
+    journal = _open_journal(target_date_str)
+    if journal:
+        for record in journal.load():
+            done.add(record["full_name"])
+            entry = record.get("entry")
+            if entry:
+                (primary_list if entry["is_fresh"] else secondary_list).append(entry)
+        checked_count = len(done)
+        if done:
+            print(
+                f"⏯️ Resuming from journal: {len(done)} repos already checked, "
+                f"{len(primary_list) + len(secondary_list)} updates kept."
+            )
+    # Oldest date in the window: anything inactive since then is skipped early
+    repo_generator = yield_active_ai_repos(days_lookback=3, since=dates_to_check[-1])
 
     start_time = time.time()
 
-    for repo_data in repo_generator:
+    store = get_state_store()
+    pending = []  # (repo_data, found_date) awaiting a batch request
+    deferred = []  # older-date hits, summarized only if they make the final cut
+    indexes = {}  # full_name -> changelog index, scanned once per repo
+    batch_size = getattr(config, "SUMMARY_BATCH_SIZE", 4)
+    pool_size = max(MAX_REPOS, getattr(config, "SELECTION_POOL_SIZE", 2 * MAX_REPOS))
+
+    def log_decision(repo_data, outcome, entry=None):
+        done.add(repo_data["full_name"])
+        if journal:
+            record = {"full_name": repo_data["full_name"], "outcome": outcome}
+            if entry:
+                record["entry"] = entry
+            journal.append(record)
+
+    def record_result(repo_data, summary_data, found_date):
+        if not summary_data:
+            print("  -> No recent updates found.")
+            log_decision(repo_data, "no_update")
+            return
+
+        is_fresh = found_date == dates_to_check[0]
+        print(f"  ✅ FOUND UPDATE for {found_date}!")
+        # Which model answered and how long it took (absent for cached summaries)
+        served_by = summary_data.pop("served_by", None)
+        if store and (repo_data.get("changelog_sha") or repo_data.get("release_id")):
+            store.record_summary(
+                repo_data["full_name"],
+                _state_source(repo_data),
+                found_date,
+                summary_data,
+            )
+
+        # Prepare repo object
+        repo_entry = {
+            "name": repo_data["name"],
+            "full_name": repo_data["full_name"],
+            "description": repo_data["description"],
+            "url": repo_data["url"],
+            "stars": repo_data["stars"],
+            "summary_data": summary_data,
+            "update_date": found_date,
+            "is_fresh": is_fresh,
+            "served_by": served_by,
+            "title": summary_data.get("title", "Update"),
+            # For RSS
+            "pub_date": datetime.strptime(found_date, "%Y-%m-%d").strftime(
+                "%a, %d %b %Y 00:00:00 GMT"
+            ),
+        }
+
+        log_decision(repo_data, "update", repo_entry)
+        if is_fresh:
+            primary_list.append(repo_entry)
+        else:
+            print(f"  ⚠️ Found older update for {found_date}")
+            secondary_list.append(repo_entry)
+
+    def flush_pending():
+        if not pending:
+            return
+        results = summarize_updates_batch(
+            [
+                {
+                    "full_name": repo_data["full_name"],
+                    "content": repo_data["changelog"],
+                    "date": found_date,
+                    "index": indexes.get(repo_data["full_name"]),
+                }
+                for repo_data, found_date in pending
+            ]
+        )
+        for repo_data, found_date in pending:
+            print(f"  {repo_data['full_name']}:")
+            record_result(repo_data, results.get(repo_data["full_name"]), found_date)
+        pending.clear()
+
+    def handle_repo(repo_data) -> bool:
+        """Decides one candidate; returns True once the search should stop."""
+        nonlocal checked_count
+        if repo_data["full_name"] in done:
+            return False
         checked_count += 1
         print(
             f"[{checked_count}/{CHECK_LIMIT}] Checking {repo_data['full_name']} (Stars: {repo_data['stars']})..."
         )
 
+        if repo_data.get("unchanged") and store:
+            reused = _reuse_from_state(store, repo_data, dates_to_check)
+            if reused is not None:
+                record_result(repo_data, *reused)
+                return should_stop()
+            if repo_data["changelog"] is None and repo_data.get("changelog_sha"):
+                repo_data["changelog"] = get_changelog_blob(
+                    repo_data["full_name"],
+                    repo_data["changelog_sha"],
+                    since=dates_to_check[-1],
+                )
+
         if not repo_data["changelog"]:
             print("  -> No CHANGELOG or Releases found. Skipping.")
-            continue
+            log_decision(repo_data, "no_changelog")
+            return False
+        index = indexes[repo_data["full_name"]] = index_changelog(
+            repo_data["changelog"]
+        )
+        _record_state(store, repo_data, index)
 
-        # Check Today
-        summary_data = check_for_daily_update(repo_data["changelog"], dates_to_check[0])
+        # Phase one: decide locally, spend no quota on entries that may not be shown
+        matched = find_update_dates(repo_data["changelog"], dates_to_check, index)
+        if not matched:
+            print("  -> No recent updates found.")
+            log_decision(repo_data, "no_update")
+        elif matched[0] != dates_to_check[0]:
+            # Ranked against the other older hits once the search is over
+            print(f"  🗂️ Older entry for {matched[0]} kept as a candidate.")
+            deferred.append((repo_data, matched[0]))
+        elif batch:
+            # Fresh entries always make the cut: summarize several per request
+            print(f"  📥 Entry for {matched[0]} queued for batch summary.")
+            pending.append((repo_data, matched[0]))
+            if (
+                len(pending) >= batch_size
+                or len(primary_list) + len(pending) >= MAX_REPOS
+            ):
+                flush_pending()
+        else:
+            summary_data, found_date = check_for_updates(
+                repo_data["changelog"], matched[:1], index
+            )
+            record_result(repo_data, summary_data, found_date)
 
-        found_date = dates_to_check[0]
-        is_fresh = True
+        return should_stop()
 
-        if not summary_data:
-            # Check Yesterday (Fallback)
-            print(
-                f"  -> No update for {dates_to_check[0]}. Checking {dates_to_check[1]}..."
-            )
-            summary_data = check_for_daily_update(
-                repo_data["changelog"], dates_to_check[1]
-            )
-            found_date = dates_to_check[1]
-            is_fresh = False
-
-        if summary_data:
-            print(f"  ✅ FOUND UPDATE for {found_date}!")
-
-            # Prepare repo object
-            repo_entry = {
-                "name": repo_data["name"],
-                "full_name": repo_data["full_name"],
-                "description": repo_data["description"],
-                "url": repo_data["url"],
-                "stars": repo_data["stars"],
-                "summary_data": summary_data,
-                "update_date": found_date,
-                "is_fresh": is_fresh,
-                "title": summary_data.get("title", "Update"),
-                # For RSS
-                "pub_date": datetime.strptime(found_date, "%Y-%m-%d").strftime(
-                    "%a, %d %b %Y 00:00:00 GMT"
-                ),
-            }
-
-            if is_fresh:
-                primary_list.append(repo_entry)
-            else:
-                print(f"  ⚠️ Found older update for {found_date}")
-                secondary_list.append(repo_entry)
-        else:
-            print("  -> No recent updates found.")
+    def should_stop() -> bool:
+        # Fresh entries outrank everything; older ones only fill what is left
+        fresh = len(primary_list) + len(pending)
+        if fresh >= MAX_REPOS:
+            print(f"🎉 Secured {MAX_REPOS} fresh updates!")
+            return True
 
-        # Check termination condition (including both fresh and recent updates)
-        total_secured = len(primary_list) + len(secondary_list)
-        if total_secured >= MAX_REPOS:
+        older = len(secondary_list) + len(deferred)
+        if fresh + older >= pool_size:
             print(
-                f"🎉 Secured {MAX_REPOS} updates (Fresh: {len(primary_list)}, Recent: {len(secondary_list)})!"
+                f"🎉 Collected {pool_size} candidates (Fresh: {fresh}, Older: {older})!"
             )
-            break
+            return True
 
         if checked_count >= CHECK_LIMIT:
             print("⚠️ Reached check limit. Stopping search.")
-            break
+            return True
+        return False
+
+    def summarize_deferred():
+        """Phase two: older candidates by stars, only as many as still fit."""
+        deferred.sort(key=lambda candidate: candidate[0]["stars"] or 0, reverse=True)
+        while deferred:
+            needed = MAX_REPOS - len(primary_list) - len(secondary_list)
+            if needed <= 0:
+                break
+            chosen = deferred[:needed]
+            del deferred[:needed]
+            print(f"🗂️ Summarizing the top {len(chosen)} older candidates...")
+            if batch:
+                pending.extend(chosen)
+                flush_pending()
+                continue
+            for repo_data, found_date in chosen:
+                print(f"  {repo_data['full_name']}:")
+                summary_data, found_date = check_for_updates(
+                    repo_data["changelog"],
+                    [found_date],
+                    indexes.get(repo_data["full_name"]),
+                )
+                record_result(repo_data, summary_data, found_date)
+        if deferred:
+            print(
+                f"💤 Skipped {len(deferred)} lower-ranked candidates; no LLM calls spent."
+            )
+            count("selection.skipped", len(deferred))
+
+    if done and should_stop():
+        print("⏭️ Journal already covers this date; skipping the search.")
+    elif pipeline:
+        # Fetch stage fills a bounded queue while the summarizer drains it
+        print("🔀 Async pipeline: overlapping GitHub fetches with LLM calls.")
+        asyncio.run(
+            run_pipeline(
+                repo_generator,
+                handle_repo,
+                queue_size=getattr(config, "PIPELINE_QUEUE_SIZE", 8),
+            )
+        )
+    else:
+        for repo_data in repo_generator:
+            if handle_repo(repo_data):
+                break
+    # Batch mode: summarize whatever is still queued
+    flush_pending()
+    summarize_deferred()
 
     # Combine lists
     # Prioritize fresh updates
@@ -155,26 +384,20 @@ def generate_site(target_date_str: str = None, force: bool = False):
     if final_repos:
         print(f"🎨 Generating dashboard with {len(final_repos)} updates...")
         print("🧠 Generating global ecosystem analysis...")
-        global_summary_data = generate_global_summary(final_repos)
+        with span("global_summary"):
+            global_summary_data = generate_global_summary(final_repos)
     else:
         print("⚠️ No updates found at all (Fresh or Recent). Skipping global summary.")
 
     try:
-        template_file = site_dir / "template.html"
-        with open(template_file, "r", encoding="utf-8") as f:
-            template_content = f.read()
-            template = Template(template_content)
-            template.globals["markdown"] = lambda text: (
-                markdown.markdown(text, extensions=["extra"]) if text else ""
-            )
+        # Durable result first: templates can be re-applied with --rerender-only
+        save_day(site_dir / "data", target_date_str, final_repos, global_summary_data)
 
-        html = template.render(
-            title="AI Changelog Insights",
-            date=target_date_str,
-            repos=final_repos,
-            global_summary_data=global_summary_data,
-            generated_at=datetime.now(timezone.utc).strftime("%H:%M UTC"),
-        )
+        # Index, archive and feed from one render pass
+        with span("render"):
+            html, rss_xml = render_site(
+                final_repos, global_summary_data, target_date_str, site_dir=site_dir
+            )
 
         # Write Main Index
         index_file = site_dir / "index.html"
@@ -187,7 +410,6 @@ def generate_site(target_date_str: str = None, force: bool = False):
         print(f"📦 Archived to {archive_path}")
 
         # Write RSS Feed
-        rss_xml = generate_rss_feed(final_repos, target_date_str, BASE_DIR)
         rss_file = site_dir / "feed.xml"
         with open(rss_file, "w", encoding="utf-8") as f:
             f.write(rss_xml)
@@ -195,18 +417,37 @@ def generate_site(target_date_str: str = None, force: bool = False):
 
         # 3. Save metadata
         meta_file = site_dir / "meta.json"
+        meta = {
+            "last_updated": datetime.now(timezone.utc).isoformat(),
+            "target_date": target_date_str,
+            "repo_count": len(final_repos),
+            "duration_seconds": time.time() - start_time,
+            "http_cache": get_http_cache_stats(),
+            "github_rate_limit": get_github_rate_stats(),
+            "prefilter": get_prefilter_stats(),
+            "search": get_search_stats(),
+            "state_store": get_state_store_stats(),
+            "summary_cache": get_summary_cache_stats(),
+            "gemini_quota": get_rate_limit_stats(),
+            "model_health": get_model_health_stats(),
+            # Model and LLM seconds behind each rendered repo; null = cache or stored state
+            "served_by": {
+                repo["full_name"]: repo.get("served_by") for repo in final_repos
+            },
+            "markdown_memo": get_render_stats(),
+            # Where the time went: per-stage spans and API/retry/fallback counters
+            "telemetry": get_telemetry_stats(),
+        }
         with open(meta_file, "w", encoding="utf-8") as f:
-            json.dump(
-                {
-                    "last_updated": datetime.now(timezone.utc).isoformat(),
-                    "target_date": target_date_str,
-                    "repo_count": len(final_repos),
-                    "duration_seconds": time.time() - start_time,
-                },
-                f,
-                indent=2,
-            )
+            json.dump(meta, f, indent=2)
 
+        textfile = getattr(config, "PROMETHEUS_TEXTFILE", None)
+        if textfile:
+            write_prometheus_textfile(textfile, meta)
+            print(f"📈 Metrics exported to {textfile}")
+
+        if journal:
+            journal.discard()
         print("✅ Site updated successfully!")
 
     except Exception as e:
@@ -216,10 +457,77 @@ def generate_site(target_date_str: str = None, force: bool = False):
         traceback.print_exc()
 
 
+def rerender_site(base_dir: Path = None) -> int:
+    """
+    Rebuilds index, archives and feed from the stored per-day datasets in
+    site/data/ only: no GitHub or Gemini calls. Returns the number of days rendered.
+    """
+    site_dir = (base_dir or Path(__file__).parent.parent) / "site"
+    data_dir = site_dir / "data"
+    archive_dir = site_dir / "archives"
+    archive_dir.mkdir(exist_ok=True)
+
+    days = [day for day in (load_day(data_dir, d) for d in list_days(data_dir)) if day]
+    if not days:
+        print(f"⚠️ No datasets found in {data_dir}. Nothing to re-render.")
+        return 0
+
+    generated_at = datetime.now(timezone.utc).strftime("%H:%M UTC")
+    for day in days[:-1]:
+        html = render_page(
+            day["repos"],
+            day["global_summary_data"],
+            day["date"],
+            generated_at,
+            site_dir,
+        )
+        with open(archive_dir / f"{day['date']}.html", "w", encoding="utf-8") as f:
+            f.write(html)
+
+    # Newest day is also the index page and the feed
+    latest = days[-1]
+    html, rss_xml = render_site(
+        latest["repos"],
+        latest["global_summary_data"],
+        latest["date"],
+        site_dir=site_dir,
+    )
+    for path in (archive_dir / f"{latest['date']}.html", site_dir / "index.html"):
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(html)
+    with open(site_dir / "feed.xml", "w", encoding="utf-8") as f:
+        f.write(rss_xml)
+
+    print(
+        f"🖌️ Re-rendered {len(days)} day(s) from {data_dir} (latest {latest['date']})."
+    )
+    return len(days)
+
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument("--date", help="Target date YYYY-MM-DD", default=None)
     parser.add_argument("--force", help="Force regeneration", action="store_true")
+    parser.add_argument(
+        "--pipeline",
+        help="Overlap GitHub fetching with LLM calls (async producer/consumer)",
+        action="store_true",
+        default=None,
+    )
+    parser.add_argument(
+        "--batch",
+        help="Summarize several repos per Gemini request",
+        action="store_true",
+        default=None,
+    )
+    parser.add_argument(
+        "--rerender-only",
+        help="Rebuild index, archives and feed from site/data/ without any API calls",
+        action="store_true",
+    )
     args = parser.parse_args()
 
-    generate_site(args.date, args.force)
+    if args.rerender_only:
+        rerender_site()
+    else:
+        generate_site(args.date, args.force, pipeline=args.pipeline, batch=args.batch)
@@ -0,0 +1,217 @@
+import json
+import math
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+
+from src.rate_limiter import quota_timezone
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+# Call outcomes kept per model: a usable answer, unparseable or cut-off JSON, or an API error
+OK, INVALID, TRUNCATED, ERROR = "ok", "invalid", "truncated", "error"
+
+
+def _percentile(values: list, q: float):
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(q * len(ordered)) - 1)]
+
+
+def next_quota_reset(now: float) -> float:
+    """Timestamp of the next quota-day boundary: midnight Pacific, as in DailyQuotaLedger."""
+    local = datetime.fromtimestamp(now, quota_timezone())
+    midnight = (local + timedelta(days=1)).replace(
+        hour=0, minute=0, second=0, microsecond=0
+    )
+    return midnight.timestamp()
+
+
+class ModelHealth:
+    """
+    Circuit breaker per Gemini model, persisted as JSON so it outlives the
+    process. A circuit opens when a daily quota runs out (until the quota
+    resets) or after `failure_threshold` consecutive failed calls (for
+    `cooldown` seconds). Once that time has passed, one probe call is let
+    through: success closes the circuit, failure reopens it for twice as
+    long (up to `max_cooldown`).
+
+    Also keeps the outcome (OK, INVALID, TRUNCATED, ERROR) and latency of
+    each model's last `window` calls; rank() orders the fallback chain from
+    them.
+    """
+
+    def __init__(
+        self,
+        path,
+        failure_threshold: int = 3,
+        cooldown: float = 300,
+        max_cooldown: float = 6 * 3600,
+        window: int = 50,
+        clock=time.time,
+    ):
+        self.path = path
+        self.failure_threshold = max(1, failure_threshold)
+        self.cooldown = cooldown
+        self.max_cooldown = max(cooldown, max_cooldown)
+        self.window = window
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._models = {}
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self._models = json.load(f).get("models", {})
+        except (OSError, ValueError, AttributeError):
+            self._models = {}
+
+    def _save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"models": self._models}, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def _entry(self, model: str) -> dict:
+        return self._models.setdefault(
+            model,
+            {
+                "state": CLOSED,
+                "open_until": None,
+                "reason": None,
+                "failures": 0,
+                "cooldown": self.cooldown,
+                "recent": [],  # [outcome, latency_seconds or None], oldest first
+            },
+        )
+
+    def _open(self, entry: dict, until: float, reason: str):
+        entry.update(state=OPEN, open_until=until, reason=reason)
+
+    def state(self, model: str) -> str:
+        """CLOSED, OPEN, or HALF_OPEN once an open circuit's time is up."""
+        with self._lock:
+            entry = self._models.get(model)
+            if entry is None or entry["state"] == CLOSED:
+                return CLOSED
+            if entry["state"] == OPEN and self._clock() < entry["open_until"]:
+                return OPEN
+            return HALF_OPEN
+
+    def allow(self, model: str) -> bool:
+        """False while the circuit is open; the first call after that is a probe."""
+        state = self.state(model)
+        if state == HALF_OPEN:
+            with self._lock:
+                self._entry(model)["state"] = HALF_OPEN
+        return state != OPEN
+
+    def record_success(self, model: str, latency: float, outcome: str = OK):
+        """The model answered; `outcome` says whether the answer was usable."""
+        with self._lock:
+            entry = self._entry(model)
+            self._remember(entry, outcome, latency)
+            entry.update(
+                state=CLOSED,
+                open_until=None,
+                reason=None,
+                failures=0,
+                cooldown=self.cooldown,
+            )
+            self._save()
+
+    def record_failure(self, model: str, reason: str, latency: float = None):
+        with self._lock:
+            entry = self._entry(model)
+            self._remember(entry, ERROR, latency)
+            entry["failures"] += 1
+            if entry["state"] == HALF_OPEN:
+                # Failed probe: back off twice as long before the next one
+                entry["cooldown"] = min(entry["cooldown"] * 2, self.max_cooldown)
+                self._open(entry, self._clock() + entry["cooldown"], reason)
+            elif entry["failures"] >= self.failure_threshold:
+                self._open(entry, self._clock() + entry["cooldown"], reason)
+            self._save()
+
+    def trip(self, model: str, until: float, reason: str):
+        """Opens the circuit until a known time, e.g. when the daily quota resets."""
+        with self._lock:
+            entry = self._entry(model)
+            self._open(entry, until, reason)
+            self._save()
+
+    def _remember(self, entry: dict, outcome: str, latency):
+        entry["recent"].append(
+            [outcome, round(latency, 3) if latency is not None else None]
+        )
+        del entry["recent"][: -self.window]
+
+    def _performance(self, entry: dict) -> dict:
+        recent = entry["recent"]
+        answered = [
+            lat for outcome, lat in recent if outcome != ERROR and lat is not None
+        ]
+
+        def rate(*outcomes):
+            if not recent:
+                return 0.0
+            return round(sum(1 for o, _ in recent if o in outcomes) / len(recent), 3)
+
+        return {
+            "recent_calls": len(recent),
+            "success_rate": rate(OK),
+            "error_rate": rate(ERROR),
+            "truncation_rate": rate(TRUNCATED),
+            "invalid_rate": rate(INVALID),
+            "p50_latency_seconds": _percentile(answered, 0.5) if answered else None,
+            "p95_latency_seconds": _percentile(answered, 0.95) if answered else None,
+        }
+
+    def performance(self, model: str) -> dict:
+        with self._lock:
+            return self._performance(self._models.get(model) or {"recent": []})
+
+    def rank(
+        self, models: list, min_samples: int = 5, min_success_rate: float = 0.9
+    ) -> list:
+        """
+        Fallback order: models proven reliable (at least `min_samples` recent
+        calls, `min_success_rate` of them usable), fastest p50 first; then
+        models without enough history, in the given order; then unreliable ones.
+        """
+        reliable, unknown, unreliable = [], [], []
+        for model in models:
+            perf = self.performance(model)
+            if (
+                perf["recent_calls"] < min_samples
+                or perf["p50_latency_seconds"] is None
+            ):
+                unknown.append(model)
+            elif perf["success_rate"] >= min_success_rate:
+                reliable.append((perf["p50_latency_seconds"], model))
+            else:
+                unreliable.append(model)
+        # sorted() is stable: equally fast models keep their configured order
+        return (
+            [m for _, m in sorted(reliable, key=lambda item: item[0])]
+            + unknown
+            + unreliable
+        )
+
+    def snapshot(self) -> dict:
+        now = self._clock()
+        with self._lock:
+            stats = {}
+            for model, entry in sorted(self._models.items()):
+                stats[model] = {
+                    "state": entry["state"],
+                    "open_for_seconds": round(max(0, entry["open_until"] - now))
+                    if entry["state"] == OPEN and entry["open_until"]
+                    else 0,
+                    "reason": entry["reason"],
+                    **self._performance(entry),
+                }
+            return stats
@@ -0,0 +1,60 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable
+
+_DONE = object()
+
+
+async def _produce(iterator, queue: asyncio.Queue, executor: ThreadPoolExecutor):
+    loop = asyncio.get_running_loop()
+    while True:
+        # Blocking GitHub I/O runs on the fetch thread, not the event loop
+        item = await loop.run_in_executor(executor, next, iterator, _DONE)
+        await queue.put(item)
+        if item is _DONE:
+            return
+
+
+async def run_pipeline(
+    source: Iterable, handle: Callable[[dict], bool], queue_size: int = 8
+) -> int:
+    """
+    Overlaps fetching with processing: a fetch stage pulls items from `source`
+    (a blocking generator) into a bounded queue while `handle(item)` drains it
+    in order on a worker thread. `handle` returns True to stop early; the fetch
+    stage is then cancelled, its in-flight item is awaited and `source` is
+    closed, so no fetches are left running. Returns the number of items handled.
+    """
+    iterator = iter(source)
+    queue = asyncio.Queue(maxsize=max(1, queue_size))
+    fetch_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="fetch")
+    producer = asyncio.create_task(_produce(iterator, queue, fetch_executor))
+    handled = 0
+    try:
+        while True:
+            getter = asyncio.ensure_future(queue.get())
+            done, _ = await asyncio.wait(
+                {getter, producer}, return_when=asyncio.FIRST_COMPLETED
+            )
+            if getter not in done:
+                # Producer died before queueing anything else: surface its error
+                getter.cancel()
+                producer.result()
+                break
+            item = getter.result()
+            if item is _DONE:
+                break
+            handled += 1
+            if await asyncio.to_thread(handle, item):
+                break
+    finally:
+        producer.cancel()
+        try:
+            await producer
+        except asyncio.CancelledError:
+            pass
+        # Let the in-flight next() finish before closing the generator
+        await asyncio.to_thread(fetch_executor.shutdown, wait=True)
+        if hasattr(iterator, "close"):
+            iterator.close()
+    return handled
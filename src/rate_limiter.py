@@ -0,0 +1,283 @@
+import json
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Optional
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+# Gemini's daily quotas reset at midnight Pacific time, not UTC
+QUOTA_TIMEZONE = "America/Los_Angeles"
+
+
+def quota_timezone():
+    try:
+        return ZoneInfo(QUOTA_TIMEZONE)
+    except ZoneInfoNotFoundError:  # no tz database (Windows without tzdata)
+        return timezone.utc
+
+
+class TokenBucket:
+    """
+    Requests-per-minute limiter. Holds up to `capacity` tokens and refills
+    `rate_per_minute` of them per minute; acquire() only sleeps when empty.
+    """
+
+    def __init__(
+        self,
+        rate_per_minute: float,
+        capacity: int = 1,
+        clock=time.monotonic,
+        sleep=time.sleep,
+    ):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = max(1, capacity)
+        self.tokens = float(self.capacity)
+        self._clock = clock
+        self._sleep = sleep
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = self._clock()
+        self.tokens = min(
+            self.capacity, self.tokens + (now - self._updated) * self.rate
+        )
+        self._updated = now
+
+    def acquire(self) -> float:
+        """Takes one token, sleeping just long enough if none is left. Returns seconds waited."""
+        waited = 0.0
+        with self._lock:
+            self._refill()
+            while self.tokens < 1:
+                delay = (1 - self.tokens) / self.rate
+                self._sleep(delay)
+                waited += delay
+                self._refill()
+            self.tokens -= 1
+        return waited
+
+
+class DailyQuotaLedger:
+    """
+    Per-model request counts for the current quota day (Pacific time, when
+    Gemini resets its daily limits), persisted as JSON so the budget survives
+    across runs. Counts reset when the day changes.
+    """
+
+    def __init__(self, path, daily_limit: int):
+        self.path = path
+        self.daily_limit = daily_limit
+        self._lock = threading.Lock()
+        self._date = None
+        self._counts = {}
+        self._load()
+
+    @staticmethod
+    def _today() -> str:
+        return datetime.now(quota_timezone()).strftime("%Y-%m-%d")
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self._date = data.get("date")
+            self._counts = data.get("models", {})
+        except (OSError, ValueError):
+            self._date, self._counts = None, {}
+
+    def _save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"date": self._date, "models": self._counts}, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def _roll_over(self):
+        today = self._today()
+        if self._date != today:
+            self._date, self._counts = today, {}
+
+    def used(self, model: str) -> int:
+        with self._lock:
+            self._roll_over()
+            return self._counts.get(model, 0)
+
+    def remaining(self, model: str) -> int:
+        return max(0, self.daily_limit - self.used(model))
+
+    def record(self, model: str):
+        with self._lock:
+            self._roll_over()
+            self._counts[model] = self._counts.get(model, 0) + 1
+            self._save()
+
+    def mark_exhausted(self, model: str):
+        """The API reported the daily quota as spent; trust it over our count."""
+        with self._lock:
+            self._roll_over()
+            self._counts[model] = max(self._counts.get(model, 0), self.daily_limit)
+            self._save()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            self._roll_over()
+            return {"date": self._date, "requests": dict(self._counts)}
+
+
+class RateLimiter:
+    """
+    Gemini request budget: one token bucket per model for requests per minute,
+    plus a shared DailyQuotaLedger for requests per day.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: float,
+        daily_limit: int,
+        ledger_path,
+        burst: int = 1,
+        sleep=time.sleep,
+        clock=time.monotonic,
+    ):
+        self.requests_per_minute = requests_per_minute
+        self.burst = burst
+        self.ledger = DailyQuotaLedger(ledger_path, daily_limit)
+        self.waited_seconds = 0.0
+        self._sleep = sleep
+        self._clock = clock
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def _bucket(self, model: str) -> TokenBucket:
+        with self._lock:
+            if model not in self._buckets:
+                self._buckets[model] = TokenBucket(
+                    self.requests_per_minute,
+                    self.burst,
+                    clock=self._clock,
+                    sleep=self._sleep,
+                )
+            return self._buckets[model]
+
+    def has_budget(self, model: str) -> bool:
+        return self.ledger.remaining(model) > 0
+
+    def acquire(self, model: str) -> Optional[float]:
+        """
+        Waits for a per-minute token and books the request against today's
+        budget. Returns seconds waited, or None if the daily budget is spent.
+        """
+        if not self.has_budget(model):
+            return None
+        waited = self._bucket(model).acquire()
+        self.ledger.record(model)
+        with self._lock:
+            self.waited_seconds += waited
+        return waited
+
+    def mark_exhausted(self, model: str):
+        self.ledger.mark_exhausted(model)
+
+    def stats(self) -> dict:
+        stats = self.ledger.snapshot()
+        stats["daily_limit"] = self.ledger.daily_limit
+        stats["waited_seconds"] = round(self.waited_seconds, 2)
+        return stats
+
+
+class GitHubRateScheduler:
+    """
+    Paces GitHub API calls from the rate-limit headers of earlier responses.
+    Budgets are tracked per resource ("core", "search", "graphql"), each from
+    its own X-RateLimit-Remaining/Reset values. Once a budget falls below
+    `pace_below` of its limit, the remaining calls are spread evenly until
+    the reset. An empty budget sleeps until exactly the reset time.
+    """
+
+    def __init__(self, pace_below: float = 0.1, clock=time.time, sleep=time.sleep):
+        self.pace_below = pace_below
+        self._clock = clock
+        self._sleep = sleep
+        self._budgets = {}
+        self._lock = threading.Lock()
+
+    def _budget(self, resource: str) -> dict:
+        return self._budgets.setdefault(
+            resource,
+            {
+                "requests": 0,
+                "limit": None,
+                "remaining": None,
+                "reset": None,
+                "waited_seconds": 0.0,
+            },
+        )
+
+    def delay(self, resource: str) -> float:
+        """Seconds to wait before the next call against `resource`."""
+        with self._lock:
+            budget = self._budget(resource)
+            remaining, reset = budget["remaining"], budget["reset"]
+            if remaining is None or reset is None:
+                return 0.0
+            until_reset = reset - self._clock()
+            if until_reset <= 0:
+                return 0.0
+            if remaining <= 0:
+                return until_reset + 1  # reset is in whole seconds
+            if remaining < (budget["limit"] or 0) * self.pace_below:
+                return until_reset / remaining
+            return 0.0
+
+    def wait(self, resource: str) -> float:
+        """Sleeps as long as `resource`'s budget requires. Returns seconds waited."""
+        delay = self.delay(resource)
+        if delay > 0:
+            self._pause(resource, delay)
+        return delay
+
+    def _pause(self, resource: str, seconds: float):
+        if seconds >= 5:
+            print(f"  ⏳ GitHub {resource} budget: waiting {seconds:.0f}s...")
+        self._sleep(seconds)
+        with self._lock:
+            self._budget(resource)["waited_seconds"] += seconds
+
+    def update(self, resource: str, headers: dict):
+        """Records a response; `headers` keys are expected in lower case."""
+        headers = headers or {}
+        resource = headers.get("x-ratelimit-resource") or resource
+        with self._lock:
+            budget = self._budget(resource)
+            budget["requests"] += 1
+            for field in ("limit", "remaining", "reset"):
+                value = headers.get(f"x-ratelimit-{field}")
+                if value is not None and str(value).isdigit():
+                    budget[field] = int(value)
+
+    def backoff(self, resource: str, headers: dict) -> float:
+        """
+        Sleeps after a rate-limited response (already passed to update()):
+        Retry-After for secondary limits, else until the primary budget
+        resets (60s if unknown). Returns seconds waited.
+        """
+        headers = headers or {}
+        retry_after = headers.get("retry-after")
+        if retry_after is not None and str(retry_after).isdigit():
+            delay = float(retry_after)
+        else:
+            delay = self.delay(headers.get("x-ratelimit-resource") or resource)
+            delay = delay or 60.0
+        self._pause(resource, delay)
+        return delay
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                resource: dict(
+                    budget, waited_seconds=round(budget["waited_seconds"], 2)
+                )
+                for resource, budget in self._budgets.items()
+            }
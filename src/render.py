@@ -0,0 +1,130 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Optional
+
+import markdown
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
+
+try:
+    from . import config
+except ImportError:
+    import config
+
+SITE_DIR = Path(__file__).parent.parent / "site"
+PAGE_TEMPLATE = "template.html"
+FEED_TEMPLATE = "rss_template.xml"
+
+
+class MarkdownMemo:
+    """
+    Markdown → HTML through one reusable converter, memoized by content hash
+    so the same text (e.g. `why_important` in page and feed, or across many
+    rebuilt days) is only converted once.
+    """
+
+    def __init__(self, max_entries: int = 4096):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._converter = markdown.Markdown(extensions=["extra"])
+        self._memo = OrderedDict()
+        self._lock = threading.Lock()
+
+    def convert(self, text) -> str:
+        if not text:
+            return ""
+        key = hashlib.sha256(str(text).encode("utf-8")).hexdigest()
+        with self._lock:
+            if key in self._memo:
+                self._memo.move_to_end(key)
+                self.hits += 1
+                return self._memo[key]
+            html = self._converter.reset().convert(str(text))
+            self.misses += 1
+            self._memo[key] = html
+            if len(self._memo) > self.max_entries:
+                self._memo.popitem(last=False)
+        return html
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses}
+
+
+_markdown = MarkdownMemo()
+_environments = {}
+_environments_lock = threading.Lock()
+
+
+def get_environment(site_dir: Optional[Path] = None) -> Environment:
+    """
+    Shared Jinja environment for `site_dir`: templates are loaded once and
+    recompiled only when the file changes; compiled bytecode is kept under
+    CACHE_DIR/jinja so later processes skip parsing too.
+    """
+    site_dir = Path(site_dir or SITE_DIR)
+    with _environments_lock:
+        env = _environments.get(site_dir)
+        if env is None:
+            env = Environment(
+                loader=FileSystemLoader(str(site_dir)),
+                bytecode_cache=FileSystemBytecodeCache(_bytecode_dir(), "%s.cache"),
+            )
+            # Templates use it both as a filter and as a function
+            env.filters["markdown"] = _markdown.convert
+            env.globals["markdown"] = _markdown.convert
+            _environments[site_dir] = env
+    return env
+
+
+def _bytecode_dir() -> str:
+    directory = os.path.join(config.CACHE_DIR, "jinja")
+    os.makedirs(directory, exist_ok=True)
+    return directory
+
+
+def render_page(
+    repos, global_summary_data, date: str, generated_at: str, site_dir=None
+) -> str:
+    return (
+        get_environment(site_dir)
+        .get_template(PAGE_TEMPLATE)
+        .render(
+            title="AI Changelog Insights",
+            date=date,
+            repos=repos,
+            global_summary_data=global_summary_data,
+            generated_at=generated_at,
+        )
+    )
+
+
+def render_feed(repos, build_date: str, site_dir=None) -> str:
+    return (
+        get_environment(site_dir)
+        .get_template(FEED_TEMPLATE)
+        .render(repos=repos, build_date=build_date)
+    )
+
+
+def render_site(repos, global_summary_data, date: str, site_dir=None) -> tuple:
+    """
+    Renders the day page (used for both index and archive) and the RSS feed in
+    one pass; Markdown fragments shared by both are converted once.
+    Returns (html, rss_xml).
+    """
+    now = datetime.now(timezone.utc)
+    html = render_page(
+        repos, global_summary_data, date, now.strftime("%H:%M UTC"), site_dir
+    )
+    rss_xml = render_feed(repos, now.strftime("%a, %d %b %Y %H:%M:%S GMT"), site_dir)
+    return html, rss_xml
+
+
+def get_render_stats() -> Dict:
+    """Markdown memo hits/misses."""
+    return _markdown.stats()
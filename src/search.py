@@ -0,0 +1,126 @@
+import heapq
+import queue
+import threading
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterator, List
+
+_DONE = object()
+
+
+class ShardedSearch:
+    """
+    Splits repository discovery into several search sub-queries ("shards")
+    and merges them into one star-ordered, de-duplicated stream.
+
+    `fetch_page(query, page)` returns one page of raw repo dicts sorted by
+    stars (descending). Each shard pages ahead on its own thread into a
+    bounded queue (`prefetch_pages` pages), so the consumer rarely waits on
+    search latency. Pages are cached for the UTC day if a `cache` is given.
+    """
+
+    def __init__(
+        self,
+        fetch_page: Callable[[str, int], List[Dict]],
+        queries: List[str],
+        max_pages: int = 10,
+        prefetch_pages: int = 2,
+        page_size: int = 30,
+        cache=None,
+    ):
+        self.fetch_page = fetch_page
+        self.queries = list(queries)
+        self.max_pages = max_pages
+        self.page_size = page_size
+        self.queue_size = max(1, prefetch_pages) * page_size
+        self.cache = cache
+        self.pages_fetched = 0
+        self.pages_cached = 0
+        self.results = 0
+        self._lock = threading.Lock()
+
+    def _page(self, query: str, page: int) -> List[Dict]:
+        day = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+        key = f"{day}|{query}|{page}"
+        items = self.cache.get(key) if self.cache else None
+        if items is not None:
+            with self._lock:
+                self.pages_cached += 1
+            return items
+
+        items = self.fetch_page(query, page)
+        with self._lock:
+            self.pages_fetched += 1
+        if self.cache:
+            self.cache.set(key, items)
+        return items
+
+    @staticmethod
+    def _put(out: queue.Queue, item, stop: threading.Event) -> bool:
+        while not stop.is_set():
+            try:
+                out.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _produce(self, query: str, out: queue.Queue, stop: threading.Event):
+        try:
+            for page in range(self.max_pages):
+                items = self._page(query, page)
+                for item in items:
+                    if not self._put(out, item, stop):
+                        return
+                if len(items) < self.page_size:
+                    break  # last page
+        except Exception as e:
+            print(f"  -> Search shard '{query}' stopped: {e}")
+        finally:
+            self._put(out, _DONE, stop)
+
+    def __iter__(self) -> Iterator[Dict]:
+        stop = threading.Event()
+        queues = []
+        for query in self.queries:
+            out = queue.Queue(maxsize=self.queue_size)
+            threading.Thread(
+                target=self._produce,
+                args=(query, out, stop),
+                name="search-shard",
+                daemon=True,
+            ).start()
+            queues.append(out)
+
+        def pull(shard: int, heap: list):
+            item = queues[shard].get()
+            if item is not _DONE:
+                heapq.heappush(
+                    heap, (-(item.get("stargazers_count") or 0), shard, id(item), item)
+                )
+
+        heap = []
+        seen = set()
+        try:
+            for shard in range(len(queues)):
+                pull(shard, heap)
+            # k-way merge: every shard is star-ordered, so the heap top is the global max
+            while heap:
+                _, shard, _, item = heapq.heappop(heap)
+                if item["full_name"] not in seen:
+                    seen.add(item["full_name"])
+                    with self._lock:
+                        self.results += 1
+                    yield item
+                # Refill after yielding so the consumer never waits on this shard first
+                pull(shard, heap)
+        finally:
+            stop.set()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "shards": len(self.queries),
+                "pages_fetched": self.pages_fetched,
+                "pages_cached": self.pages_cached,
+                "results": self.results,
+            }
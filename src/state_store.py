@@ -0,0 +1,181 @@
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from typing import Optional
+
+# Bump when the tables change; older state is dropped and rebuilt on the next run
+_SCHEMA_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS repos (
+    full_name TEXT PRIMARY KEY,
+    changelog_sha TEXT,
+    changelog_dates TEXT,
+    release_id TEXT,
+    release_dates TEXT,
+    checked_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS summaries (
+    full_name TEXT NOT NULL,
+    source TEXT NOT NULL,
+    date TEXT NOT NULL,
+    summary TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    PRIMARY KEY (full_name, source, date)
+);
+"""
+
+CHANGELOG, RELEASES = "changelog", "releases"
+
+# Per source: the column holding its version and the one holding its section dates
+_SOURCE_COLUMNS = {
+    CHANGELOG: ("changelog_sha", "changelog_dates"),
+    RELEASES: ("release_id", "release_dates"),
+}
+
+
+def source_of(changelog_sha: str = None, release_id: str = None) -> str:
+    """The source a version belongs to: a changelog blob SHA wins over a release id."""
+    return CHANGELOG if changelog_sha else RELEASES
+
+
+class StateStore:
+    """
+    Per-repo state kept across runs in a small SQLite file. Each source (the
+    changelog file and the releases listing) has its own last seen version
+    (blob SHA or latest release id), the dates of its sections at that
+    version, and the summaries produced from it. A new version of one source
+    only drops that source's summaries.
+    """
+
+    def __init__(self, path):
+        self.path = str(path)
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        # Used from the VIP fetch threads and the pipeline worker
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        if self._conn.execute("PRAGMA user_version").fetchone()[0] < _SCHEMA_VERSION:
+            self._conn.executescript(
+                "DROP TABLE IF EXISTS repos; DROP TABLE IF EXISTS summaries;"
+                f" PRAGMA user_version = {_SCHEMA_VERSION};"
+            )
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+        self._unchanged_repos = set()  # counted once per repo, however often probed
+        self.summaries_reused = 0
+
+    @staticmethod
+    def _now() -> str:
+        return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+    def get_repo(self, full_name: str) -> Optional[dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT changelog_sha, changelog_dates, release_id, release_dates"
+                " FROM repos WHERE full_name = ?",
+                (full_name,),
+            ).fetchone()
+        if row is None:
+            return None
+        return {
+            "changelog_sha": row[0],
+            "changelog_dates": json.loads(row[1]) if row[1] is not None else None,
+            "release_id": row[2],
+            "release_dates": json.loads(row[3]) if row[3] is not None else None,
+        }
+
+    def section_dates(self, full_name: str, source: str) -> Optional[list]:
+        """Dated sections of `source` at its last recorded version."""
+        state = self.get_repo(full_name)
+        return state[_SOURCE_COLUMNS[source][1]] if state else None
+
+    def is_unchanged(
+        self, full_name: str, changelog_sha: str = None, release_id: str = None
+    ) -> bool:
+        """True if that source was seen before at exactly this version."""
+        state = self.get_repo(full_name)
+        version = changelog_sha or release_id
+        version_column, dates_column = _SOURCE_COLUMNS[
+            source_of(changelog_sha, release_id)
+        ]
+        unchanged = bool(
+            state
+            and version
+            and state[dates_column] is not None
+            and state[version_column] == version
+        )
+        if unchanged:
+            with self._lock:
+                self._unchanged_repos.add(full_name)
+        return unchanged
+
+    def record_repo(
+        self,
+        full_name: str,
+        changelog_sha: str = None,
+        release_id: str = None,
+        section_dates: Optional[list] = None,
+    ):
+        """
+        Stores the version of the source just processed, leaving the other
+        source's state alone. `section_dates` of None means it has no dated
+        headings, so it is never treated as unchanged.
+        """
+        source = source_of(changelog_sha, release_id)
+        version_column, dates_column = _SOURCE_COLUMNS[source]
+        version = changelog_sha or release_id
+        dates = json.dumps(sorted(set(section_dates))) if section_dates else None
+        with self._lock, self._conn:
+            previous = self._conn.execute(
+                f"SELECT {version_column} FROM repos WHERE full_name = ?",
+                (full_name,),
+            ).fetchone()
+            if previous is None or previous[0] != version:
+                # Summaries from this source belong to its old text
+                self._conn.execute(
+                    "DELETE FROM summaries WHERE full_name = ? AND source = ?",
+                    (full_name, source),
+                )
+            self._conn.execute(
+                f"INSERT INTO repos (full_name, {version_column}, {dates_column}, checked_at)"
+                " VALUES (?, ?, ?, ?) ON CONFLICT (full_name) DO UPDATE SET"
+                f" {version_column} = excluded.{version_column},"
+                f" {dates_column} = excluded.{dates_column},"
+                " checked_at = excluded.checked_at",
+                (full_name, version, dates, self._now()),
+            )
+
+    def get_summary(self, full_name: str, source: str, date: str) -> Optional[dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT summary FROM summaries"
+                " WHERE full_name = ? AND source = ? AND date = ?",
+                (full_name, source, date),
+            ).fetchone()
+            if row is None:
+                return None
+            self.summaries_reused += 1
+        return json.loads(row[0])
+
+    def record_summary(self, full_name: str, source: str, date: str, summary: dict):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO summaries"
+                " (full_name, source, date, summary, created_at) VALUES (?, ?, ?, ?, ?)",
+                (full_name, source, date, json.dumps(summary), self._now()),
+            )
+
+    def stats(self) -> dict:
+        with self._lock:
+            repos = self._conn.execute("SELECT COUNT(*) FROM repos").fetchone()[0]
+            return {
+                "repos": repos,
+                "unchanged": len(self._unchanged_repos),
+                "summaries_reused": self.summaries_reused,
+            }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -1,6 +1,9 @@
 import os
+import hashlib
 import json
+import threading
 import time
+from types import SimpleNamespace
 from google import genai
 from tenacity import (
     retry,
@@ -9,7 +12,19 @@ from tenacity import (
     retry_if_exception_type,
     retry_if_exception,
 )
-from src import config
+from src import config, telemetry
+from src.cache import DiskCache
+from src.changelog_parser import find_section, index_changelog
+from src.json_stream import IncrementalJSONParser
+from src.model_health import (
+    HALF_OPEN,
+    INVALID,
+    OK,
+    TRUNCATED,
+    ModelHealth,
+    next_quota_reset,
+)
+from src.rate_limiter import RateLimiter
 
 
 def _get_gemini_client():
@@ -23,12 +38,63 @@ def _get_gemini_client():
     return genai.Client(api_key=api_key, http_options={"timeout": timeout_ms})
 
 
-# Track exhausted models globally for the session
-_exhausted_models = set()
+# Per-model circuit breaker, persisted so known-bad models stay skipped across runs
+_model_health = None
+
+# Model and latency of the current thread's last successful call
+_route = threading.local()
+
+# Per-model RPM buckets + daily request ledger persisted across runs
+_rate_limiter = None
+
+
+def _get_rate_limiter() -> RateLimiter:
+    global _rate_limiter
+    if _rate_limiter is None:
+        _rate_limiter = RateLimiter(
+            requests_per_minute=getattr(config, "REQUESTS_PER_MINUTE", 5),
+            daily_limit=getattr(config, "DAILY_LIMIT", 20),
+            ledger_path=os.path.join(config.CACHE_DIR, "gemini_quota.json"),
+            burst=getattr(config, "RATE_LIMIT_BURST", 1),
+            sleep=telemetry.timed_sleep("gemini_rate_limit_wait"),
+        )
+    return _rate_limiter
+
+
+def get_rate_limit_stats() -> dict:
+    """Today's per-model request counts and total limiter wait time."""
+    return _rate_limiter.stats() if _rate_limiter else {}
+
+
+def _get_model_health() -> ModelHealth:
+    global _model_health
+    if _model_health is None:
+        _model_health = ModelHealth(
+            os.path.join(config.CACHE_DIR, "model_health.json"),
+            failure_threshold=getattr(config, "CIRCUIT_FAILURE_THRESHOLD", 3),
+            cooldown=getattr(config, "CIRCUIT_COOLDOWN_SECONDS", 300),
+            max_cooldown=getattr(config, "CIRCUIT_MAX_COOLDOWN_SECONDS", 6 * 3600),
+        )
+    return _model_health
+
+
+def get_model_health_stats() -> dict:
+    """Circuit state, recent error rate and latency per model."""
+    return _model_health.snapshot() if _model_health else {}
+
+
+class DailyBudgetExhausted(Exception):
+    pass
+
+
+def _is_daily_quota_error(err_msg: str) -> bool:
+    return "perday" in err_msg.lower().replace("_", "")
 
 
 def retry_if_api_error(exception):
     err_msg = str(exception).lower()
+    if _is_daily_quota_error(err_msg):
+        return False  # retrying cannot help before the quota resets
     return any(
         code in err_msg
         for code in [
@@ -46,6 +112,7 @@ def retry_if_api_error(exception):
     stop=stop_after_attempt(getattr(config, "MAX_RETRIES", 2) + 1),
     wait=wait_exponential(multiplier=1, min=getattr(config, "RETRY_DELAY", 30), max=60),
     retry=retry_if_exception_type(Exception) & retry_if_exception(retry_if_api_error),
+    before_sleep=telemetry.record_retry("gemini"),
 )
 def _call_gemini_single_model(
     client,
@@ -56,6 +123,12 @@ def _call_gemini_single_model(
     max_tokens,
     response_schema,
 ):
+    waited = _get_rate_limiter().acquire(model_name)
+    if waited is None:
+        raise DailyBudgetExhausted(f"daily budget of {model_name} is spent")
+    if waited > 0:
+        print(f"  ⏳ Rate limit wait ({waited:.1f}s)...")
+
     print(f"  🤖 Calling {model_name}...", flush=True)
     start_time = time.time()
 
@@ -68,20 +141,98 @@ def _call_gemini_single_model(
     if response_schema:
         gen_config.response_schema = response_schema
 
-    response = client.models.generate_content(
-        model=model_name,
-        contents=prompt,
-        config=gen_config,
-    )
+    telemetry.count("gemini.calls")
+    try:
+        with telemetry.span("llm_call"):
+            if getattr(config, "GEMINI_STREAMING", False):
+                response = _generate_streamed(client, model_name, prompt, gen_config)
+            else:
+                response = client.models.generate_content(
+                    model=model_name,
+                    contents=prompt,
+                    config=gen_config,
+                )
+    except Exception:
+        telemetry.count("gemini.errors")
+        raise
     duration = time.time() - start_time
     print(f"  ✅ Response received in {duration:.1f}s.", flush=True)
 
-    # Rate limit pause after success
-    rate_limit_delay = getattr(config, "RATE_LIMIT_DELAY", 12)
-    print(f"  ⏳ Rate limit pause ({rate_limit_delay}s)...")
-    time.sleep(rate_limit_delay)
+    return response, duration
+
 
-    return response
+def _generate_streamed(client, model_name, prompt, gen_config):
+    """
+    Streams the response through an IncrementalJSONParser: `title` and
+    `whats_new` are shown as soon as they are complete, and the stream is
+    closed the moment `update_found` comes back false. Returns an object
+    with the response's `text` and the last chunk's `candidates`.
+    """
+    parser = IncrementalJSONParser()
+    start_time = time.time()
+    last = None
+    chunks = client.models.generate_content_stream(
+        model=model_name, contents=prompt, config=gen_config
+    )
+    try:
+        for chunk in chunks:
+            last = chunk
+            completed = parser.feed(chunk.text or "")
+            if "update_found" in completed:
+                telemetry.add_time("llm_time_to_decision", time.time() - start_time)
+            if "title" in completed:
+                print(f"  📝 {completed['title']}", flush=True)
+            if "whats_new" in completed:
+                print(
+                    f"  ✨ {len(completed['whats_new'] or [])} highlights", flush=True
+                )
+            if parser.fields.get("update_found") is False:
+                print("  ⏹️ No update: closing the stream early.")
+                telemetry.count("gemini.stream_aborts")
+                return SimpleNamespace(text=json.dumps(parser.fields), candidates=None)
+    finally:
+        close = getattr(chunks, "close", None)
+        if close:
+            close()
+    return SimpleNamespace(
+        text=parser.text, candidates=getattr(last, "candidates", None)
+    )
+
+
+def _response_outcome(response, response_schema) -> str:
+    """OK if the text parses into an object with the schema's required fields."""
+    text = getattr(response, "text", None) or ""
+    try:
+        data = json.loads(text)
+    except json.JSONDecodeError as e:
+        candidates = getattr(response, "candidates", None) or [None]
+        cut_off = "MAX_TOKENS" in str(getattr(candidates[0], "finish_reason", ""))
+        # A generation cut off mid-way leaves a string open or fails at the very end
+        if (
+            cut_off
+            or e.msg.startswith("Unterminated")
+            or e.pos >= len(text.rstrip()) - 1
+        ):
+            return TRUNCATED
+        return INVALID
+    except TypeError:
+        return INVALID
+    if not isinstance(data, dict):
+        return INVALID
+    required = (response_schema or {}).get("required", [])
+    return OK if all(key in data for key in required) else INVALID
+
+
+def _take_route():
+    """Pops {"model", "seconds"} of this thread's last successful call, or None."""
+    route = getattr(_route, "last", None)
+    _route.last = None
+    return route
+
+
+def _with_route(data: dict, route) -> dict:
+    """A copy of `data` that records which model produced it; cached copies stay unstamped."""
+    return dict(data, served_by=route) if route else data
 
 
 def _call_gemini_with_fallback(
@@ -89,9 +240,12 @@ def _call_gemini_with_fallback(
 ):
     """
     Calls Gemini API with model fallback and retries on transient errors (503/429/504).
-    Tries the primary model first, then each fallback model.
-    Returns the response object or None.
+    Tries the primary model first, then each fallback model; with
+    ADAPTIVE_ROUTING, the fastest model with a reliable record goes first.
+    With a response schema, unparseable or truncated JSON counts against the
+    model and the next one is tried. Returns the response object or None.
     """
+    _route.last = None
     client = _get_gemini_client()
     if not client:
         return None
@@ -104,19 +258,65 @@ def _call_gemini_with_fallback(
     fallbacks = getattr(config, "GEMINI_FALLBACK_MODELS", [])
     models = [primary] + [m for m in fallbacks if m != primary]
 
-    # Filter out models known to be exhausted in this session
-    models = [m for m in models if m not in _exhausted_models]
+    # Skip models whose circuit is open (quota spent, failing) or out of today's budget
+    limiter = _get_rate_limiter()
+    health = _get_model_health()
+    available = []
+    for m in models:
+        if not health.allow(m):
+            print(f"  🔌 {m} circuit is open. Skipping.")
+            telemetry.count("gemini.circuit_skips")
+        elif not limiter.has_budget(m):
+            print(
+                f"  🚫 {m} has used its daily budget ({config.DAILY_LIMIT}). Skipping."
+            )
+        else:
+            available.append(m)
+    models = available
 
     if not models:
         print("❌ All configured models are exhausted or unavailable.")
         return None
 
-    for model_name in models:
-        if model_name in _exhausted_models:
-            continue
-
+    if getattr(config, "ADAPTIVE_ROUTING", True):
+        ranked = health.rank(
+            models,
+            min_samples=getattr(config, "ROUTING_MIN_SAMPLES", 5),
+            min_success_rate=getattr(config, "ROUTING_MIN_SUCCESS_RATE", 0.9),
+        )
+        if ranked != models:
+            print(f"  🧭 Routing by recent performance: {' → '.join(ranked)}")
+        models = ranked
+
+    budget = getattr(config, "ROUTING_LATENCY_BUDGET_SECONDS", None)
+    deadline = time.monotonic() + budget if budget else None
+
+    for position, model_name in enumerate(models):
+        if deadline is not None:
+            remaining = deadline - time.monotonic()
+            p95 = health.performance(model_name)["p95_latency_seconds"]
+            if remaining <= 0:
+                print(f"  ⏱️ Latency budget of {budget}s spent. Giving up.")
+                telemetry.count("gemini.latency_budget_exceeded")
+                break
+            if p95 is not None and p95 > remaining:
+                print(
+                    f"  ⏱️ Skipping {model_name}: p95 {p95:.1f}s exceeds the remaining {remaining:.1f}s."
+                )
+                continue
+        if position:
+            telemetry.count("gemini.model_fallbacks")
+
+        call = _call_gemini_single_model
+        if health.state(model_name) == HALF_OPEN:
+            # Cool-down is over: one probe, without the retry waits
+            print(f"  🩺 Probing {model_name} after its cool-down...")
+            telemetry.count("gemini.circuit_probes")
+            call = _call_gemini_single_model.retry_with(stop=stop_after_attempt(1))
+
+        call_start = time.time()
         try:
-            return _call_gemini_single_model(
+            response, seconds = call(
                 client,
                 model_name,
                 prompt,
@@ -127,82 +327,210 @@ def _call_gemini_with_fallback(
             )
         except Exception as e:
             err_msg = str(e).lower()
-            if "429" in err_msg or "resource_exhausted" in err_msg:
+            if not isinstance(e, DailyBudgetExhausted):
+                # One failure per logical call, after tenacity has given up
+                health.record_failure(
+                    model_name, str(e)[:200], time.time() - call_start
+                )
+            if _is_daily_quota_error(err_msg):
+                # Daily quota, not a per-minute burst: skip the model until it resets
                 print(
-                    f"  🚫 {model_name} seems to have hit DAILY LIMIT (or persistent 429). Marking as exhausted."
+                    f"  🚫 {model_name} hit its DAILY LIMIT. Opening its circuit until the quota resets."
                 )
-                _exhausted_models.add(model_name)
+                health.trip(model_name, next_quota_reset(time.time()), "daily quota")
+                limiter.mark_exhausted(model_name)
 
             print(
                 f"  ❌ Max retries reached or unrecoverable error with {model_name}: {e}. Trying next model..."
             )
+            continue
+
+        outcome = (
+            _response_outcome(response, response_schema) if response_schema else OK
+        )
+        health.record_success(model_name, seconds, outcome)
+        if outcome != OK:
+            print(f"  ⚠️ {model_name} returned {outcome} JSON. Trying next model...")
+            telemetry.count(f"gemini.{outcome}_responses")
+            continue
+        _route.last = {"model": model_name, "seconds": round(seconds, 2)}
+        return response
 
     return None
 
 
+UPDATE_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        "update_found": {"type": "BOOLEAN"},
+        "title": {"type": "STRING"},
+        "description": {"type": "STRING"},
+        "whats_new": {"type": "ARRAY", "items": {"type": "STRING"}},
+        "why_important": {"type": "STRING"},
+        "try_it_out": {
+            "type": "OBJECT",
+            "properties": {
+                "language": {"type": "STRING"},
+                "beginner": {
+                    "type": "OBJECT",
+                    "properties": {
+                        "label": {"type": "STRING"},
+                        "code": {"type": "STRING"},
+                    },
+                },
+                "intermediate": {
+                    "type": "OBJECT",
+                    "properties": {
+                        "label": {"type": "STRING"},
+                        "code": {"type": "STRING"},
+                    },
+                },
+                "advanced": {
+                    "type": "OBJECT",
+                    "properties": {
+                        "label": {"type": "STRING"},
+                        "code": {"type": "STRING"},
+                    },
+                },
+            },
+        },
+    },
+    "required": ["update_found"],
+    # Decision first, so a streamed "no update" can stop before the summary
+    "propertyOrdering": [
+        "update_found",
+        "title",
+        "description",
+        "whats_new",
+        "why_important",
+        "try_it_out",
+    ],
+}
+
+
+# Parsed Gemini results keyed by excerpt/date/prompt/schema/model
+_summary_cache = None
+
+
+def _get_summary_cache():
+    global _summary_cache
+    if _summary_cache is None and getattr(config, "SUMMARY_CACHE_ENABLED", True):
+        _summary_cache = DiskCache(
+            os.path.join(config.CACHE_DIR, "summaries"),
+            max_bytes=getattr(config, "SUMMARY_CACHE_MAX_BYTES", 32 * 1024 * 1024),
+            ttl_seconds=getattr(config, "SUMMARY_CACHE_TTL", 30 * 24 * 3600),
+        )
+    return _summary_cache
+
+
+def get_summary_cache_stats() -> dict:
+    """Hit/miss counters of the summary cache (each hit is a Gemini call saved)."""
+    return _summary_cache.stats() if _summary_cache else {}
+
+
+def _summary_cache_key(excerpt: str, target_date: str, template: str = None) -> str:
+    models = [getattr(config, "GEMINI_MODEL", "")] + list(
+        getattr(config, "GEMINI_FALLBACK_MODELS", [])
+    )
+    material = json.dumps(
+        [
+            excerpt,
+            target_date,
+            template or config.CHANGELOG_UPDATE_CHECK_PROMPT,
+            UPDATE_SCHEMA,
+            models,
+        ],
+        sort_keys=True,
+    )
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+def extract_update_excerpt(content: str, target_date: str, index=None):
+    """
+    Returns the changelog text to send for `target_date`, or None if there is
+    no entry for it. Structured changelogs yield exactly the dated section;
+    a date merely mentioned in prose doesn't count. Changelogs without any
+    dated headings fall back to a window around the first mention.
+    """
+    if index is None:
+        index = index_changelog(content)
+    if index:
+        return find_section(content, target_date, index)
+
+    if target_date not in content:
+        return None
+    idx = content.find(target_date)
+    start_idx = max(0, idx - 1000)
+    end_idx = min(len(content), idx + 4000)
+    return content[start_idx:end_idx]
+
+
+def find_update_dates(content: str, dates: list, index=None) -> list:
+    """
+    Returns the subset of `dates` that have an entry in the changelog,
+    in the order given. Purely local; no LLM call.
+    """
+    with telemetry.span("date_scan"):
+        if index is None:
+            index = index_changelog(content)
+        return [
+            d for d in dates if extract_update_excerpt(content, d, index) is not None
+        ]
+
+
+def check_for_updates(content: str, dates: list, index=None) -> tuple:
+    """
+    Multi-date variant of check_for_daily_update. `dates` is ordered freshest
+    first; the changelog is scanned once (or not at all when its `index` is
+    given), only the freshest date with an entry is summarized (at most one
+    LLM call). Returns (summary_data, matched_date) or (None, None).
+    """
+    with telemetry.span("date_scan"):
+        if index is None:
+            index = index_changelog(content)
+        found = None
+        for target_date in dates:
+            excerpt = extract_update_excerpt(content, target_date, index)
+            if excerpt is not None:
+                found = (excerpt, target_date)
+                break
+    if found:
+        return _summarize_excerpt(*found), found[1]
+
+    print(f"  📉 Local optimization: no entry for {dates} in changelog. Skipping LLM.")
+    return None, None
+
+
 def check_for_daily_update(content: str, target_date: str) -> dict:
     """
     Checks if there is an update for the target_date and returns a dictionary.
     Uses Gemini API with fallback and retries.
     """
-    if target_date not in content:
+    truncated_content = extract_update_excerpt(content, target_date)
+    if truncated_content is None:
         print(
-            f"  📉 Local optimization: '{target_date}' not found in changelog. Skipping LLM."
+            f"  📉 Local optimization: no '{target_date}' entry in changelog. Skipping LLM."
         )
         return None
+    return _summarize_excerpt(truncated_content, target_date)
 
-    idx = content.find(target_date)
-    start_idx = max(0, idx - 1000)
-    end_idx = min(len(content), idx + 4000)
-    truncated_content = content[start_idx:end_idx]
+
+def _summarize_excerpt(truncated_content: str, target_date: str) -> dict:
+    cache = _get_summary_cache()
+    cache_key = _summary_cache_key(truncated_content, target_date)
+    cached = cache.get(cache_key) if cache else None
+    if cached is not None:
+        print("  💾 Summary cache hit. Skipping LLM.")
+        return cached if cached.get("update_found") else None
 
     prompt = config.CHANGELOG_UPDATE_CHECK_PROMPT.format(
         content=truncated_content, target_date=target_date
     )
 
-    schema = {
-        "type": "OBJECT",
-        "properties": {
-            "update_found": {"type": "BOOLEAN"},
-            "title": {"type": "STRING"},
-            "description": {"type": "STRING"},
-            "whats_new": {"type": "ARRAY", "items": {"type": "STRING"}},
-            "why_important": {"type": "STRING"},
-            "try_it_out": {
-                "type": "OBJECT",
-                "properties": {
-                    "language": {"type": "STRING"},
-                    "beginner": {
-                        "type": "OBJECT",
-                        "properties": {
-                            "label": {"type": "STRING"},
-                            "code": {"type": "STRING"},
-                        },
-                    },
-                    "intermediate": {
-                        "type": "OBJECT",
-                        "properties": {
-                            "label": {"type": "STRING"},
-                            "code": {"type": "STRING"},
-                        },
-                    },
-                    "advanced": {
-                        "type": "OBJECT",
-                        "properties": {
-                            "label": {"type": "STRING"},
-                            "code": {"type": "STRING"},
-                        },
-                    },
-                },
-            },
-        },
-        "required": ["update_found"],
-    }
-
     response = _call_gemini_with_fallback(
         prompt=prompt,
         system_instruction="You are a precise technical changelog parser that outputs only valid JSON according to the schema.",
-        response_schema=schema,
+        response_schema=UPDATE_SCHEMA,
     )
 
     if not response or not response.text:
@@ -210,13 +538,152 @@ def check_for_daily_update(content: str, target_date: str) -> dict:
 
     try:
         data = json.loads(response.text)
-        if not data.get("update_found"):
-            return None
-        return data
     except json.JSONDecodeError as e:
         print(f"  ❌ Failed to parse JSON response: {e}")
         return None
 
+    # Negative answers are cached too, so reruns don't ask again
+    if cache and isinstance(data, dict):
+        cache.set(cache_key, data)
+    if not data.get("update_found"):
+        return None
+    return _with_route(data, _take_route())
+
+
+BATCH_UPDATE_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        "results": {
+            "type": "ARRAY",
+            "items": {
+                "type": "OBJECT",
+                "properties": {
+                    "full_name": {"type": "STRING"},
+                    **UPDATE_SCHEMA["properties"],
+                },
+                "required": ["full_name", "update_found"],
+                "propertyOrdering": ["full_name", *UPDATE_SCHEMA["propertyOrdering"]],
+            },
+        }
+    },
+    "required": ["results"],
+}
+
+
+def _estimate_tokens(text: str) -> int:
+    return len(text) // 4 + 1
+
+
+def _split_batches(items: list) -> list:
+    """Packs items into batches bounded by SUMMARY_BATCH_SIZE and the input-token budget."""
+    max_items = max(1, getattr(config, "SUMMARY_BATCH_SIZE", 4))
+    budget = getattr(config, "SUMMARY_BATCH_INPUT_TOKENS", 12000)
+    batches, current, current_tokens = [], [], 0
+    for item in items:
+        tokens = _estimate_tokens(item["excerpt"])
+        if current and (len(current) >= max_items or current_tokens + tokens > budget):
+            batches.append(current)
+            current, current_tokens = [], 0
+        current.append(item)
+        current_tokens += tokens
+    if current:
+        batches.append(current)
+    return batches
+
+
+def _valid_batch_result(result) -> bool:
+    if not isinstance(result, dict) or "update_found" not in result:
+        return False
+    if not result["update_found"]:
+        return True
+    # Truncated generations tend to lose the later fields first
+    return bool(result.get("whats_new")) and isinstance(result.get("try_it_out"), dict)
+
+
+def _summarize_batch(batch: list) -> dict:
+    """One Gemini request for `batch`; returns {full_name: parsed result} for valid results only."""
+    entries = "\n\n".join(
+        f"### Repository: {item['full_name']}\n"
+        f"Target date: {item['date']}\n"
+        f"<<<\n{item['excerpt']}\n>>>"
+        for item in batch
+    )
+    prompt = config.BATCH_CHANGELOG_UPDATE_CHECK_PROMPT.format(entries=entries)
+    print(f"  📦 Summarizing {len(batch)} repos in one request...")
+    response = _call_gemini_with_fallback(
+        prompt=prompt,
+        system_instruction="You are a precise technical changelog parser that outputs only valid JSON according to the schema.",
+        response_schema=BATCH_UPDATE_SCHEMA,
+    )
+    if not response or not response.text:
+        return {}
+
+    try:
+        results = json.loads(response.text).get("results") or []
+    except (json.JSONDecodeError, AttributeError) as e:
+        print(f"  ❌ Failed to parse batch JSON response: {e}")
+        return {}
+
+    wanted = {item["full_name"] for item in batch}
+    route = _take_route()
+    parsed = {}
+    for result in results:
+        if _valid_batch_result(result) and result.get("full_name") in wanted:
+            parsed[result.pop("full_name")] = _with_route(result, route)
+    return parsed
+
+
+def summarize_updates_batch(items: list) -> dict:
+    """
+    Batch mode: summarizes several repos' dated sections with as few Gemini
+    requests as possible. `items` is [{"full_name", "content", "date"}], plus
+    an optional "index" of the changelog already scanned.
+    Returns {full_name: summary_data or None}. Repos whose batch result is
+    missing, malformed or truncated fall back to a per-repo call.
+    """
+    results = {}
+    pending = []
+    cache = _get_summary_cache()
+    for item in items:
+        excerpt = extract_update_excerpt(
+            item["content"], item["date"], item.get("index")
+        )
+        if excerpt is None:
+            results[item["full_name"]] = None
+            continue
+        key = _summary_cache_key(
+            excerpt, item["date"], config.BATCH_CHANGELOG_UPDATE_CHECK_PROMPT
+        )
+        cached = None
+        if cache:
+            cached = cache.get(_summary_cache_key(excerpt, item["date"]))
+            if cached is None:
+                cached = cache.get(key)
+        if cached is not None:
+            print(f"  💾 Summary cache hit for {item['full_name']}.")
+            results[item["full_name"]] = cached if cached.get("update_found") else None
+            continue
+        pending.append(dict(item, excerpt=excerpt, cache_key=key))
+
+    for batch in _split_batches(pending):
+        parsed = _summarize_batch(batch) if len(batch) > 1 else {}
+        for item in batch:
+            data = parsed.get(item["full_name"])
+            if data is None:
+                if len(batch) > 1:
+                    print(f"  ↩️ No usable batch result for {item['full_name']}.")
+                results[item["full_name"]] = _summarize_excerpt(
+                    item["excerpt"], item["date"]
+                )
+                continue
+            route = data.pop("served_by", None)
+            if cache:
+                cache.set(item["cache_key"], data)
+            results[item["full_name"]] = (
+                _with_route(data, route) if data.get("update_found") else None
+            )
+    return results
+
 
 def generate_global_summary(repos_data: list) -> dict:
     """
@@ -0,0 +1,220 @@
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict
+
+PROMETHEUS_PREFIX = "changelog_insights"
+
+
+class Telemetry:
+    """
+    Per-run timing spans (count / total / max seconds per stage) and event
+    counters. Thread-safe: VIP fetchers, search shards and the pipeline
+    worker all record into the same instance.
+    """
+
+    def __init__(self):
+        self._spans = {}
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def add_time(self, name: str, seconds: float):
+        with self._lock:
+            span = self._spans.setdefault(
+                name, {"count": 0, "total_seconds": 0.0, "max_seconds": 0.0}
+            )
+            span["count"] += 1
+            span["total_seconds"] += seconds
+            span["max_seconds"] = max(span["max_seconds"], seconds)
+
+    @contextmanager
+    def span(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - start)
+
+    def count(self, name: str, value: int = 1):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return {
+                "spans": {
+                    name: {
+                        "count": span["count"],
+                        "total_seconds": round(span["total_seconds"], 3),
+                        "max_seconds": round(span["max_seconds"], 3),
+                    }
+                    for name, span in sorted(self._spans.items())
+                },
+                "counters": dict(sorted(self._counters.items())),
+            }
+
+
+_telemetry = Telemetry()
+
+
+def span(name: str):
+    """Times the `with` block under `name`."""
+    return _telemetry.span(name)
+
+
+def count(name: str, value: int = 1):
+    _telemetry.count(name, value)
+
+
+def add_time(name: str, seconds: float):
+    _telemetry.add_time(name, seconds)
+
+
+def get_telemetry_stats() -> Dict:
+    """Spans and counters recorded so far in this process."""
+    return _telemetry.snapshot()
+
+
+def timed_sleep(name: str):
+    """A time.sleep replacement that books every wait as a `name` span."""
+
+    def sleep(seconds):
+        add_time(name, seconds)
+        time.sleep(seconds)
+
+    return sleep
+
+
+def record_retry(prefix: str):
+    """Tenacity `before_sleep` hook: counts the retry and books its backoff."""
+
+    def before_sleep(retry_state):
+        count(f"{prefix}.retries")
+        add_time(f"{prefix}_retry_wait", retry_state.next_action.sleep)
+
+    return before_sleep
+
+
+# meta.json sections keyed by a model or resource name: the key becomes a
+# label, so metric names stay fixed however many models there are
+_LABELLED_SECTIONS = {
+    ("model_health",): "model",
+    ("gemini_quota", "requests"): "model",
+    ("github_rate_limit",): "resource",
+}
+
+
+def _metric_name(*parts) -> str:
+    return re.sub(r"[^a-zA-Z0-9_]", "_", "_".join(str(p) for p in parts))
+
+
+def _label_value(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(pairs) -> str:
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_label_value(v)}"' for k, v in pairs) + "}"
+
+
+def _flatten(value, path=(), labels=()):
+    """Yields (name parts, label pairs, number) for every numeric leaf."""
+    if isinstance(value, dict):
+        label = _LABELLED_SECTIONS.get(path)
+        for key, child in value.items():
+            if label:
+                # None marks the level as labelled without adding to the name
+                yield from _flatten(child, path + (None,), labels + ((label, key),))
+            else:
+                yield from _flatten(child, path + (key,), labels)
+    elif isinstance(value, (int, float)) and not isinstance(value, bool):
+        yield tuple(p for p in path if p is not None), labels, value
+
+
+def render_prometheus(meta: Dict) -> str:
+    """
+    Prometheus text exposition of a run's meta.json: spans and counters as
+    labelled series, every other numeric field as its own gauge.
+    """
+    telemetry = meta.get("telemetry") or {}
+    lines = []
+
+    def series(name, kind, help_text, samples):
+        if not samples:
+            return
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        lines.extend(f"{name}{labels} {value}" for labels, value in samples)
+
+    spans = telemetry.get("spans", {})
+    for field, kind, help_text in (
+        ("total_seconds", "counter", "Time spent in each stage."),
+        ("count", "counter", "Times each stage ran."),
+        ("max_seconds", "gauge", "Longest single run of each stage."),
+    ):
+        suffix = {"total_seconds": "seconds_total", "count": "total"}.get(
+            field, "max_seconds"
+        )
+        series(
+            f"{PROMETHEUS_PREFIX}_span_{suffix}",
+            kind,
+            help_text,
+            [(_labels([("span", name)]), span[field]) for name, span in spans.items()],
+        )
+    series(
+        f"{PROMETHEUS_PREFIX}_events_total",
+        "counter",
+        "API calls, cache hits, retries, fallbacks and bytes downloaded.",
+        [
+            (_labels([("event", name)]), value)
+            for name, value in telemetry.get("counters", {}).items()
+        ],
+    )
+
+    # Per-repo routes would mean one series per repo: aggregate them per model
+    served = {}
+    for route in (meta.get("served_by") or {}).values():
+        model = (route or {}).get("model") or "cache"
+        repos, seconds = served.get(model, (0, 0.0))
+        served[model] = (repos + 1, seconds + ((route or {}).get("seconds") or 0))
+    series(
+        f"{PROMETHEUS_PREFIX}_served_repos",
+        "gauge",
+        "Rendered repos per model that summarized them (cache: no LLM call).",
+        [(_labels([("model", m)]), repos) for m, (repos, _) in sorted(served.items())],
+    )
+    series(
+        f"{PROMETHEUS_PREFIX}_served_llm_seconds",
+        "gauge",
+        "LLM seconds behind the rendered repos, per model.",
+        [
+            (_labels([("model", m)]), round(seconds, 3))
+            for m, (_, seconds) in sorted(served.items())
+        ],
+    )
+
+    gauges = {}
+    others = {
+        key: value
+        for key, value in meta.items()
+        if key not in ("telemetry", "served_by")
+    }
+    for path, labels, value in _flatten(others):
+        name = _metric_name(PROMETHEUS_PREFIX, *path)
+        gauges.setdefault(name, []).append((_labels(labels), value))
+    for name, samples in gauges.items():
+        lines.append(f"# TYPE {name} gauge")
+        lines.extend(f"{name}{labels} {value}" for labels, value in samples)
+    return "\n".join(lines) + "\n"
+
+
+def write_prometheus_textfile(path, meta: Dict):
+    """Atomically writes render_prometheus(meta) for node_exporter's textfile collector."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(render_prometheus(meta))
+    os.replace(tmp_path, path)
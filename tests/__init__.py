@@ -0,0 +1,5 @@
+import os
+import tempfile
+
+# Keep on-disk caches out of the working tree while tests run
+os.environ.setdefault("CACHE_DIR", tempfile.mkdtemp(prefix="changelog-tests-"))
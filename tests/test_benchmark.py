@@ -0,0 +1,46 @@
+import json
+import os
+import sys
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+from pathlib import Path
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from benchmarks import run, synthetic  # noqa: E402
+from src.changelog_parser import index_changelog  # noqa: E402
+
+
+class TestBenchmark(unittest.TestCase):
+    def test_synthetic_changelogs_parse_in_every_style(self):
+        repos = synthetic.build_universe(
+            len(synthetic.HEADING_STYLES) * 4, "2024-03-10", [], max_kb=16
+        )
+        styles = set()
+        for spec in repos:
+            if spec.source != "changelog":
+                continue
+            sections = index_changelog(synthetic.changelog_text(spec))
+            self.assertEqual(sections[0]["date"], spec.newest.strftime("%Y-%m-%d"))
+            styles.add(spec.style)
+        self.assertGreater(len(styles), 3)
+
+    def test_run_writes_results(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            with redirect_stdout(StringIO()):
+                result = run.main(
+                    ["--repos", "120", "--max-kb", "600", "--output", tmp]
+                )
+            saved = list(Path(tmp).glob("*.json"))
+
+            self.assertEqual(len(saved), 1)
+            self.assertEqual(json.loads(saved[0].read_text())["params"]["repos"], 120)
+        self.assertGreater(result["github_calls"], 0)
+        self.assertGreater(result["gemini_calls"], 0)
+        self.assertEqual(result["repo_count"], result["meta"]["repo_count"])
+
+
+if __name__ == "__main__":
+    unittest.main()
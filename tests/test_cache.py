@@ -0,0 +1,48 @@
+import os
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.cache import DiskCache  # noqa: E402
+
+
+class TestDiskCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def test_hit_and_miss_counters(self):
+        cache = DiskCache(self.tmp.name, max_bytes=1_000_000)
+        self.assertIsNone(cache.get("a"))
+        cache.set("a", {"x": 1})
+        self.assertEqual(cache.get("a"), {"x": 1})
+        stats = cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 1))
+
+    def test_ttl_expires_entries(self):
+        cache = DiskCache(self.tmp.name, max_bytes=1_000_000, ttl_seconds=10)
+        with patch("src.cache.time.time", return_value=1000.0):
+            cache.set("a", "value")
+        with patch("src.cache.time.time", return_value=1005.0):
+            self.assertEqual(cache.get("a"), "value")
+        with patch("src.cache.time.time", return_value=1011.0):
+            self.assertIsNone(cache.get("a"))
+
+    def test_evicts_least_recently_used_over_budget(self):
+        cache = DiskCache(self.tmp.name, max_bytes=250)
+        cache.set("old", "x" * 80)
+        os.utime(cache._path("old"), (1, 1))
+        cache.set("new", "y" * 80)
+        cache.set("newest", "z" * 80)
+
+        self.assertIsNone(cache.get("old"))
+        self.assertEqual(cache.get("newest"), "z" * 80)
+        self.assertGreaterEqual(cache.stats()["evictions"], 1)
+        self.assertLessEqual(cache.stats()["bytes"], 250)
+
+
+if __name__ == "__main__":
+    unittest.main()
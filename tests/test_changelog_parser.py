@@ -0,0 +1,86 @@
+import os
+import sys
+import unittest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.changelog_parser import extract_date, find_section, index_changelog  # noqa: E402
+
+KEEP_A_CHANGELOG = """# Changelog
+
+## [Unreleased]
+
+## [1.2.0] - 2024-01-05
+### Added
+- Streaming support (follow-up to the 2024-01-01 release)
+
+## [1.1.0] - 2024-01-01
+### Fixed
+- Memory leak
+"""
+
+
+class TestChangelogParser(unittest.TestCase):
+    def test_extract_date_formats(self):
+        self.assertEqual(extract_date("## [1.2.0] - 2024-01-05"), "2024-01-05")
+        self.assertEqual(extract_date("v2 (2024/3/4)"), "2024-03-04")
+        self.assertEqual(extract_date("Released January 5th, 2024"), "2024-01-05")
+        self.assertEqual(extract_date("5 Sep 2024"), "2024-09-05")
+        self.assertIsNone(extract_date("2024-13-45"))
+
+    def test_keep_a_changelog_sections(self):
+        index = index_changelog(KEEP_A_CHANGELOG)
+        self.assertEqual([s["date"] for s in index], ["2024-01-05", "2024-01-01"])
+
+        section = find_section(KEEP_A_CHANGELOG, "2024-01-05", index)
+        self.assertTrue(section.startswith("## [1.2.0] - 2024-01-05"))
+        self.assertIn("### Added", section)
+        self.assertNotIn("Memory leak", section)
+
+    def test_release_pseudo_changelog_keeps_subheadings(self):
+        content = (
+            "# Changelog (from GitHub Releases)\n\n"
+            "## [2024-01-05] v2.0\n## What's Changed\n- New API\n\n"
+            "## [2024-01-03] v1.9\n- Fix\n"
+        )
+        section = find_section(content, "2024-01-05")
+        self.assertIn("New API", section)
+        self.assertNotIn("v1.9", section)
+
+    def test_rst_and_dated_line_below_version(self):
+        content = (
+            "Changelog\n=========\n\n"
+            "2.0.0\n-----\nReleased 2024-03-04\n\n- a\n\n"
+            "1.9.0 (2024-02-01)\n------------------\n- b\n"
+        )
+        index = index_changelog(content)
+        self.assertEqual([s["date"] for s in index], ["2024-03-04", "2024-02-01"])
+        self.assertNotIn("- b", find_section(content, "2024-03-04", index))
+
+    def test_prose_date_is_not_a_section(self):
+        self.assertIsNone(find_section(KEEP_A_CHANGELOG, "2024-01-02"))
+        self.assertEqual(len(index_changelog(KEEP_A_CHANGELOG)), 2)
+
+    def test_prose_below_version_heading_does_not_date_it(self):
+        content = (
+            "## 2.0.0\nWe fixed a bug reported on 2024-01-05.\n\n"
+            "## 1.9.0\n_Released 2024-01-03_\n- b\n"
+        )
+        index = index_changelog(content)
+        self.assertEqual([s["date"] for s in index], ["2024-01-03"])
+        self.assertIsNone(find_section(content, "2024-01-05", index))
+
+    def test_setext_subheading_stays_in_markdown_section(self):
+        content = (
+            "# Changelog\n\n"
+            "## [1.2.0] - 2024-01-05\n\n"
+            "Breaking changes\n----------------\n- Dropped Python 3.8\n\n"
+            "## [1.1.0] - 2024-01-01\n- Fix\n"
+        )
+        section = find_section(content, "2024-01-05")
+        self.assertIn("Dropped Python 3.8", section)
+        self.assertNotIn("[1.1.0]", section)
+
+
+if __name__ == "__main__":
+    unittest.main()
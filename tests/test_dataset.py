@@ -0,0 +1,74 @@
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src import dataset  # noqa: E402
+from src.main import rerender_site  # noqa: E402
+
+SITE_DIR = Path(__file__).parent.parent / "site"
+
+
+def repo_entry(date):
+    return {
+        "name": "repo",
+        "full_name": "org/repo",
+        "description": "desc",
+        "url": "http://url",
+        "stars": 1,
+        "update_date": date,
+        "is_fresh": True,
+        "title": f"Release {date}",
+        "pub_date": "Mon, 01 Jan 2024 00:00:00 GMT",
+        "summary_data": {"whats_new": ["x"], "why_important": f"Day *{date}*"},
+    }
+
+
+class TestDataset(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.base = Path(self.tmp.name)
+
+    def test_save_and_load_day(self):
+        data_dir = self.base / "data"
+        dataset.save_day(data_dir, "2024-01-02", [repo_entry("2024-01-02")], None)
+        dataset.save_day(data_dir, "2024-01-01", [], {"ecosystem_summary": "s"})
+
+        self.assertEqual(dataset.list_days(data_dir), ["2024-01-01", "2024-01-02"])
+        day = dataset.load_day(data_dir, "2024-01-01")
+        self.assertEqual(day["schema_version"], dataset.SCHEMA_VERSION)
+        self.assertEqual(day["global_summary_data"], {"ecosystem_summary": "s"})
+        self.assertIsNone(dataset.load_day(data_dir, "2023-12-31"))
+
+        with patch.object(dataset, "SCHEMA_VERSION", 0):
+            self.assertIsNone(dataset.load_day(data_dir, "2024-01-01"))
+
+    @patch("src.main.generate_global_summary")
+    @patch("src.main.yield_active_ai_repos")
+    def test_rerender_site_uses_only_stored_days(self, mock_yield, mock_global):
+        site_dir = self.base / "site"
+        site_dir.mkdir()
+        for name in ("template.html", "rss_template.xml"):
+            shutil.copy(SITE_DIR / name, site_dir / name)
+        for date in ("2024-01-01", "2024-01-02"):
+            dataset.save_day(site_dir / "data", date, [repo_entry(date)], None)
+
+        self.assertEqual(rerender_site(self.base), 2)
+
+        mock_yield.assert_not_called()
+        mock_global.assert_not_called()
+        archive = (site_dir / "archives" / "2024-01-01.html").read_text("utf-8")
+        self.assertIn("Day <em>2024-01-01</em>", archive)
+        index = (site_dir / "index.html").read_text("utf-8")
+        self.assertIn("Day <em>2024-01-02</em>", index)
+        self.assertIn("Day <em>2024-01-02</em>", (site_dir / "feed.xml").read_text())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -13,12 +13,18 @@ from src.main import generate_site  # noqa: E402
 
 class TestFlow(unittest.TestCase):
     @patch("src.main.yield_active_ai_repos")
-    @patch("src.main.check_for_daily_update")
+    @patch("src.main.check_for_updates")
     @patch("src.main.generate_global_summary")
     @patch("builtins.open", new_callable=mock_open, read_data="{{title}}")
+    @patch("src.main.save_day", lambda *args, **kwargs: None)
     @patch("src.main.json.dump")
     def test_generate_site_flow(
-        self, mock_json_dump, mock_file_open, mock_global_summary, mock_check_update, mock_yield_repos
+        self,
+        mock_json_dump,
+        mock_file_open,
+        mock_global_summary,
+        mock_check_update,
+        mock_yield_repos,
     ):
         print("Testing generate_site flow...")
 
@@ -47,25 +53,28 @@ class TestFlow(unittest.TestCase):
 
         # First repo has update, second doesn't
         mock_check_update.side_effect = [
-            {
-                "whats_new": ["Feature 1", "Feature 2"],
-                "why_important": "It is important.",
-                "try_it_out": {
-                    "language": "python",
-                    "beginner": {"code": "print('hello')"},
-                    "intermediate": {"code": "def hello(): pass"},
-                    "advanced": {"code": "class Hello: pass"},
+            (
+                {
+                    "whats_new": ["Feature 1", "Feature 2"],
+                    "why_important": "It is important.",
+                    "try_it_out": {
+                        "language": "python",
+                        "beginner": {"code": "print('hello')"},
+                        "intermediate": {"code": "def hello(): pass"},
+                        "advanced": {"code": "class Hello: pass"},
+                    },
                 },
-            },
-            None,
-            None,
+                "2024-01-01",
+            ),
+            (None, None),
         ]
 
         # Run function
         generate_site(target_date_str="2024-01-01")
 
-        # Verify check_update called twice
-        self.assertEqual(mock_check_update.call_count, 3)
+        # Only the repo with an in-window entry reaches the summarizer
+        self.assertEqual(mock_check_update.call_count, 1)
+        self.assertEqual(mock_check_update.call_args[0][1], ["2024-01-01"])
 
         # Verify result was written to json
         # mock_json_dump.call_args[0][0] is the data dict
@@ -4,25 +4,32 @@ from datetime import datetime, timezone
 import sys
 import os
 
-sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src import github_client
+from src.changelog_parser import find_section
+from src.github_client import yield_active_ai_repos, yield_vip_repos
 
-from src.github_client import yield_active_ai_repos
 
 class TestGithubClient(unittest.TestCase):
-    @patch('src.github_client.get_github_client')
-    @patch('src.github_client.yield_vip_repos')
+    @patch("src.github_client.get_github_client")
+    @patch("src.github_client.yield_vip_repos")
     def test_yield_active_ai_repos(self, mock_yield_vip, mock_get_client):
         # Mocking VIP repos to yield one item
-        mock_yield_vip.return_value = iter([{
-            "name": "vip-repo",
-            "full_name": "org/vip-repo",
-            "description": "desc",
-            "url": "http://url",
-            "stars": 100,
-            "updated_at": datetime.now(timezone.utc).isoformat(),
-            "changelog": "## [2024-01-01] Update"
-        }])
-        
+        mock_yield_vip.return_value = iter(
+            [
+                {
+                    "name": "vip-repo",
+                    "full_name": "org/vip-repo",
+                    "description": "desc",
+                    "url": "http://url",
+                    "stars": 100,
+                    "updated_at": datetime.now(timezone.utc).isoformat(),
+                    "changelog": "## [2024-01-01] Update",
+                }
+            ]
+        )
+
         # Mocking standard search
         mock_github = MagicMock()
         mock_repo = MagicMock()
@@ -32,20 +39,393 @@ class TestGithubClient(unittest.TestCase):
         mock_repo.html_url = "http://standard"
         mock_repo.stargazers_count = 50
         mock_repo.updated_at = datetime.now(timezone.utc)
-        
+
         # Mock get_release to avoid 404 block
         mock_release = MagicMock()
         mock_release.body = "## [2024-01-01] New features"
         mock_repo.get_releases.return_value = [mock_release]
-        
+
         class DummyList(list):
             totalCount = 1
-            
+
         mock_github.search_repositories.return_value = DummyList([mock_repo])
         mock_get_client.return_value = mock_github
-        
+
         repos = list(yield_active_ai_repos(days_lookback=3))
         self.assertTrue(isinstance(repos, list))
 
-if __name__ == '__main__':
+    @patch(
+        "src.github_client.get_repo_content",
+        return_value={"changelog": "log", "unchanged": False},
+    )
+    @patch("src.github_client.get_repo_with_retry")
+    def test_yield_vip_repos_keeps_order_concurrently(
+        self, mock_get_repo, mock_content
+    ):
+        import time
+
+        vips = ["org/slow", "org/missing", "org/fast"]
+
+        def fake_get_repo(name):
+            if name == "org/missing":
+                raise Exception("boom")
+            if name == "org/slow":
+                time.sleep(0.05)
+            repo = MagicMock()
+            repo.full_name = name
+            repo.updated_at = datetime.now(timezone.utc)
+            return repo
+
+        mock_get_repo.side_effect = fake_get_repo
+        with patch("src.github_client.config.VIP_REPOS", vips):
+            repos = list(yield_vip_repos(max_workers=3))
+
+        self.assertEqual([r["full_name"] for r in repos], ["org/slow", "org/fast"])
+        self.assertEqual(repos[0]["changelog"], "log")
+
+    @patch("src.github_client.Github")
+    def test_github_client_is_shared(self, mock_github_cls):
+        github_client.set_github_client(None)
+        try:
+            first = github_client.get_github_client()
+            second = github_client.get_github_client()
+            self.assertIs(first, second)
+            mock_github_cls.assert_called_once()
+            self.assertEqual(
+                mock_github_cls.call_args.kwargs["pool_size"],
+                github_client.config.GITHUB_POOL_SIZE,
+            )
+        finally:
+            github_client.set_github_client(None)
+
+    def test_rate_limited_response_reaches_the_scheduler(self):
+        import threading
+        from functools import partial
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        from src.rate_limiter import GitHubRateScheduler
+
+        requests_seen = []
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                requests_seen.append(self.path)
+                limited = len(requests_seen) == 1
+                body = b'{"message": "You have exceeded a secondary rate limit"}'
+                if not limited:
+                    body = b'{"full_name": "o/r"}'
+                self.send_response(403 if limited else 200)
+                if limited:
+                    self.send_header("Retry-After", "7")
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        base_url = "http://%s:%s" % server.server_address[:2]
+
+        slept = []
+        scheduler = GitHubRateScheduler(sleep=slept.append)
+        real_github = github_client.Github
+        with (
+            patch.object(
+                github_client, "Github", partial(real_github, base_url=base_url)
+            ),
+            patch.object(github_client, "_rate_scheduler", scheduler),
+            patch.object(github_client, "_http_cache", None),
+        ):
+            github_client.set_github_client(github_client._create_github_client())
+            try:
+                data = github_client._conditional_get("/repos/o/r")
+            finally:
+                github_client.set_github_client(None)
+
+        self.assertEqual(data, {"full_name": "o/r"})
+        self.assertEqual(len(requests_seen), 2)  # urllib3 did not retry on its own
+        self.assertEqual(slept, [7.0])  # the scheduler owned the wait
+
+    def test_set_github_client_injects_fake(self):
+        fake = MagicMock()
+        fake.requester.requestJson.return_value = (200, {}, '{"full_name": "org/repo"}')
+        github_client.set_github_client(fake)
+        try:
+            github_client.get_repo_with_retry("org/repo")
+            self.assertEqual(
+                fake.requester.requestJson.call_args[0][1], "/repos/org/repo"
+            )
+            fake.create_from_raw_data.assert_called_once()
+        finally:
+            github_client.set_github_client(None)
+        fake.close.assert_called_once()
+
+    def test_conditional_get_serves_304_from_cache(self):
+        import tempfile
+        from src.cache import DiskCache
+
+        fake = MagicMock()
+        fake.requester.requestJson.side_effect = [
+            (200, {"etag": '"abc"'}, '[{"name": "CHANGELOG.md"}]'),
+            (304, {}, ""),
+        ]
+        github_client.set_github_client(fake)
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = DiskCache(tmp, max_bytes=1_000_000)
+            try:
+                with patch.object(github_client, "_http_cache", cache):
+                    first = github_client._conditional_get("/repos/o/r/contents/")
+                    second = github_client._conditional_get("/repos/o/r/contents/")
+            finally:
+                github_client.set_github_client(None)
+
+        self.assertEqual(first, second)
+        second_headers = fake.requester.requestJson.call_args.kwargs["headers"]
+        self.assertEqual(second_headers["If-None-Match"], '"abc"')
+        self.assertEqual(cache.stats()["hits"], 1)
+
+    def test_fetch_repos_graphql_uses_two_queries(self):
+        node = {
+            "name": "repo",
+            "nameWithOwner": "org/repo",
+            "description": "desc",
+            "url": "https://github.com/org/repo",
+            "stargazerCount": 10,
+            "pushedAt": "2024-01-01T00:00:00Z",
+            "updatedAt": "2024-01-01T00:00:00Z",
+            "object": {
+                "entries": [
+                    {"name": "README.md", "type": "blob", "object": {"byteSize": 5}},
+                    {"name": "CHANGELOG.md", "type": "blob", "object": {"byteSize": 9}},
+                ]
+            },
+            "releases": {"nodes": []},
+        }
+        fake = MagicMock()
+        fake.requester.requestJsonAndCheck.side_effect = [
+            ({}, {"data": {"r0": node, "r1": None}}),
+            ({}, {"data": {"r0": {"object": {"text": "## 2024-01-01"}}}}),
+        ]
+        github_client.set_github_client(fake)
+        try:
+            records = github_client.fetch_repos_graphql(["org/repo", "org/gone"])
+        finally:
+            github_client.set_github_client(None)
+
+        self.assertEqual(fake.requester.requestJsonAndCheck.call_count, 2)
+        self.assertIsNone(records[1])
+        self.assertEqual(records[0]["full_name"], "org/repo")
+        self.assertEqual(records[0]["stars"], 10)
+        self.assertEqual(records[0]["changelog"], "## 2024-01-01")
+        blob_vars = fake.requester.requestJsonAndCheck.call_args.kwargs["input"]
+        self.assertEqual(blob_vars["variables"]["e0"], "HEAD:CHANGELOG.md")
+
+    def test_release_body_headings_stay_inside_release_section(self):
+        content = github_client._format_releases(
+            [
+                (
+                    "2024-01-05",
+                    "v1.2.0",
+                    "# Highlights\n- Faster\n\nFixes\n=====\n- Bug",
+                ),
+                ("2024-01-03", "v1.1.0", None),
+            ]
+        )
+        section = find_section(content, "2024-01-05")
+        self.assertIn("### Highlights", section)
+        self.assertIn("- Faster", section)
+        self.assertIn("### Fixes\n- Bug", section)
+        self.assertNotIn("v1.1.0", section)
+        self.assertNotIn("None", content)
+
+    def test_prefilter_reason_uses_push_and_release_dates(self):
+        reason = github_client._prefilter_reason
+        self.assertIsNone(reason(None, "2020-01-01T00:00:00Z"))
+        self.assertIsNone(reason("2024-03-10", "2024-03-10T08:00:00Z"))
+        # One day of slack for changelogs dated in local time
+        self.assertIsNone(reason("2024-03-10", datetime(2024, 3, 9, 12)))
+        self.assertEqual(reason("2024-03-10", "2024-03-01T00:00:00Z"), "inactive")
+        self.assertIsNone(
+            reason("2024-03-10", "2024-03-01T00:00:00Z", "2024-03-10T01:00:00Z")
+        )
+        self.assertIsNone(reason("2024-03-10", None))
+
+    def test_fetch_repos_graphql_prefilter_skips_blob_query(self):
+        node = {
+            "name": "repo",
+            "nameWithOwner": "org/repo",
+            "description": "desc",
+            "url": "https://github.com/org/repo",
+            "stargazerCount": 10,
+            "pushedAt": "2024-01-01T00:00:00Z",
+            "updatedAt": "2024-01-01T00:00:00Z",
+            "object": {
+                "entries": [
+                    {"name": "CHANGELOG.md", "type": "blob", "object": {"byteSize": 9}}
+                ]
+            },
+            "releases": {"nodes": []},
+        }
+        fake = MagicMock()
+        fake.requester.requestJsonAndCheck.return_value = ({}, {"data": {"r0": node}})
+        github_client.set_github_client(fake)
+        before = github_client.get_prefilter_stats()["inactive"]
+        try:
+            records = github_client.fetch_repos_graphql(
+                ["org/repo"], since="2024-02-01"
+            )
+        finally:
+            github_client.set_github_client(None)
+
+        self.assertEqual(records, [None])
+        self.assertEqual(fake.requester.requestJsonAndCheck.call_count, 1)
+        self.assertEqual(github_client.get_prefilter_stats()["inactive"], before + 1)
+
+    @patch("src.github_client.get_state_store", return_value=None)
+    @patch("src.github_client.yield_vip_repos", return_value=iter([]))
+    @patch("src.github_client.get_github_client")
+    @patch("src.github_client._build_search")
+    @patch("src.github_client._graphql")
+    def test_search_hits_are_prefiltered_once_with_graphql(
+        self, mock_graphql, mock_search, mock_client, mock_vip, mock_store
+    ):
+        def hits():
+            yield {"full_name": "org/repo"}
+
+        mock_search.return_value = hits()
+        mock_client.return_value.create_from_raw_data.return_value = MagicMock(
+            full_name="org/repo", pushed_at=datetime(2024, 2, 2, tzinfo=timezone.utc)
+        )
+        mock_graphql.return_value = {
+            "r0": {
+                "name": "repo",
+                "nameWithOwner": "org/repo",
+                "description": "desc",
+                "url": "https://github.com/org/repo",
+                "stargazerCount": 10,
+                "pushedAt": "2024-02-02T00:00:00Z",
+                "updatedAt": "2024-02-02T00:00:00Z",
+                "object": None,
+                "releases": {"nodes": []},
+            }
+        }
+        before = github_client.get_prefilter_stats()["passed"]
+        with patch.object(github_client.config, "GITHUB_BACKEND", "graphql"):
+            records = list(yield_active_ai_repos(since="2024-02-01"))
+
+        self.assertEqual([r["full_name"] for r in records], ["org/repo"])
+        self.assertEqual(github_client.get_prefilter_stats()["passed"], before + 1)
+
+    @patch("src.github_client.get_state_store", return_value=None)
+    @patch("src.github_client._list_releases")
+    @patch("src.github_client._download_changelog")
+    @patch("src.github_client._changelog_entries")
+    def test_repo_content_probes_releases_when_changelog_stale(
+        self, mock_entries, mock_download, mock_releases, mock_store
+    ):
+        repo = MagicMock(full_name="org/repo")
+        mock_entries.return_value = [
+            {"name": "CHANGELOG.md", "path": "CHANGELOG.md", "size": 100, "sha": "abc"}
+        ]
+        mock_releases.return_value = [
+            {
+                "id": 7,
+                "name": "b4242",
+                "tag_name": "b4242",
+                "published_at": "2024-03-10T05:00:00Z",
+                "created_at": "2024-03-10T05:00:00Z",
+                "body": "Faster kernels",
+            }
+        ]
+
+        # Small changelog is cheapest and covers the window: releases never fetched
+        mock_download.return_value = "## [1.1.0] - 2024-03-09\n- New\n"
+        content = github_client.get_repo_content(repo, since="2024-03-08")
+        self.assertEqual(content["changelog_sha"], "abc")
+        mock_releases.assert_not_called()
+
+        # Stale changelog: the releases are probed and win
+        mock_download.return_value = "## [1.0.0] - 2023-06-01\n- Old\n"
+        content = github_client.get_repo_content(repo, since="2024-03-08")
+        self.assertEqual(content["release_id"], "7")
+        self.assertIn("## [2024-03-10] b4242", content["changelog"])
+
+        # Nothing in the window anywhere: keep the first source fetched
+        mock_releases.return_value[0]["published_at"] = "2024-01-01T00:00:00Z"
+        content = github_client.get_repo_content(repo, since="2024-03-08")
+        self.assertEqual(content["changelog_sha"], "abc")
+
+    def test_fetch_repos_graphql_uses_fresh_releases_over_stale_changelog(self):
+        node = {
+            "name": "repo",
+            "nameWithOwner": "org/repo",
+            "description": "desc",
+            "url": "https://github.com/org/repo",
+            "stargazerCount": 10,
+            "pushedAt": "2024-03-10T00:00:00Z",
+            "updatedAt": "2024-03-10T00:00:00Z",
+            "object": {
+                "entries": [
+                    {"name": "CHANGELOG.md", "type": "blob", "object": {"byteSize": 9}}
+                ]
+            },
+            "releases": {
+                "nodes": [
+                    {
+                        "databaseId": 7,
+                        "name": "b4242",
+                        "tagName": "b4242",
+                        "publishedAt": "2024-03-10T05:00:00Z",
+                        "createdAt": "2024-03-10T05:00:00Z",
+                        "description": "Faster kernels",
+                    }
+                ]
+            },
+        }
+        fake = MagicMock()
+        fake.requester.requestJsonAndCheck.return_value = ({}, {"data": {"r0": node}})
+        github_client.set_github_client(fake)
+        try:
+            with patch("src.github_client.get_state_store", return_value=None):
+                records = github_client.fetch_repos_graphql(
+                    ["org/repo"], since="2024-03-08"
+                )
+        finally:
+            github_client.set_github_client(None)
+
+        # No blob query: the releases already cover the window
+        self.assertEqual(fake.requester.requestJsonAndCheck.call_count, 1)
+        self.assertEqual(records[0]["release_id"], "7")
+
+    @patch("src.github_client.requests.get")
+    def test_read_changelog_head_stops_past_window(self, mock_get):
+        chunks = [
+            b"# Changelog\n\n## [2.0.0] - 2024-03-10\n- New\n\n",
+            b"## [1.9.0] - 2024-03-01\n- Older\n## [1.8",
+            b".0] - 2024-02-01\n" + b"x" * 10_000,
+        ]
+        response = MagicMock()
+        response.status_code = 206
+        response.headers = {"Content-Range": "bytes 0-524287/50000000"}
+        response.iter_content.return_value = iter(chunks)
+        mock_get.return_value.__enter__.return_value = response
+
+        text = github_client._read_changelog_head(
+            "https://raw.example/CHANGELOG.md", since="2024-03-09"
+        )
+
+        self.assertIn("- New", text)
+        self.assertTrue(text.endswith("- Older\n"))
+        self.assertNotIn("xxx", text)
+        self.assertEqual(len(list(response.iter_content.return_value)), 1)  # unread
+        self.assertTrue(mock_get.call_args.kwargs["stream"])
+        self.assertIn("Range", mock_get.call_args.kwargs["headers"])
+
+
+if __name__ == "__main__":
     unittest.main()
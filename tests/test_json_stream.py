@@ -0,0 +1,34 @@
+import os
+import sys
+import unittest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.json_stream import IncrementalJSONParser  # noqa: E402
+
+
+class TestIncrementalJSONParser(unittest.TestCase):
+    def test_reports_fields_as_they_complete(self):
+        text = (
+            '{"update_found": true, "title": "v2, \\"fast\\" {build}",'
+            ' "whats_new": ["a", "b]"], "try_it_out": {"code": "x = {1: [2]}"}}'
+        )
+        parser = IncrementalJSONParser()
+        seen = []
+        for i in range(0, len(text), 7):
+            seen.extend(parser.feed(text[i : i + 7]))
+
+        self.assertEqual(seen, ["update_found", "title", "whats_new", "try_it_out"])
+        self.assertEqual(parser.fields["title"], 'v2, "fast" {build}')
+        self.assertEqual(parser.fields["whats_new"], ["a", "b]"])
+        self.assertEqual(parser.text, text)
+
+    def test_decision_arrives_before_the_rest(self):
+        parser = IncrementalJSONParser()
+        self.assertEqual(parser.feed('{"update_found": false'), {})
+        self.assertEqual(parser.feed(', "title": "unfini'), {"update_found": False})
+        self.assertNotIn("title", parser.fields)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -3,32 +3,234 @@ from unittest.mock import patch, mock_open
 import sys
 import os
 
-sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 # We already have test_flow.py but we can add an extra test for main.
 from src.main import generate_site
 
+
 class TestMain(unittest.TestCase):
-    @patch('src.main.yield_active_ai_repos')
-    @patch('src.main.check_for_daily_update')
-    @patch('src.main.generate_global_summary')
-    @patch('builtins.open', new_callable=mock_open, read_data="{{title}}")
-    @patch('src.main.json.dump')
-    def test_generate_site_skips_if_exists_no_force(self, mock_json, mock_file, mock_global_summary, mock_check, mock_yield):
-        with patch('src.main.Path.exists', return_value=True):
+    @patch("src.main.yield_active_ai_repos")
+    @patch("src.main.check_for_updates")
+    @patch("src.main.generate_global_summary")
+    @patch("builtins.open", new_callable=mock_open, read_data="{{title}}")
+    @patch("src.main.json.dump")
+    def test_generate_site_skips_if_exists_no_force(
+        self, mock_json, mock_file, mock_global_summary, mock_check, mock_yield
+    ):
+        with patch("src.main.Path.exists", return_value=True):
             generate_site("2024-01-01", force=False)
             mock_yield.assert_not_called()
 
-    @patch('src.main.yield_active_ai_repos')
-    @patch('src.main.check_for_daily_update')
-    @patch('src.main.generate_global_summary')
-    @patch('builtins.open', new_callable=mock_open, read_data="{{title}}")
-    @patch('src.main.json.dump')
-    def test_generate_site_force(self, mock_json, mock_file, mock_global_summary, mock_check, mock_yield):
-        with patch('src.main.Path.exists', return_value=True):
+    @patch("src.main.yield_active_ai_repos")
+    @patch("src.main.check_for_updates")
+    @patch("src.main.generate_global_summary")
+    @patch("builtins.open", new_callable=mock_open, read_data="{{title}}")
+    @patch("src.main.save_day", lambda *args, **kwargs: None)
+    @patch("src.main.json.dump")
+    def test_generate_site_force(
+        self, mock_json, mock_file, mock_global_summary, mock_check, mock_yield
+    ):
+        with patch("src.main.Path.exists", return_value=True):
             mock_yield.return_value = iter([])
             generate_site("2024-01-01", force=True)
             mock_yield.assert_called()
 
-if __name__ == '__main__':
+    @patch("src.main.yield_active_ai_repos")
+    @patch("src.main.check_for_updates")
+    @patch("src.main.generate_global_summary")
+    @patch("builtins.open", new_callable=mock_open, read_data="{{title}}")
+    @patch("src.main.save_day", lambda *args, **kwargs: None)
+    @patch("src.main.json.dump")
+    def test_generate_site_pipeline_mode(
+        self, mock_json, mock_file, mock_global_summary, mock_check, mock_yield
+    ):
+        repo = {
+            "name": "repo",
+            "full_name": "org/repo",
+            "description": "desc",
+            "url": "http://url",
+            "stars": 1,
+            "changelog": "## [2024-01-01] Update",
+        }
+        mock_yield.return_value = iter([repo, dict(repo, full_name="org/other")])
+        served_by = {"model": "gemini-x", "seconds": 1.5}
+        mock_check.side_effect = [
+            ({"title": "T", "served_by": served_by}, "2024-01-01"),
+            (None, None),
+        ]
+
+        generate_site("2024-01-01", force=True, pipeline=True)
+
+        self.assertEqual(mock_check.call_count, 2)
+        meta = mock_json.call_args[0][0]
+        self.assertEqual(meta["repo_count"], 1)
+        self.assertEqual(meta["served_by"], {"org/repo": served_by})
+        self.assertIn("render", meta["telemetry"]["spans"])
+
+    @patch("src.main.yield_active_ai_repos")
+    @patch("src.main.summarize_updates_batch")
+    @patch("src.main.check_for_updates")
+    @patch("src.main.generate_global_summary")
+    @patch("builtins.open", new_callable=mock_open, read_data="{{title}}")
+    @patch("src.main.save_day", lambda *args, **kwargs: None)
+    @patch("src.main.json.dump")
+    def test_generate_site_batch_mode(
+        self,
+        mock_json,
+        mock_file,
+        mock_global_summary,
+        mock_check,
+        mock_batch,
+        mock_yield,
+    ):
+        repo = {
+            "name": "repo",
+            "full_name": "org/repo",
+            "description": "desc",
+            "url": "http://url",
+            "stars": 1,
+            "changelog": "## [2024-01-01] Update",
+        }
+        stale = dict(repo, full_name="org/stale", changelog="## [2023-01-01] Old")
+        mock_yield.return_value = iter([repo, stale])
+        mock_batch.return_value = {"org/repo": {"title": "T"}}
+
+        generate_site("2024-01-01", force=True, batch=True)
+
+        mock_check.assert_not_called()
+        mock_batch.assert_called_once()
+        self.assertEqual(
+            [item["full_name"] for item in mock_batch.call_args[0][0]], ["org/repo"]
+        )
+        self.assertEqual(mock_json.call_args[0][0]["repo_count"], 1)
+
+    @patch("src.main.yield_active_ai_repos")
+    @patch("src.main.check_for_updates")
+    @patch("src.main.generate_global_summary")
+    @patch("builtins.open", new_callable=mock_open, read_data="{{title}}")
+    @patch("src.main.save_day", lambda *args, **kwargs: None)
+    @patch("src.main.json.dump")
+    def test_generate_site_reuses_state_for_unchanged_repo(
+        self, mock_json, mock_file, mock_global_summary, mock_check, mock_yield
+    ):
+        from src.state_store import StateStore
+
+        store = StateStore(":memory:")
+        store.record_repo("org/repo", changelog_sha="abc", section_dates=["2024-01-01"])
+        store.record_summary("org/repo", "changelog", "2024-01-01", {"title": "Stored"})
+        repo = {
+            "name": "repo",
+            "full_name": "org/repo",
+            "description": "desc",
+            "url": "http://url",
+            "stars": 1,
+            "changelog": None,
+            "changelog_sha": "abc",
+            "unchanged": True,
+        }
+        mock_yield.return_value = iter([repo])
+
+        with patch("src.main.get_state_store", return_value=store):
+            generate_site("2024-01-01", force=True)
+
+        mock_check.assert_not_called()
+        meta = mock_json.call_args[0][0]
+        self.assertEqual(meta["repo_count"], 1)
+        self.assertEqual(store.stats()["summaries_reused"], 1)
+
+    @patch("src.main.yield_active_ai_repos")
+    @patch("src.main.check_for_updates")
+    @patch("src.main.generate_global_summary")
+    @patch("builtins.open", new_callable=mock_open, read_data="{{title}}")
+    @patch("src.main.save_day", lambda *args, **kwargs: None)
+    @patch("src.main.json.dump")
+    def test_generate_site_resumes_from_journal(
+        self, mock_json, mock_file, mock_global_summary, mock_check, mock_yield
+    ):
+        import tempfile
+        from pathlib import Path
+
+        from src.journal import RunJournal
+
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        journal = RunJournal(Path(tmp.name) / "2024-01-01.ndjson")
+        repo = {
+            "name": "repo",
+            "full_name": "org/repo",
+            "description": "desc",
+            "url": "http://url",
+            "stars": 1,
+            "changelog": "## [2024-01-01] Update",
+        }
+        journal.append(
+            {
+                "full_name": "org/repo",
+                "outcome": "update",
+                "entry": {"full_name": "org/repo", "is_fresh": True, "title": "T"},
+            }
+        )
+        journal.append({"full_name": "org/quiet", "outcome": "no_update"})
+        with journal.path.open("ab") as f:
+            f.write(b'{"full_name": "org/to')  # interrupted mid-write
+        mock_yield.return_value = iter(
+            [repo, dict(repo, full_name="org/quiet"), dict(repo, full_name="org/new")]
+        )
+        mock_check.return_value = (None, None)
+
+        with patch("src.main._open_journal", return_value=journal):
+            generate_site("2024-01-01", force=True)
+
+        mock_check.assert_called_once()
+        self.assertEqual(mock_json.call_args[0][0]["repo_count"], 1)
+        self.assertFalse(journal.path.exists())
+
+    @patch("src.main.yield_active_ai_repos")
+    @patch("src.main.check_for_updates")
+    @patch("src.main.generate_global_summary")
+    @patch("builtins.open", new_callable=mock_open, read_data="{{title}}")
+    @patch("src.main.save_day", lambda *args, **kwargs: None)
+    @patch("src.main.json.dump")
+    def test_generate_site_summarizes_only_selected_candidates(
+        self, mock_json, mock_file, mock_global_summary, mock_check, mock_yield
+    ):
+        def repo(name, stars, date):
+            return {
+                "name": name,
+                "full_name": f"org/{name}",
+                "description": "desc",
+                "url": "http://url",
+                "stars": stars,
+                "changelog": f"## [{date}] Update",
+            }
+
+        older = [repo("old-low", 5, "2023-12-31"), repo("old-high", 50, "2023-12-30")]
+        fresh = [repo(f"fresh{i}", 1, "2024-01-01") for i in range(9)]
+        mock_check.side_effect = lambda content, dates, index=None: (
+            {"title": "T"},
+            dates[0],
+        )
+
+        # Nine fresh entries fill the page: the older hits never reach Gemini
+        mock_yield.return_value = iter(older + fresh)
+        generate_site("2024-01-01", force=True)
+        self.assertEqual(mock_check.call_count, 9)
+        self.assertEqual(
+            {c[0][1][0] for c in mock_check.call_args_list}, {"2024-01-01"}
+        )
+        self.assertEqual(mock_json.call_args[0][0]["repo_count"], 9)
+
+        # Leftover slots go to the older hits, most-starred first
+        mock_check.reset_mock()
+        mock_yield.return_value = iter(older + fresh[:1])
+        generate_site("2024-01-01", force=True)
+        self.assertEqual(
+            [c[0][0] for c in mock_check.call_args_list[1:]],
+            ["## [2023-12-30] Update", "## [2023-12-31] Update"],
+        )
+        self.assertEqual(mock_json.call_args[0][0]["repo_count"], 3)
+
+
+if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,187 @@
+import os
+import sys
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src import summarizer  # noqa: E402
+from src.model_health import (  # noqa: E402
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    TRUNCATED,
+    ModelHealth,
+    next_quota_reset,
+)
+from src.rate_limiter import RateLimiter  # noqa: E402
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestModelHealth(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = os.path.join(self.tmp.name, "model_health.json")
+        self.clock = FakeClock()
+
+    def health(self):
+        return ModelHealth(
+            self.path, failure_threshold=2, cooldown=60, clock=self.clock
+        )
+
+    def test_opens_after_consecutive_failures_and_persists(self):
+        health = self.health()
+        health.record_failure("m", "503")
+        self.assertTrue(health.allow("m"))
+        health.record_failure("m", "503")
+        self.assertFalse(health.allow("m"))
+
+        # A new process still knows the model is failing
+        self.assertEqual(self.health().state("m"), OPEN)
+        stats = self.health().snapshot()["m"]
+        self.assertEqual(stats["error_rate"], 1.0)
+        self.assertEqual(stats["open_for_seconds"], 60)
+
+    def test_probe_closes_or_doubles_cooldown(self):
+        health = self.health()
+        health.trip("m", self.clock.now + 10, "daily quota")
+        self.clock.now += 10
+        self.assertTrue(health.allow("m"))
+        self.assertEqual(health.state("m"), HALF_OPEN)
+
+        health.record_failure("m", "503")
+        self.assertEqual(health.state("m"), OPEN)
+        self.clock.now += 60
+        self.assertEqual(health.state("m"), OPEN)  # cool-down doubled to 120s
+        self.clock.now += 60
+        self.assertTrue(health.allow("m"))
+
+        health.record_success("m", 1.5)
+        self.assertEqual(health.state("m"), CLOSED)
+        self.assertEqual(health.snapshot()["m"]["p50_latency_seconds"], 1.5)
+
+    def test_rank_prefers_fastest_reliable_model(self):
+        health = self.health()
+        for _ in range(5):
+            health.record_success("slow", 9.0)
+            health.record_success("fast", 2.0)
+            health.record_success("flaky", 1.0, TRUNCATED)
+        health.record_success("new", 0.5)
+
+        ranked = health.rank(["flaky", "new", "slow", "fast"], min_samples=5)
+        self.assertEqual(ranked, ["fast", "slow", "new", "flaky"])
+        perf = health.performance("flaky")
+        self.assertEqual(perf["truncation_rate"], 1.0)
+        self.assertEqual(perf["p95_latency_seconds"], 1.0)
+
+    def test_next_quota_reset_is_pacific_midnight(self):
+        # 2024-01-01 12:00 UTC is 04:00 PST; the quota resets at 08:00 UTC the next day
+        self.assertEqual(next_quota_reset(1704110400), 1704182400)
+
+
+class TestFallbackCircuit(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.clock = FakeClock()
+        self.health = ModelHealth(
+            os.path.join(tmp.name, "model_health.json"), cooldown=60, clock=self.clock
+        )
+        self.limiter = RateLimiter(
+            6000, daily_limit=10, ledger_path=os.path.join(tmp.name, "quota.json")
+        )
+        self.client = MagicMock()
+        patchers = [
+            patch.object(summarizer, "_model_health", self.health),
+            patch.object(summarizer, "_rate_limiter", self.limiter),
+            patch.object(summarizer, "_get_gemini_client", return_value=self.client),
+            patch.object(summarizer.config, "GEMINI_MODEL", "primary"),
+            patch.object(summarizer.config, "GEMINI_FALLBACK_MODELS", ["backup"]),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def called_models(self):
+        return [
+            c.kwargs["model"] for c in self.client.models.generate_content.mock_calls
+        ]
+
+    def test_daily_quota_opens_circuit_without_retry_waits(self):
+        def generate_content(model, contents, config):
+            if model == "primary":
+                raise RuntimeError(
+                    "429 RESOURCE_EXHAUSTED: GenerateRequestsPerDayPerProjectPerModel"
+                )
+            return "ok"
+
+        self.client.models.generate_content.side_effect = generate_content
+        self.assertEqual(summarizer._call_gemini_with_fallback("p", "s"), "ok")
+        self.assertEqual(summarizer._call_gemini_with_fallback("p", "s"), "ok")
+
+        # One attempt at the spent model, then it is skipped outright
+        self.assertEqual(self.called_models(), ["primary", "backup", "backup"])
+        self.assertEqual(self.health.state("primary"), OPEN)
+
+    def test_retried_outage_counts_as_one_failure(self):
+        self.client.models.generate_content.side_effect = RuntimeError(
+            "503 UNAVAILABLE"
+        )
+
+        with patch.object(
+            summarizer._call_gemini_single_model.retry, "sleep", lambda seconds: None
+        ):
+            self.assertIsNone(summarizer._call_gemini_with_fallback("p", "s"))
+
+        # Three attempts reached the API, but the breaker saw one failed call
+        self.assertEqual(self.limiter.ledger.used("primary"), 3)
+        self.assertEqual(self.health.state("primary"), CLOSED)
+        self.assertEqual(self.health.performance("primary")["recent_calls"], 1)
+
+    def test_probe_after_cooldown_is_a_single_attempt(self):
+        self.health.trip("primary", self.clock.now + 60, "503")
+        self.clock.now += 60
+        self.client.models.generate_content.side_effect = [
+            RuntimeError("503 UNAVAILABLE"),
+            "ok",
+        ]
+
+        self.assertEqual(summarizer._call_gemini_with_fallback("p", "s"), "ok")
+        self.assertEqual(self.called_models(), ["primary", "backup"])
+        self.assertEqual(self.health.state("primary"), OPEN)
+
+    def test_truncated_json_falls_through_and_records_route(self):
+        self.client.models.generate_content.side_effect = [
+            MagicMock(text='{"update_found": true, "title": "cut o'),
+            MagicMock(text='{"update_found": false}'),
+        ]
+
+        response = summarizer._call_gemini_with_fallback(
+            "p", "s", response_schema=summarizer.UPDATE_SCHEMA
+        )
+
+        self.assertEqual(response.text, '{"update_found": false}')
+        self.assertEqual(self.health.performance("primary")["truncation_rate"], 1.0)
+        self.assertEqual(summarizer._take_route()["model"], "backup")
+
+    def test_latency_budget_skips_slow_models(self):
+        for _ in range(5):
+            self.health.record_success("primary", 30.0)
+        self.client.models.generate_content.return_value = "ok"
+
+        with patch.object(summarizer.config, "ROUTING_LATENCY_BUDGET_SECONDS", 10):
+            self.assertEqual(summarizer._call_gemini_with_fallback("p", "s"), "ok")
+        self.assertEqual(self.called_models(), ["backup"])
+
+
+if __name__ == "__main__":
+    unittest.main()
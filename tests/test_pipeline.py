@@ -0,0 +1,56 @@
+import asyncio
+import os
+import sys
+import time
+import unittest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.pipeline import run_pipeline  # noqa: E402
+
+
+class TestPipeline(unittest.TestCase):
+    def test_handles_items_in_order(self):
+        seen = []
+        handled = asyncio.run(
+            run_pipeline(iter(range(5)), lambda item: seen.append(item), queue_size=2)
+        )
+        self.assertEqual(seen, [0, 1, 2, 3, 4])
+        self.assertEqual(handled, 5)
+
+    def test_early_stop_cancels_fetches_and_closes_source(self):
+        state = {"fetched": 0, "closed": False}
+
+        def source():
+            try:
+                for i in range(100):
+                    time.sleep(0.01)
+                    state["fetched"] += 1
+                    yield i
+            finally:
+                state["closed"] = True
+
+        seen = []
+
+        def handle(item):
+            seen.append(item)
+            return len(seen) == 3
+
+        asyncio.run(run_pipeline(source(), handle, queue_size=2))
+
+        self.assertEqual(seen, [0, 1, 2])
+        self.assertTrue(state["closed"])
+        # Bounded queue: only a few items fetched ahead of the consumer
+        self.assertLess(state["fetched"], 10)
+
+    def test_source_error_is_raised(self):
+        def source():
+            yield 1
+            raise RuntimeError("github down")
+
+        with self.assertRaises(RuntimeError):
+            asyncio.run(run_pipeline(source(), lambda item: False))
+
+
+if __name__ == "__main__":
+    unittest.main()
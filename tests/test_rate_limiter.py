@@ -0,0 +1,122 @@
+import os
+import sys
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src import summarizer  # noqa: E402
+from src.rate_limiter import (  # noqa: E402
+    DailyQuotaLedger,
+    GitHubRateScheduler,
+    RateLimiter,
+    TokenBucket,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.slept = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+class TestRateLimiter(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.ledger_path = os.path.join(self.tmp.name, "quota.json")
+
+    def test_token_bucket_only_waits_for_missing_budget(self):
+        clock = FakeClock()
+        bucket = TokenBucket(5, capacity=1, clock=clock, sleep=clock.sleep)
+
+        self.assertEqual(bucket.acquire(), 0)  # first call goes out immediately
+        clock.now += 10  # the LLM call itself took 10s
+        self.assertAlmostEqual(bucket.acquire(), 2.0)
+        clock.now += 30  # slow call: budget already refilled
+        self.assertEqual(bucket.acquire(), 0)
+
+    def test_ledger_persists_and_rolls_over(self):
+        ledger = DailyQuotaLedger(self.ledger_path, daily_limit=2)
+        ledger.record("m")
+        ledger.record("m")
+        self.assertEqual(DailyQuotaLedger(self.ledger_path, 2).remaining("m"), 0)
+
+        with patch.object(DailyQuotaLedger, "_today", return_value="2999-01-01"):
+            self.assertEqual(ledger.remaining("m"), 2)
+
+    def test_ledger_day_follows_pacific_quota_reset(self):
+        from datetime import datetime, timezone
+
+        class AfterUtcMidnight(datetime):
+            @classmethod
+            def now(cls, tz=None):
+                # 00:30 UTC on Jan 2 is still Jan 1 in California
+                return datetime(2024, 1, 2, 0, 30, tzinfo=timezone.utc).astimezone(tz)
+
+        with patch("src.rate_limiter.datetime", AfterUtcMidnight):
+            self.assertEqual(DailyQuotaLedger._today(), "2024-01-01")
+
+    def test_limiter_refuses_spent_model(self):
+        limiter = RateLimiter(60, daily_limit=1, ledger_path=self.ledger_path)
+        self.assertIsNotNone(limiter.acquire("m"))
+        self.assertIsNone(limiter.acquire("m"))
+        self.assertFalse(limiter.has_budget("m"))
+        self.assertTrue(limiter.has_budget("other"))
+
+    def test_fallback_skips_model_without_daily_budget(self):
+        limiter = RateLimiter(60, daily_limit=1, ledger_path=self.ledger_path)
+        limiter.mark_exhausted("primary")
+        client = MagicMock()
+
+        with (
+            patch.object(summarizer, "_rate_limiter", limiter),
+            patch.object(summarizer, "_get_gemini_client", return_value=client),
+            patch.object(summarizer.config, "GEMINI_MODEL", "primary"),
+            patch.object(summarizer.config, "GEMINI_FALLBACK_MODELS", ["backup"]),
+        ):
+            summarizer._call_gemini_with_fallback("prompt", "system")
+
+        models = [c.kwargs["model"] for c in client.models.generate_content.mock_calls]
+        self.assertEqual(models, ["backup"])
+        self.assertEqual(limiter.ledger.used("backup"), 1)
+
+
+class TestGitHubRateScheduler(unittest.TestCase):
+    def test_paces_low_budget_and_waits_for_reset(self):
+        clock = FakeClock()
+        clock.now = 1000.0
+        scheduler = GitHubRateScheduler(pace_below=0.1, clock=clock, sleep=clock.sleep)
+        self.assertEqual(scheduler.wait("search"), 0)  # nothing known yet
+
+        headers = {"x-ratelimit-limit": "30", "x-ratelimit-reset": "1060"}
+        scheduler.update("search", dict(headers, **{"x-ratelimit-remaining": "20"}))
+        self.assertEqual(scheduler.delay("search"), 0)
+        scheduler.update("search", dict(headers, **{"x-ratelimit-remaining": "2"}))
+        self.assertAlmostEqual(scheduler.delay("search"), 30.0)  # 60s over 2 calls
+        self.assertEqual(scheduler.delay("core"), 0)  # separate budget
+
+        scheduler.update("search", dict(headers, **{"x-ratelimit-remaining": "0"}))
+        self.assertAlmostEqual(scheduler.wait("search"), 61.0)
+        stats = scheduler.stats()["search"]
+        self.assertEqual(stats["requests"], 3)
+        self.assertAlmostEqual(stats["waited_seconds"], 61.0)
+
+    def test_backoff_prefers_retry_after(self):
+        clock = FakeClock()
+        scheduler = GitHubRateScheduler(clock=clock, sleep=clock.sleep)
+        self.assertEqual(scheduler.backoff("core", {"retry-after": "7"}), 7.0)
+        self.assertEqual(scheduler.backoff("core", {}), 60.0)  # nothing known
+        self.assertEqual(clock.slept, [7.0, 60.0])
+
+
+if __name__ == "__main__":
+    unittest.main()
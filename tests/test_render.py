@@ -0,0 +1,53 @@
+import os
+import sys
+import unittest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src import render  # noqa: E402
+from src.render import MarkdownMemo, render_site  # noqa: E402
+
+
+class TestRender(unittest.TestCase):
+    def setUp(self):
+        # Other tests render mocked templates through the shared environment
+        render._environments.clear()
+
+    def test_markdown_memo_converts_each_text_once(self):
+        memo = MarkdownMemo(max_entries=2)
+        self.assertEqual(memo.convert(None), "")
+        self.assertEqual(memo.convert("**a**"), "<p><strong>a</strong></p>")
+        memo.convert("**a**")
+        memo.convert("b")
+        memo.convert("c")  # evicts "**a**"
+        memo.convert("**a**")
+        self.assertEqual(memo.stats(), {"hits": 1, "misses": 4})
+
+    def test_render_site_uses_site_templates(self):
+        repo = {
+            "name": "repo",
+            "full_name": "org/repo",
+            "description": "desc",
+            "url": "http://url",
+            "stars": 1,
+            "update_date": "2024-01-01",
+            "is_fresh": True,
+            "title": "Release 1.0",
+            "pub_date": "Mon, 01 Jan 2024 00:00:00 GMT",
+            "summary_data": {
+                "title": "Release 1.0",
+                "whats_new": ["Faster"],
+                "why_important": "Uses *less* memory.",
+                "try_it_out": {"language": "python", "code": "pip install repo"},
+            },
+        }
+
+        html, rss_xml = render_site([repo], None, "2024-01-01")
+
+        self.assertIn("<em>less</em>", html)
+        self.assertIn('href="http://url"', html)
+        self.assertIn("<em>less</em>", rss_xml)
+
+
+if __name__ == "__main__":
+    unittest.main()
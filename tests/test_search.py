@@ -0,0 +1,70 @@
+import os
+import sys
+import tempfile
+import threading
+import unittest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.cache import DiskCache  # noqa: E402
+from src.search import ShardedSearch  # noqa: E402
+
+
+def repo(name, stars):
+    return {"full_name": name, "stargazers_count": stars}
+
+
+class TestShardedSearch(unittest.TestCase):
+    def test_merges_shards_by_stars_without_duplicates(self):
+        pages = {
+            ("big", 0): [repo("a/1", 900), repo("a/2", 700)],
+            ("big", 1): [repo("a/3", 100)],
+            ("llm", 0): [repo("b/1", 800), repo("a/2", 700)],
+            ("llm", 1): [],
+        }
+        search = ShardedSearch(
+            lambda query, page: pages.get((query, page), []),
+            ["big", "llm"],
+            page_size=2,
+        )
+
+        names = [item["full_name"] for item in search]
+
+        self.assertEqual(names, ["a/1", "b/1", "a/2", "a/3"])
+        self.assertEqual(search.stats()["results"], 4)
+
+    def test_pages_are_cached_for_the_day(self):
+        calls = []
+
+        def fetch(query, page):
+            calls.append((query, page))
+            return [repo(f"{query}/{page}", 10 - page)] if page < 2 else []
+
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = DiskCache(tmp, max_bytes=1_000_000)
+            first = list(ShardedSearch(fetch, ["q"], page_size=1, cache=cache))
+            second_search = ShardedSearch(fetch, ["q"], page_size=1, cache=cache)
+            second = list(second_search)
+
+        self.assertEqual(first, second)
+        self.assertEqual(len(calls), 3)
+        self.assertEqual(second_search.stats()["pages_cached"], 3)
+
+    def test_early_close_stops_prefetching(self):
+        fetched = threading.Event()
+
+        def endless(query, page):
+            fetched.set()
+            return [repo(f"{query}/{page}/{i}", 10_000 - page) for i in range(30)]
+
+        search = ShardedSearch(endless, ["q"], max_pages=1000, prefetch_pages=1)
+        results = iter(search)
+        self.assertEqual(next(results)["stargazers_count"], 10_000)
+        results.close()
+
+        self.assertTrue(fetched.is_set())
+        self.assertLess(search.stats()["pages_fetched"], 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,88 @@
+import os
+import sqlite3
+import sys
+import tempfile
+import unittest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.state_store import StateStore  # noqa: E402
+
+
+class TestStateStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = os.path.join(self.tmp.name, "state.sqlite3")
+
+    def test_unchanged_is_remembered_across_instances(self):
+        store = StateStore(self.path)
+        self.assertFalse(store.is_unchanged("org/repo", changelog_sha="abc"))
+        store.record_repo("org/repo", changelog_sha="abc", section_dates=["2024-01-02"])
+        store.record_summary("org/repo", "changelog", "2024-01-02", {"title": "T"})
+        store.close()
+
+        store = StateStore(self.path)
+        self.addCleanup(store.close)
+        self.assertTrue(store.is_unchanged("org/repo", changelog_sha="abc"))
+        self.assertTrue(store.is_unchanged("org/repo", changelog_sha="abc"))
+        self.assertFalse(store.is_unchanged("org/repo", changelog_sha="def"))
+        self.assertEqual(store.section_dates("org/repo", "changelog"), ["2024-01-02"])
+        self.assertEqual(
+            store.get_summary("org/repo", "changelog", "2024-01-02"), {"title": "T"}
+        )
+        self.assertEqual(store.stats()["unchanged"], 1)
+
+    def test_new_version_drops_old_summaries(self):
+        store = StateStore(self.path)
+        self.addCleanup(store.close)
+        store.record_repo("org/repo", release_id="1", section_dates=["2024-01-02"])
+        store.record_summary("org/repo", "releases", "2024-01-02", {"title": "T"})
+        self.assertTrue(store.is_unchanged("org/repo", release_id="1"))
+
+        store.record_repo("org/repo", release_id="2", section_dates=["2024-01-02"])
+        self.assertIsNone(store.get_summary("org/repo", "releases", "2024-01-02"))
+
+    def test_sources_keep_their_own_versions(self):
+        store = StateStore(self.path)
+        self.addCleanup(store.close)
+        store.record_repo("org/repo", changelog_sha="abc", section_dates=["2024-01-01"])
+        store.record_summary("org/repo", "changelog", "2024-01-01", {"title": "C"})
+        store.record_repo("org/repo", release_id="1", section_dates=["2024-01-03"])
+        store.record_summary("org/repo", "releases", "2024-01-03", {"title": "R"})
+
+        # A day served from releases doesn't forget the changelog SHA
+        self.assertTrue(store.is_unchanged("org/repo", changelog_sha="abc"))
+        self.assertEqual(store.section_dates("org/repo", "changelog"), ["2024-01-01"])
+
+        # A new release only drops the summaries made from releases
+        store.record_repo("org/repo", release_id="2", section_dates=["2024-01-04"])
+        self.assertIsNone(store.get_summary("org/repo", "releases", "2024-01-03"))
+        self.assertEqual(
+            store.get_summary("org/repo", "changelog", "2024-01-01"), {"title": "C"}
+        )
+        self.assertTrue(store.is_unchanged("org/repo", changelog_sha="abc"))
+
+    def test_state_from_older_schema_is_rebuilt(self):
+        conn = sqlite3.connect(self.path)
+        conn.execute(
+            "CREATE TABLE repos (full_name TEXT PRIMARY KEY, changelog_sha TEXT,"
+            " release_id TEXT, section_dates TEXT, checked_at TEXT NOT NULL)"
+        )
+        conn.commit()
+        conn.close()
+
+        store = StateStore(self.path)
+        self.addCleanup(store.close)
+        store.record_repo("org/repo", changelog_sha="abc", section_dates=["2024-01-02"])
+        self.assertTrue(store.is_unchanged("org/repo", changelog_sha="abc"))
+
+    def test_undated_changelog_is_never_unchanged(self):
+        store = StateStore(self.path)
+        self.addCleanup(store.close)
+        store.record_repo("org/repo", changelog_sha="abc", section_dates=None)
+        self.assertFalse(store.is_unchanged("org/repo", changelog_sha="abc"))
+
+
+if __name__ == "__main__":
+    unittest.main()
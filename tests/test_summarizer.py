@@ -3,18 +3,26 @@ from unittest.mock import patch, MagicMock
 import sys
 import os
 
-sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src import summarizer
+from src.cache import DiskCache
+from src.summarizer import (
+    check_for_daily_update,
+    check_for_updates,
+    generate_global_summary,
+    summarize_updates_batch,
+)
 
-from src.summarizer import check_for_daily_update, generate_global_summary
 
 class TestSummarizer(unittest.TestCase):
-    @patch('src.summarizer._call_gemini_with_fallback')
+    @patch("src.summarizer._call_gemini_with_fallback")
     def test_check_for_daily_update_not_found_locally(self, mock_gemini):
         result = check_for_daily_update("Some random log", "2024-01-01")
         self.assertIsNone(result)
         mock_gemini.assert_not_called()
 
-    @patch('src.summarizer._call_gemini_with_fallback')
+    @patch("src.summarizer._call_gemini_with_fallback")
     def test_check_for_daily_update_found(self, mock_gemini):
         mock_response = MagicMock()
         mock_response.text = '{"update_found": true, "title": "Test Title"}'
@@ -24,17 +32,144 @@ class TestSummarizer(unittest.TestCase):
         result = check_for_daily_update("Some log 2024-01-01 update", "2024-01-01")
         self.assertIsNotNone(result)
 
-    @patch('src.summarizer._call_gemini_with_fallback')
+    @patch("src.summarizer._call_gemini_with_fallback")
     def test_generate_global_summary(self, mock_gemini):
         mock_response = MagicMock()
         mock_response.text = '{"ecosystem_summary": "Ecosystem is great"}'
         mock_gemini.return_value = mock_response
 
         # Need to mock the get_gemini_client inside summarizer to not return None
-        with patch('src.summarizer._get_gemini_client', return_value=MagicMock()):
+        with patch("src.summarizer._get_gemini_client", return_value=MagicMock()):
             repos_data = [{"name": "repo1", "title": "update", "description": "desc"}]
             result = generate_global_summary(repos_data)
             self.assertIsNotNone(result)
 
-if __name__ == '__main__':
+    @patch("src.summarizer._call_gemini_with_fallback")
+    def test_check_for_daily_update_uses_summary_cache(self, mock_gemini):
+        import tempfile
+
+        negative = MagicMock()
+        negative.text = '{"update_found": false}'
+        mock_gemini.return_value = negative
+
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = DiskCache(tmp, max_bytes=1_000_000)
+            with patch.object(summarizer, "_summary_cache", cache):
+                content = "## 2024-02-02\n- docs only"
+                self.assertIsNone(check_for_daily_update(content, "2024-02-02"))
+                self.assertIsNone(check_for_daily_update(content, "2024-02-02"))
+
+        mock_gemini.assert_called_once()
+        self.assertEqual(cache.stats()["hits"], 1)
+
+    @patch("src.summarizer._call_gemini_with_fallback")
+    def test_check_for_daily_update_sends_only_dated_section(self, mock_gemini):
+        mock_response = MagicMock()
+        mock_response.text = '{"update_found": true, "title": "1.2.0"}'
+        mock_gemini.return_value = mock_response
+        content = (
+            "## [1.2.0] - 2024-03-05\n- New thing\n\n"
+            "## [1.1.0] - 2024-03-01\n- Mentions 2024-03-04 in prose\n"
+        )
+
+        self.assertIsNone(check_for_daily_update(content, "2024-03-04"))
+        mock_gemini.assert_not_called()
+
+        self.assertIsNotNone(check_for_daily_update(content, "2024-03-05"))
+        prompt = mock_gemini.call_args.kwargs["prompt"]
+        self.assertIn("New thing", prompt)
+        self.assertNotIn("1.1.0", prompt)
+
+    @patch("src.summarizer._call_gemini_with_fallback")
+    def test_check_for_updates_summarizes_freshest_date_once(self, mock_gemini):
+        mock_response = MagicMock()
+        mock_response.text = '{"update_found": true, "title": "1.1.0"}'
+        mock_gemini.return_value = mock_response
+        content = (
+            "## [1.1.0] - 2024-04-02\n- Newer\n\n## [1.0.0] - 2024-04-01\n- Older\n"
+        )
+
+        data, found = check_for_updates(
+            content, ["2024-04-03", "2024-04-02", "2024-04-01"]
+        )
+        self.assertEqual(found, "2024-04-02")
+        self.assertEqual(data["title"], "1.1.0")
+        mock_gemini.assert_called_once()
+
+        self.assertEqual(check_for_updates(content, ["2024-05-01"]), (None, None))
+        mock_gemini.assert_called_once()
+
+    @patch("src.summarizer._call_gemini_with_fallback")
+    def test_summarize_updates_batch_falls_back_for_bad_results(self, mock_gemini):
+        batch_response = MagicMock()
+        batch_response.text = (
+            '{"results": ['
+            '{"full_name": "a/one", "update_found": true, "title": "One",'
+            ' "whats_new": ["x"], "try_it_out": {"code": "pip install one"}},'
+            '{"full_name": "b/two", "update_found": true, "title": "Two"}]}'
+        )
+        single_response = MagicMock()
+        single_response.text = '{"update_found": true, "title": "Two"}'
+        mock_gemini.side_effect = [batch_response, single_response]
+
+        items = [
+            {
+                "full_name": name,
+                "content": f"## 2024-06-01\n- {name}",
+                "date": "2024-06-01",
+            }
+            for name in ("a/one", "b/two", "c/three")
+        ]
+        items[2]["content"] = "## 2024-05-01\n- old"
+
+        with patch("src.summarizer.config.SUMMARY_BATCH_SIZE", 4):
+            results = summarize_updates_batch(items)
+
+        self.assertEqual(results["a/one"]["title"], "One")
+        self.assertEqual(results["b/two"]["title"], "Two")  # truncated -> single call
+        self.assertIsNone(results["c/three"])  # no section, no request
+        self.assertEqual(mock_gemini.call_count, 2)
+        self.assertIn("a/one", mock_gemini.call_args_list[0].kwargs["prompt"])
+
+    def test_streaming_stops_once_no_update_is_decided(self):
+        import tempfile
+
+        from src.model_health import ModelHealth
+        from src.rate_limiter import RateLimiter
+
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        pieces = ['{"update_', 'found": false, "ti', 'tle": "never needed"}']
+        consumed = []
+
+        def stream():
+            for piece in pieces:
+                consumed.append(piece)
+                yield MagicMock(text=piece)
+
+        chunks = stream()
+        client = MagicMock()
+        client.models.generate_content_stream.return_value = chunks
+        limiter = RateLimiter(
+            60, daily_limit=10, ledger_path=os.path.join(tmp.name, "quota.json")
+        )
+        health = ModelHealth(os.path.join(tmp.name, "health.json"))
+
+        with (
+            patch("src.summarizer.config.GEMINI_STREAMING", True),
+            patch("src.summarizer._get_gemini_client", return_value=client),
+            patch("src.summarizer._rate_limiter", limiter),
+            patch("src.summarizer._model_health", health),
+            patch("src.summarizer._get_summary_cache", return_value=None),
+        ):
+            result = check_for_updates("## 2024-06-01\n- change", ["2024-06-01"])
+
+        self.assertEqual(result, (None, "2024-06-01"))
+        self.assertEqual(len(consumed), 2)  # the rest was never read
+        client.models.generate_content.assert_not_called()
+        with self.assertRaises(StopIteration):
+            next(chunks)  # the stream was closed
+
+
+if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,90 @@
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src import telemetry  # noqa: E402
+
+
+class TestTelemetry(unittest.TestCase):
+    def test_spans_and_counters(self):
+        recorder = telemetry.Telemetry()
+        with recorder.span("render"):
+            pass
+        recorder.add_time("llm_call", 2.0)
+        recorder.add_time("llm_call", 1.0)
+        recorder.count("github.requests", 3)
+
+        stats = recorder.snapshot()
+        self.assertEqual(stats["spans"]["render"]["count"], 1)
+        self.assertEqual(stats["spans"]["llm_call"]["total_seconds"], 3.0)
+        self.assertEqual(stats["spans"]["llm_call"]["max_seconds"], 2.0)
+        self.assertEqual(stats["counters"], {"github.requests": 3})
+
+    def test_prometheus_textfile(self):
+        meta = {
+            "target_date": "2024-01-01",
+            "repo_count": 9,
+            "http_cache": {"hits": 4},
+            "gemini_quota": {
+                "requests": {"gemini-2.5-flash": 2, "gemini_2.5-flash": 1}
+            },
+            "model_health": {
+                "gemini-2.5-flash": {"state": "closed", "p95_latency_seconds": 1.5},
+                "gemini-2.0-flash": {"state": "open", "p95_latency_seconds": 4.0},
+            },
+            "served_by": {
+                "org/a": {"model": "gemini-2.5-flash", "seconds": 1.0},
+                "org/b": {"model": "gemini-2.5-flash", "seconds": 2.0},
+                "org/c": None,
+            },
+            "telemetry": {
+                "spans": {
+                    "llm_call": {"count": 2, "total_seconds": 3.5, "max_seconds": 2.0}
+                },
+                "counters": {"gemini.retries": 1},
+            },
+        }
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "metrics", "changelog.prom")
+            telemetry.write_prometheus_textfile(path, meta)
+            with open(path, encoding="utf-8") as f:
+                text = f.read()
+
+        self.assertIn(
+            'changelog_insights_span_seconds_total{span="llm_call"} 3.5', text
+        )
+        self.assertIn('changelog_insights_events_total{event="gemini.retries"} 1', text)
+        self.assertIn("changelog_insights_http_cache_hits 4", text)
+        # Model names are labels: fixed metric names, no collisions
+        self.assertIn(
+            'changelog_insights_gemini_quota_requests{model="gemini-2.5-flash"} 2', text
+        )
+        self.assertIn(
+            'changelog_insights_gemini_quota_requests{model="gemini_2.5-flash"} 1', text
+        )
+        self.assertIn(
+            'changelog_insights_model_health_p95_latency_seconds{model="gemini-2.0-flash"} 4.0',
+            text,
+        )
+        self.assertEqual(text.count("# TYPE changelog_insights_model_health_p95"), 1)
+        # Per-repo routes are aggregated per model
+        self.assertIn(
+            'changelog_insights_served_repos{model="gemini-2.5-flash"} 2', text
+        )
+        self.assertIn('changelog_insights_served_repos{model="cache"} 1', text)
+        self.assertIn(
+            'changelog_insights_served_llm_seconds{model="gemini-2.5-flash"} 3.0', text
+        )
+        self.assertNotIn("org/", text)
+        self.assertNotIn("target_date", text)
+        names = [
+            line.split()[2] for line in text.splitlines() if line.startswith("# TYPE")
+        ]
+        self.assertEqual(len(names), len(set(names)))
+
+
+if __name__ == "__main__":
+    unittest.main()